@@ -10,6 +10,58 @@ import os
 from enum import Enum
 from pathlib import Path
 
+class settings:  # pylint: disable=c0103
+    """
+    Runtime settings (booleans and numbers read from the environment) for the br_cenipa project.
+
+    They are plain class attributes rather than `constants` members: Enum members with equal
+    values (e.g. True and 1) would be aliases of each other.
+    """
+
+    # Partitioned Parquet output
+    PARTITIONED_OUTPUT = os.getenv("PARTITIONED_OUTPUT", "false").lower() == "true"
+    PARQUET_TARGET_FILE_SIZE = int(os.getenv("PARQUET_TARGET_FILE_SIZE", 128 * 1024 * 1024))
+    PARQUET_ROW_GROUP_SIZE = int(os.getenv("PARQUET_ROW_GROUP_SIZE", 64 * 1024))
+    PARQUET_WRITE_STATISTICS = os.getenv("PARQUET_WRITE_STATISTICS", "true").lower() == "true"
+
+    # Transform task caching
+    TASK_CACHE = os.getenv("TASK_CACHE", "true").lower() == "true"
+    TASK_CACHE_EXPIRATION_DAYS = int(os.getenv("TASK_CACHE_EXPIRATION_DAYS", 30))
+
+    # Arrow IPC copy of the input tables, memory-mapped by the transform flow
+    ARROW_HANDOFF = os.getenv("ARROW_HANDOFF", "true").lower() == "true"
+
+    # Number of threads used to run the columns of a table plan
+    PLAN_WORKERS = int(os.getenv("PLAN_WORKERS", min(os.cpu_count() or 1, 8)))
+
+    # Cell size of the spatial grid index, in degrees
+    SPATIAL_GRID_RESOLUTION = float(os.getenv("SPATIAL_GRID_RESOLUTION", 0.1))
+
+    # Local query service
+    SERVICE_PORT = int(os.getenv("SERVICE_PORT", 8080))
+    SERVICE_CACHE_SIZE = int(os.getenv("SERVICE_CACHE_SIZE", 1024))
+    SERVICE_MAX_ROWS = int(os.getenv("SERVICE_MAX_ROWS", 1000))
+
+    # Processes used to transform the fact table in row partitions; 1 keeps it in the flow's process
+    FACT_TABLE_WORKERS = int(os.getenv("FACT_TABLE_WORKERS", 1))
+    FACT_TABLE_PARTITION_MIN_ROWS = int(os.getenv("FACT_TABLE_PARTITION_MIN_ROWS", 5000))
+
+    # Pipelined mode: each table is transformed as soon as its own file is downloaded (API mode only)
+    PIPELINE_MODE = os.getenv("PIPELINE_MODE", "false").lower() == "true"
+    PIPELINE_WORKERS = int(os.getenv("PIPELINE_WORKERS", 8))
+
+    # Concurrent tasks of the multi-dataset flow and HTTP connections per host of its shared session
+    DATASET_WORKERS = int(os.getenv("DATASET_WORKERS", 8))
+    HTTP_POOL_SIZE = int(os.getenv("HTTP_POOL_SIZE", 8))
+
+    # Aircraft registry split of the 'aeronave' table. Opt-in: it changes the columns of
+    # 'br_cenipa_aeronave' read by the consumers of the outputs
+    AIRCRAFT_REGISTRY = os.getenv("AIRCRAFT_REGISTRY", "false").lower() == "true"
+
+    # pandas copy-on-write for the transform tasks: renamed and type cast tables share their
+    # columns with the input tables until a column is replaced, instead of being copied up front
+    COPY_ON_WRITE = os.getenv("COPY_ON_WRITE", "true").lower() == "true"
+
 class constants(Enum):  # pylint: disable=c0103
     """
     Constant values for the br_cenipa project
@@ -20,6 +72,70 @@ class constants(Enum):  # pylint: disable=c0103
     EXECUTION_MODE = os.getenv("EXECUTION_MODE","local")
     EXTRACTION_MODE = os.getenv("EXTRACTION_MODE", "API")
 
+    # Constants for transform task caching
+    # Output generation of each cached task, renewed when one of its outputs is missing
+    TASK_CACHE_STATE_PATH = os.getenv("TASK_CACHE_STATE_PATH", os.path.join(OUTPUT_DIR_PATH, ".cache"))
+
+    # Serialization of persisted task results: "arrow" writes DataFrames as compressed Arrow IPC,
+    # any other value is a Prefect serializer type (e.g. "pickle"). An empty storage path keeps
+    # Prefect's default result storage.
+    RESULT_SERIALIZER = os.getenv("RESULT_SERIALIZER", "arrow").lower()
+    RESULT_COMPRESSION = os.getenv("RESULT_COMPRESSION", "zstd").lower()
+    RESULT_STORAGE_PATH = os.getenv("RESULT_STORAGE_PATH", "")
+
+    # Output form of date and time columns: "native" keeps them typed (date32/time64 in a
+    # Parquet copy of each output table), "string" keeps the 'YYYY-MM-DD'/'HH:MM:SS' strings only.
+    # The CSV outputs always use the string form.
+    TEMPORAL_OUTPUT = os.getenv("TEMPORAL_OUTPUT", "native").lower()
+
+    # Indexes persisted with the outputs
+    INDEX_DIR_PATH = os.getenv("INDEX_DIR_PATH", os.path.join(OUTPUT_DIR_PATH, "indices"))
+    SPATIAL_INDEX_FILE = "br_cenipa_ocorrencia_grade.parquet"
+    TEXT_INDEX_FILE = "br_cenipa_recomendacao_termos.parquet"
+    TEXT_INDEX_DOCUMENTS_FILE = "br_cenipa_recomendacao_documentos.parquet"
+
+    # Data quality reports, written next to the outputs but not uploaded
+    REPORT_DIR_PATH = os.getenv("REPORT_DIR_PATH", os.path.join(OUTPUT_DIR_PATH, "relatorios"))
+
+    # Local query service over the output tables. The transform flow writes PUBLISH_MARKER_FILE
+    # in the output directory when new outputs are ready; the service reloads on a new marker.
+    PUBLISH_MARKER_FILE = "_published.json"
+    SERVICE_HOST = os.getenv("SERVICE_HOST", "127.0.0.1")
+
+    # Memory high-water mark recorded for each transform stage: "rss" (peak resident set size),
+    # "tracemalloc" (peak of Python and NumPy allocations, slower) or "off"
+    MEMORY_PROFILE = os.getenv("MEMORY_PROFILE", "rss").lower()
+
+    # Constants for partitioned Parquet output
+    PARTITION_COLUMNS = ["ano", "sigla_uf"]
+    PARTITION_DATE_COLUMN = "data_ocorrencia"
+    PARTITION_NULL_VALUE = "__HIVE_DEFAULT_PARTITION__"
+
+    # Parquet write options. "default" applies to every table; a table entry overrides it,
+    # and its "columns" entries override single columns (compression, compression_level,
+    # use_dictionary and write_statistics).
+    PARQUET_WRITE_OPTIONS = {
+        "default": {
+            "compression": os.getenv("PARQUET_COMPRESSION", "zstd"),
+            "compression_level": int(os.getenv("PARQUET_COMPRESSION_LEVEL", 3)),
+            "use_dictionary": True,
+            "row_group_size": settings.PARQUET_ROW_GROUP_SIZE,
+            "write_statistics": settings.PARQUET_WRITE_STATISTICS,
+            "columns": {}
+        },
+        "br_cenipa_recomendacao": {
+            "columns": {
+                "descricao": {
+                    "compression": "zstd",
+                    "compression_level": 9,
+                    "use_dictionary": False,
+                    "write_statistics": False
+                }
+            }
+        }
+    }
+    PARQUET_LEVEL_CODECS = ["zstd", "gzip", "brotli"]
+
     # Constants for API option
     API_DATASET_ID = "623d13d9-3465-4be0-82e7-c13b78b08282"
     API_URL = "https://dados.gov.br/dados/api/publico"
@@ -66,6 +182,8 @@ class constants(Enum):  # pylint: disable=c0103
         'data_ocorrencia', 
         'data_publicacao_relatorio']
 
+    DATE_FORMATS = ["%d/%m/%Y", "%d-%m-%Y", "%Y-%m-%d", "%Y/%m/%d"]
+
     TIMESTAMP_COLUMNS = [
         'hora_ocorrencia'
     ]
@@ -76,6 +194,14 @@ class constants(Enum):  # pylint: disable=c0103
         'indicador_saida_pista'
     ]
 
+    BOOL_LOOKUP = {
+        'sim': True,
+        'não': False,
+        'nao': False,
+        'true': True,
+        'false': False
+    }
+
     FLOAT_COLUMNS = [
         'latitude_ocorrencia',
         'longitude_ocorrencia'
@@ -86,6 +212,16 @@ class constants(Enum):  # pylint: disable=c0103
         'quantidade_aeronaves_envolvidas'
     ]
 
+    # Table specs: column kind -> columns. "default" is the kind of the columns not listed,
+    # except for those in "exclude". Compiled into a column plan by src.utils.plan.
+    FACT_TABLE_SPEC = {
+        "lat_long": FLOAT_COLUMNS,
+        "string": STRING_COLUMNS,
+        "date": DATE_COLUMNS,
+        "time": TIMESTAMP_COLUMNS,
+        "bool": BOOL_COLUMNS
+    }
+
     ## Aeronave
     AERONAVE_RENAME_MAPPING = {
         "codigo_ocorrencia2":"id_ocorrencia",
@@ -141,6 +277,32 @@ class constants(Enum):  # pylint: disable=c0103
         "nivel_dano"
     ]
 
+    AERONAVE_TABLE_SPEC = {
+        "string": AERONAVE_STR_COLUMNS,
+        "float": AERONAVE_INT_COLUMNS
+    }
+
+    # Aircraft registry: with AIRCRAFT_REGISTRY, the attributes of each registration are moved to
+    # a deduplicated 'br_cenipa_aeronave_registro' table keyed by 'id_aeronave', and
+    # 'br_cenipa_aeronave' keeps 'id_ocorrencia', 'id_aeronave' and the per-occurrence columns.
+    AERONAVE_REGISTRY_COLUMNS = [
+        "matricula_aeronave",
+        "tipo_veiculo",
+        "nome_fabricante",
+        "nome_modelo",
+        "tipo_icao",
+        "tipo_motor",
+        "quantidade_motores",
+        "pmd_aeronave",
+        "categoria_pmd",
+        "quantidade_assentos",
+        "ano_fabricacao",
+        "nome_pais_fabricante",
+        "nome_pais_registro",
+        "categoria_registro",
+        "segmento_registro"
+    ]
+
     ## Ocorrencia Tipo
     TIPO_RENAME_MAPPING = {
         "codigo_ocorrencia1":"id_ocorrencia",
@@ -149,6 +311,11 @@ class constants(Enum):  # pylint: disable=c0103
         "taxonomia_tipo_icao":"taxonomia_icao"
     }
 
+    TIPO_TABLE_SPEC = {
+        "default": "string",
+        "exclude": ["id_ocorrencia"]
+    }
+
     ## Fator contribuinte
     FATOR_RENAME_MAPPING = {
         "codigo_ocorrencia3":"id_ocorrencia",
@@ -158,6 +325,11 @@ class constants(Enum):  # pylint: disable=c0103
         "fator_area":"area_fator"
     }
 
+    FATOR_TABLE_SPEC = {
+        "default": "string",
+        "exclude": ["id_ocorrencia"]
+    }
+
     ## Recomendacao
     RECOMENDACAO_RENAME_MAPPING = {
         "codigo_ocorrencia4":"id_ocorrencia",
@@ -184,3 +356,61 @@ class constants(Enum):  # pylint: disable=c0103
         "data_encaminhamento",
         "data_feedback"
     ]
+
+    RECOMENDACAO_TABLE_SPEC = {
+        "string": RECOMENDACAO_STR_COLUMNS,
+        "date": RECOMENDACAO_DATE_COLUMNS
+    }
+
+    ## Datasets
+    # Dataset specs for the multi-dataset flow: dados.gov.br dataset id, input directory and, per
+    # input file, the output table name, columns to drop, rename mapping and table spec. Files
+    # without an entry are downloaded but not transformed. Optional keys: code columns checked
+    # for nulls, whether the table is cast in row partitions (FACT_TABLE_WORKERS), the registry
+    # table and conflict report it is split into (AIRCRAFT_REGISTRY), and the index built on it
+    # ("spatial" or "text"). The CENIPA tasks read their tables from CENIPA_DATASET_SPEC too.
+    CENIPA_DATASET_SPEC = {
+        "api_dataset_id": API_DATASET_ID,
+        "input_dir": INPUT_DIR_PATH,
+        "tables": {
+            "ocorrencia.csv": {
+                "output": "br_cenipa_ocorrencia",
+                "code_columns": ["codigo_ocorrencia", "codigo_ocorrencia1", "codigo_ocorrencia2", "codigo_ocorrencia3", "codigo_ocorrencia4"],
+                "drop_columns": ["codigo_ocorrencia1", "codigo_ocorrencia2", "codigo_ocorrencia3", "codigo_ocorrencia4"],
+                "rename": RENAME_MAPPING,
+                "spec": FACT_TABLE_SPEC,
+                "partitioned": True,
+                "index": "spatial"
+            },
+            "ocorrencia_tipo.csv": {
+                "output": "br_cenipa_tipo_ocorrencia",
+                "rename": TIPO_RENAME_MAPPING,
+                "spec": TIPO_TABLE_SPEC
+            },
+            "aeronave.csv": {
+                "output": "br_cenipa_aeronave",
+                "rename": AERONAVE_RENAME_MAPPING,
+                "spec": AERONAVE_TABLE_SPEC,
+                "registry": "br_cenipa_aeronave_registro",
+                "registry_report": "br_cenipa_aeronave_conflitos"
+            },
+            "fator_contribuinte.csv": {
+                "output": "br_cenipa_fator_contribuinte",
+                "rename": FATOR_RENAME_MAPPING,
+                "spec": FATOR_TABLE_SPEC
+            },
+            "recomendacao.csv": {
+                "output": "br_cenipa_recomendacao",
+                "rename": RECOMENDACAO_RENAME_MAPPING,
+                "spec": RECOMENDACAO_TABLE_SPEC,
+                "index": "text"
+            }
+        }
+    }
+
+    DATASET_SPECS = {
+        "br_cenipa": CENIPA_DATASET_SPEC
+    }
+
+    # Datasets run by the multi-dataset flow (comma-separated); empty runs the CENIPA flows
+    DATASETS = [name.strip() for name in os.getenv("DATASETS", "").split(",") if name.strip()]
@@ -8,10 +8,14 @@ including orchestration logic and conditional execution based on environment var
 
 import os
 import logging
+from typing import List, Optional
 from prefect import flow, task
-from src.constants import constants
+from prefect.futures import as_completed, wait
+from prefect.task_runners import ThreadPoolTaskRunner
+from src.constants import constants, settings
 from src.tasks.extract import *
 from src.tasks.transform import *
+from src.utils.memory import enable_copy_on_write
 
 @flow
 def br_cenipa_extract_flow():
@@ -49,12 +53,15 @@ def br_cenipa_transform_flow():
     fact_table = load_fact_table()
     fact_table_checked = check_fact_table(fact_table)
     type_cast_fact_table(fact_table_checked)
+    build_fact_spatial_index()
     dim_tables = load_dim_tables()
     renamed_dim_tables = renaming_dim_tables(dim_tables)
     type_cast_tipo_table(renamed_dim_tables[0])
     type_cast_aeronave_table(renamed_dim_tables[1])
     type_cast_fator_table(renamed_dim_tables[2])
     type_cast_recom_table(renamed_dim_tables[3])
+    build_recom_text_index()
+    publish_outputs()
 
     GOOGLE_APPLICATION_CREDENTIALS = os.getenv("GOOGLE_APPLICATION_CREDENTIALS", "")
     GCP_BUCKET = os.getenv("GCP_BUCKET","br_cenipa")
@@ -62,6 +69,101 @@ def br_cenipa_transform_flow():
     if all([var != "" and var is not None for var in [GOOGLE_APPLICATION_CREDENTIALS, GCP_BUCKET]]):
         upload_output()
 
-print("Starting process...")
-br_cenipa_extract_flow()
-br_cenipa_transform_flow()
+@flow(task_runner=ThreadPoolTaskRunner(max_workers=settings.PIPELINE_WORKERS))
+def br_cenipa_pipelined_flow():
+    """
+    Prefect flow that overlaps extraction and transformation per table (API mode only).
+
+    Every CSV resource is downloaded and transcoded in its own task, and each table's load,
+    rename and type casting tasks start as soon as its own file is ready, so small dimension
+    tables are processed while larger files are still downloading. The spatial and text indexes
+    wait for their tables, and the outputs are published and uploaded once every table is done.
+
+    If a download fails, the tasks of its table don't run and the outputs are not published;
+    the other tables are still transformed, and the flow fails once they are done.
+
+    Returns:
+        None
+
+    Raises:
+        RuntimeError: If a resource could not be downloaded.
+    """
+    get_cenipa_metadata()
+    downloads = {
+        resource["file_name"]: get_cenipa_table.submit(resource)
+        for resource in list_csv_resources()}
+    ready = lambda file_name: [downloads[file_name]] if file_name in downloads else []
+
+    fact_table = load_fact_table.submit(wait_for=ready("ocorrencia.csv"))
+    fact_table_checked = check_fact_table.submit(fact_table)
+    fact_table_cast = type_cast_fact_table.submit(fact_table_checked)
+    outputs = [fact_table_cast, build_fact_spatial_index.submit(wait_for=[fact_table_cast])]
+
+    type_cast_tasks = [type_cast_tipo_table, type_cast_aeronave_table, type_cast_fator_table, type_cast_recom_table]
+    for file_name, mapping_name, type_cast_task in zip(DIM_TABLES_FILES, DIM_TABLES_MAPPINGS, type_cast_tasks):
+        load_task, rename_task = dim_table_tasks(file_name, mapping_name)
+        dim_table = load_task.submit(file_name, wait_for=ready(file_name))
+        dim_table_cast = type_cast_task.submit(rename_task.submit(dim_table, mapping_name))
+        outputs.append(dim_table_cast)
+        if file_name == "recomendacao.csv":
+            outputs.append(build_recom_text_index.submit(wait_for=[dim_table_cast]))
+
+    published = publish_outputs.submit(wait_for=outputs)
+    GOOGLE_APPLICATION_CREDENTIALS = os.getenv("GOOGLE_APPLICATION_CREDENTIALS", "")
+    GCP_BUCKET = os.getenv("GCP_BUCKET","br_cenipa")
+
+    if all([var != "" and var is not None for var in [GOOGLE_APPLICATION_CREDENTIALS, GCP_BUCKET]]):
+        upload_output.submit(wait_for=[published]).wait()
+    wait(outputs + [published])
+
+    failed = [file_name for file_name, download in downloads.items() if download.state.is_failed()]
+    if failed:
+        raise RuntimeError(f"Unable to download {', '.join(sorted(failed))}; outputs were not published.")
+
+@flow(task_runner=ThreadPoolTaskRunner(max_workers=settings.DATASET_WORKERS))
+def br_datasets_flow(datasets: Optional[List[str]] = None):
+    """
+    Prefect flow that extracts and transforms several dados.gov.br datasets concurrently, as
+    declared in DATASET_SPECS (API mode only).
+
+    All datasets share one task runner, limited to DATASET_WORKERS concurrent tasks, and one HTTP
+    session whose connection pool is limited to HTTP_POOL_SIZE connections. Each table is
+    transformed as soon as its own file is downloaded, with the same steps and outputs as the
+    CENIPA tasks (see `transform_dataset_table`).
+
+    Args:
+        datasets (List[str], optional): Names of the datasets to run. Defaults to DATASETS.
+
+    Returns:
+        None
+    """
+    datasets = datasets or constants.DATASETS.value
+    print(f"Datasets: {', '.join(datasets)}")
+    metadata = {get_dataset_metadata.submit(dataset): dataset for dataset in datasets}
+    outputs = []
+    for dataset_resources in as_completed(list(metadata)):
+        dataset = metadata[dataset_resources]
+        for resource in dataset_resources.result():
+            downloaded = get_dataset_table.submit(dataset, resource)
+            outputs.append(transform_dataset_table.submit(dataset, downloaded))
+
+    published = publish_outputs.submit(wait_for=outputs)
+    GOOGLE_APPLICATION_CREDENTIALS = os.getenv("GOOGLE_APPLICATION_CREDENTIALS", "")
+    GCP_BUCKET = os.getenv("GCP_BUCKET","br_cenipa")
+
+    if all([var != "" and var is not None for var in [GOOGLE_APPLICATION_CREDENTIALS, GCP_BUCKET]]):
+        upload_output.submit(wait_for=[published]).wait()
+    wait(outputs + [published])
+
+# Guarded so that processes spawned by the transform tasks can import this module
+if __name__ == "__main__":
+    print("Starting process...")
+    # Set for the flow process only, so importing the tasks doesn't change pandas options
+    enable_copy_on_write()
+    if constants.DATASETS.value:
+        br_datasets_flow()
+    elif settings.PIPELINE_MODE and constants.EXTRACTION_MODE.value != 'SCRAPE':
+        br_cenipa_pipelined_flow()
+    else:
+        br_cenipa_extract_flow()
+        br_cenipa_transform_flow()
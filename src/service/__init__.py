@@ -0,0 +1,4 @@
+# -*- coding: utf-8 -*-
+"""
+Local query service package for the br_cenipa project.
+"""
@@ -0,0 +1,136 @@
+# -*- coding: utf-8 -*-
+"""
+Load test for the local query service.
+
+Sends a mix of queries built from the output tables (by id, state, classification, aircraft
+registration and date range) from concurrent clients, and reports the p50/p99 latency, the
+throughput and the response cache statistics.
+
+Usage:
+    python -m src.service.load_test [--url URL] [--requests N] [--concurrency N] [--serve]
+"""
+
+import json
+import time
+import argparse
+import threading
+import http.client
+import numpy as np
+import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Tuple
+from urllib.parse import urlencode, urlparse
+
+from src.constants import constants, settings
+from src.utils.utils import read_aircraft_table, read_output_table
+
+def build_queries(size:int=200, seed:int=0) -> List[str]:
+    """
+    Builds a pool of query paths from the values found in the output tables.
+
+    Args:
+        size (int, optional): Number of distinct queries. Defaults to 200.
+        seed (int, optional): Random seed. Defaults to 0.
+
+    Returns:
+        List[str]: The query paths.
+    """
+    rng = np.random.default_rng(seed)
+    df_fact_table = read_output_table("br_cenipa_ocorrencia")
+    choice = lambda values: str(rng.choice(pd.Series(values).dropna().unique()))
+    try:
+        matriculas = read_aircraft_table()["matricula_aeronave"]
+    except FileNotFoundError:
+        matriculas = pd.Series([], dtype=object)
+    dates = pd.to_datetime(df_fact_table["data_ocorrencia"], errors="coerce").dropna()
+
+    queries = []
+    for i in range(size):
+        kind = i % 5
+        if kind == 0:
+            parameters = {"id_ocorrencia": choice(df_fact_table["id_ocorrencia"])}
+        elif kind == 1:
+            parameters = {"sigla_uf": choice(df_fact_table["sigla_uf"]), "limit": 50}
+        elif kind == 2:
+            parameters = {
+                "classificacao_ocorrencia": choice(df_fact_table["classificacao_ocorrencia"]),
+                "sigla_uf": choice(df_fact_table["sigla_uf"]),
+                "limit": 50}
+        elif kind == 3 and len(matriculas.dropna()):
+            parameters = {"matricula_aeronave": choice(matriculas)}
+        else:
+            start = pd.Timestamp(rng.choice(dates.to_numpy()))
+            parameters = {
+                "data_inicio": start.strftime("%Y-%m-%d"),
+                "data_fim": (start + pd.Timedelta(days=int(rng.integers(1, 365)))).strftime("%Y-%m-%d"),
+                "limit": 100}
+        queries.append(f"/ocorrencias?{urlencode(parameters)}")
+    return queries
+
+def run_load_test(url:str, queries:List[str], requests:int, concurrency:int, seed:int=0) -> dict:
+    """
+    Sends `requests` queries, drawn from the pool with a skewed (Zipf-like) popularity, from
+    `concurrency` clients with persistent connections.
+
+    Returns:
+        dict: Latency percentiles (ms), throughput (requests/s) and error count.
+    """
+    rng = np.random.default_rng(seed)
+    weights = 1 / np.arange(1, len(queries) + 1)
+    paths = [queries[i] for i in rng.choice(len(queries), size=requests, p=weights / weights.sum())]
+    address = urlparse(url)
+    local = threading.local()
+
+    def send(path:str) -> Tuple[float, int]:
+        if not hasattr(local, "connection"):
+            local.connection = http.client.HTTPConnection(address.hostname, address.port, timeout=30)
+        started = time.perf_counter()
+        local.connection.request("GET", path)
+        response = local.connection.getresponse()
+        response.read()
+        return time.perf_counter() - started, response.status
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        results = list(executor.map(send, paths))
+    elapsed = time.perf_counter() - started
+
+    latencies = np.array([latency for latency, _ in results]) * 1000
+    return {
+        "requests": requests,
+        "concurrency": concurrency,
+        "errors": sum(status != 200 for _, status in results),
+        "p50_ms": round(float(np.percentile(latencies, 50)), 3),
+        "p99_ms": round(float(np.percentile(latencies, 99)), 3),
+        "throughput_rps": round(requests / elapsed, 1)
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test for the local query service.")
+    parser.add_argument("--url", default=f"http://{constants.SERVICE_HOST.value}:{settings.SERVICE_PORT}")
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--queries", type=int, default=200, help="Number of distinct queries")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--serve", action="store_true", help="Start the service in this process first")
+    args = parser.parse_args()
+
+    if args.serve:
+        from src.service.server import serve
+        address = urlparse(args.url)
+        server = serve(address.hostname, address.port)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    queries = build_queries(args.queries, args.seed)
+    print(json.dumps(run_load_test(args.url, queries, args.requests, args.concurrency, args.seed), indent=2))
+
+    address = urlparse(args.url)
+    connection = http.client.HTTPConnection(address.hostname, address.port, timeout=30)
+    connection.request("GET", "/health")
+    print(json.dumps(json.loads(connection.getresponse().read())["cache"], indent=2))
+
+    if args.serve:
+        server.shutdown()
+
+if __name__ == "__main__":
+    main()
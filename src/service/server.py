@@ -0,0 +1,309 @@
+# -*- coding: utf-8 -*-
+"""
+Local read-only query service for the br_cenipa project.
+
+This module loads the processed output tables once, builds in-memory indexes over the
+filterable columns, and serves filtered queries over HTTP, with an LRU cache of responses.
+The tables are reloaded, and the cache dropped, when the transform flow publishes new outputs
+(see PUBLISH_MARKER_FILE).
+
+Usage:
+    python -m src.service.server [--host HOST] [--port PORT]
+
+    GET /ocorrencias?sigla_uf=SP&data_inicio=2020-01-01&data_fim=2020-12-31
+    GET /ocorrencias?matricula_aeronave=PRABC&limit=10&offset=0
+    GET /health
+"""
+
+import os
+import json
+import time
+import logging
+import argparse
+import threading
+import numpy as np
+import pandas as pd
+from functools import lru_cache
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+from src.constants import constants, settings
+from src.utils.utils import read_aircraft_table, read_output_table
+
+# Query parameter -> column of the fact table, matched by normalized value
+VALUE_FILTERS = {
+    "id_ocorrencia": "id_ocorrencia",
+    "sigla_uf": "sigla_uf",
+    "classificacao_ocorrencia": "classificacao_ocorrencia"
+}
+DATE_FILTERS = ["data_inicio", "data_fim"]
+PAGE_PARAMETERS = ["limit", "offset"]
+
+def normalize_keys(values:pd.Series) -> pd.Series:
+    """
+    Normalizes filter values for case- and whitespace-insensitive lookups. Nulls are kept.
+    """
+    return values.where(values.isna(), values.astype(str).str.strip().str.lower())
+
+def positions_by_value(keys:pd.Series) -> Dict[str, np.ndarray]:
+    """
+    Maps each distinct key to the sorted positions of the rows that have it.
+    """
+    return {
+        key: np.sort(positions)
+        for key, positions in pd.Series(np.arange(len(keys))).groupby(keys.to_numpy()).indices.items()}
+
+class OutputSnapshot:
+    """
+    The fact table and its indexes, as loaded from one published version of the outputs.
+    """
+
+    def __init__(self):
+        self.df_fact_table = read_output_table("br_cenipa_ocorrencia", memory_map=True)
+        fact_keys = {
+            parameter: normalize_keys(self.df_fact_table[column])
+            for parameter, column in VALUE_FILTERS.items()}
+        self.indexes = {
+            parameter: positions_by_value(keys)
+            for parameter, keys in fact_keys.items()}
+
+        fact_positions = pd.Series(np.arange(len(self.df_fact_table)), index=fact_keys["id_ocorrencia"].to_numpy())
+        fact_positions = fact_positions[~fact_positions.index.duplicated()]
+        try:
+            df_aeronave = read_aircraft_table(memory_map=True)
+            links = pd.DataFrame({
+                "matricula": normalize_keys(df_aeronave["matricula_aeronave"]).to_numpy(),
+                "posicao": normalize_keys(df_aeronave["id_ocorrencia"]).map(fact_positions).to_numpy()
+            }).dropna()
+            self.indexes["matricula_aeronave"] = {
+                matricula: np.unique(positions.astype(np.int64))
+                for matricula, positions in links.groupby("matricula")["posicao"]}
+        except FileNotFoundError:
+            logging.warning("Aircraft table not found in output folder. Filtering by registration is disabled.")
+
+        dates = pd.to_datetime(self.df_fact_table["data_ocorrencia"], errors="coerce")
+        dated = np.flatnonzero(dates.notna().to_numpy())
+        date_values = dates.to_numpy()[dated]
+        order = np.argsort(date_values, kind="stable")
+        self.date_positions = dated[order]
+        self.sorted_dates = date_values[order]
+
+    def filter_positions(self, filters:Tuple[Tuple[str, Tuple[str, ...]], ...]) -> np.ndarray:
+        """
+        Returns the sorted positions of the rows that match all the filters. Several values of
+        the same filter match any of them.
+
+        Args:
+            filters (Tuple): (parameter, values) pairs, from `parse_query`.
+
+        Returns:
+            np.ndarray: Positions in the fact table.
+        """
+        positions = None
+        for parameter, values in filters:
+            if parameter in DATE_FILTERS:
+                continue
+            if parameter not in self.indexes:
+                raise ValueError(f"Filter '{parameter}' is not available.")
+            index = self.indexes[parameter]
+            matches = np.unique(np.concatenate(
+                [index.get(value, np.array([], dtype=np.int64)) for value in values]))
+            positions = matches if positions is None else np.intersect1d(positions, matches, assume_unique=True)
+
+        filters = dict(filters)
+        if "data_inicio" in filters or "data_fim" in filters:
+            start, end = 0, len(self.sorted_dates)
+            if "data_inicio" in filters:
+                start = np.searchsorted(self.sorted_dates, np.datetime64(pd.Timestamp(filters["data_inicio"][0])), side="left")
+            if "data_fim" in filters:
+                end = np.searchsorted(self.sorted_dates, np.datetime64(pd.Timestamp(filters["data_fim"][0])), side="right")
+            matches = np.sort(self.date_positions[start:end])
+            positions = matches if positions is None else np.intersect1d(positions, matches, assume_unique=True)
+
+        return np.arange(len(self.df_fact_table)) if positions is None else positions
+
+    def response(self, filters:Tuple[Tuple[str, Tuple[str, ...]], ...], limit:int, offset:int) -> bytes:
+        """
+        Builds the JSON response of a query: the total number of matches and one page of rows.
+
+        Returns:
+            bytes: The encoded response.
+        """
+        positions = self.filter_positions(filters)
+        page = self.df_fact_table.iloc[positions[offset:offset + limit]]
+        items = page.astype(object).where(page.notna(), None).to_dict(orient="records")
+        return json.dumps({
+            "total": int(len(positions)),
+            "count": len(items),
+            "offset": offset,
+            "items": items
+        }, ensure_ascii=False, default=str).encode("utf-8")
+
+def parse_query(query_string:str) -> Tuple[Tuple[Tuple[str, Tuple[str, ...]], ...], int, int]:
+    """
+    Parses and normalizes the query string of a request, so equivalent queries share a cache entry.
+
+    Args:
+        query_string (str): The query string (e.g. 'sigla_uf=SP&limit=10').
+
+    Returns:
+        Tuple: (filters, limit, offset), with the filters sorted by parameter.
+    """
+    parameters = parse_qs(query_string, strict_parsing=False)
+    allowed = list(VALUE_FILTERS) + ["matricula_aeronave"] + DATE_FILTERS + PAGE_PARAMETERS
+    unknown = set(parameters) - set(allowed)
+    if unknown:
+        raise ValueError(f"Unknown parameters: {', '.join(sorted(unknown))}.")
+
+    limit = min(int(parameters.pop("limit", [settings.SERVICE_MAX_ROWS])[0]), settings.SERVICE_MAX_ROWS)
+    offset = int(parameters.pop("offset", [0])[0])
+    if limit < 0 or offset < 0:
+        raise ValueError("'limit' and 'offset' must not be negative.")
+    for parameter in DATE_FILTERS:
+        if parameter in parameters:
+            parameters[parameter] = [pd.Timestamp(parameters[parameter][0]).strftime("%Y-%m-%d")]
+    filters = tuple(sorted(
+        (parameter, tuple(sorted({value.strip().lower() for value in values})))
+        for parameter, values in parameters.items()))
+    return filters, limit, offset
+
+class QueryService:
+    """
+    Serves queries from the latest published outputs, with an LRU cache of responses. Each
+    request checks the publish marker, and a new marker reloads the tables and drops the cache.
+    """
+
+    def __init__(self, cache_size:int=None):
+        self.cache_size = int(cache_size or settings.SERVICE_CACHE_SIZE)
+        self.marker_path = os.path.join(constants.OUTPUT_DIR_PATH.value, constants.PUBLISH_MARKER_FILE.value)
+        self.lock = threading.Lock()
+        self.marker = None
+        self.snapshot = None
+        self.cached_response = None
+        self.loaded_at = None
+
+    def read_marker(self) -> Optional[Tuple[int, int]]:
+        """
+        Returns the modification time and size of the publish marker, or None if it doesn't exist.
+        """
+        try:
+            stat = os.stat(self.marker_path)
+            return stat.st_mtime_ns, stat.st_size
+        except FileNotFoundError:
+            return None
+
+    def refresh(self):
+        """
+        Loads the outputs if they were never loaded or a new version was published since.
+        """
+        marker = self.read_marker()
+        if self.snapshot is not None and marker == self.marker:
+            return
+        with self.lock:
+            if self.snapshot is not None and marker == self.marker:
+                return
+            started = time.perf_counter()
+            snapshot = OutputSnapshot()
+            self.snapshot, self.marker, self.loaded_at = snapshot, marker, time.time()
+            self.cached_response = lru_cache(maxsize=self.cache_size)(snapshot.response)
+            logging.info(
+                f"Loaded {len(snapshot.df_fact_table)} occurrences in {time.perf_counter() - started:.2f}s "
+                f"(publish marker: {marker}).")
+
+    def query(self, query_string:str) -> bytes:
+        """
+        Answers a query on the occurrences.
+
+        Args:
+            query_string (str): The request's query string.
+
+        Returns:
+            bytes: The JSON response.
+        """
+        self.refresh()
+        return self.cached_response(*parse_query(query_string))
+
+    def health(self) -> bytes:
+        """
+        Returns the service status and the response cache statistics, as JSON.
+        """
+        self.refresh()
+        cache = self.cached_response.cache_info()
+        return json.dumps({
+            "status": "ok",
+            "occurrences": len(self.snapshot.df_fact_table),
+            "loaded_at": self.loaded_at,
+            "cache": {"hits": cache.hits, "misses": cache.misses, "size": cache.currsize, "max_size": cache.maxsize}
+        }).encode("utf-8")
+
+def make_handler(service:QueryService) -> type:
+    """
+    Builds the HTTP request handler class bound to a query service.
+    """
+
+    class QueryHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        disable_nagle_algorithm = True
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            try:
+                if url.path == "/ocorrencias":
+                    self.send_json(200, service.query(url.query))
+                elif url.path == "/health":
+                    self.send_json(200, service.health())
+                else:
+                    self.send_json(404, json.dumps({"error": f"Unknown path {url.path}."}).encode("utf-8"))
+            except ValueError as e:
+                self.send_json(400, json.dumps({"error": str(e)}).encode("utf-8"))
+            except Exception as e:
+                logging.error(f"Error answering {self.path}: {e}")
+                self.send_json(500, json.dumps({"error": "Internal error."}).encode("utf-8"))
+
+        def send_json(self, status:int, body:bytes):
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            logging.debug(format % args)
+
+    return QueryHandler
+
+def serve(host:str=None, port:int=None, service:QueryService=None) -> ThreadingHTTPServer:
+    """
+    Creates the HTTP server, loading the outputs before it accepts requests.
+
+    Args:
+        host (str, optional): Address to bind. Defaults to SERVICE_HOST.
+        port (int, optional): Port to bind. Defaults to SERVICE_PORT.
+        service (QueryService, optional): The query service. Defaults to a new one.
+
+    Returns:
+        ThreadingHTTPServer: The server; call `serve_forever()` to run it.
+    """
+    service = service or QueryService()
+    service.refresh()
+    return ThreadingHTTPServer(
+        (host or constants.SERVICE_HOST.value, int(port or settings.SERVICE_PORT)),
+        make_handler(service))
+
+def main():
+    parser = argparse.ArgumentParser(description="Local read-only query service over the br_cenipa outputs.")
+    parser.add_argument("--host", default=constants.SERVICE_HOST.value)
+    parser.add_argument("--port", type=int, default=settings.SERVICE_PORT)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    server = serve(args.host, args.port)
+    logging.info(f"Serving on http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+if __name__ == "__main__":
+    main()
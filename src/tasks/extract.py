@@ -11,10 +11,12 @@ import json
 import time
 import logging
 import requests
+from typing import List, Optional
 from prefect import task
 
 from src.constants import constants
 from src.utils.utils import *
+from src.utils.datasets import dataset_input_dir, get_dataset_spec, http_session
 
 @task
 def scrape_data():
@@ -119,4 +121,114 @@ def get_cenipa_data():
                     logging.error(f"Failed to download {table_title}: {e}")
                     print(f"Failed to download {table_title}: {e}")
 
-        correct_csv_encoding()
\ No newline at end of file
+        correct_csv_encoding()
+
+def list_csv_resources() -> List[dict]:
+    """
+    Lists the CSV resources in the CENIPA metadata JSON file, with the file name each one is
+    downloaded to ('file_name', e.g. 'ocorrencia.csv').
+
+    Returns:
+        List[dict]: The CSV resources from the metadata.
+    """
+    with open(os.path.join(constants.INPUT_DIR_PATH.value,"cenipa_metadata.json"), "r") as metadata_file:
+        metadata = json.load(metadata_file)
+    return csv_resources(metadata)
+
+def csv_resources(metadata: dict) -> List[dict]:
+    """
+    Lists the CSV resources of a dataset's metadata, adding the file name each one is
+    downloaded to ('file_name', e.g. 'ocorrencia.csv').
+
+    Args:
+        metadata (dict): The dataset metadata, as returned by the API.
+
+    Returns:
+        List[dict]: The CSV resources.
+    """
+    return [
+        {**resource, "file_name": f"{resource['link'].split('/')[-1].replace('.csv', '')}.csv"}
+        for resource in metadata["recursos"]
+        if resource["formato"] == "CSV"]
+
+@task
+def get_cenipa_table(resource: dict) -> str:
+    """
+    Downloads one CSV resource listed in the CENIPA metadata and corrects its encoding, so that
+    its transformation can start without waiting for the other resources.
+
+    Args:
+        resource (dict): A resource from `list_csv_resources`.
+
+    Returns:
+        str: The file name in the input directory.
+
+    Raises:
+        Exception: If the download fails, so the tasks waiting for the table don't run on a
+            missing or stale file.
+    """
+    table_name = resource["file_name"].replace(".csv", "")
+    try:
+        logging.info(f"Downloading table: {resource['titulo']} (ID: {resource['id']})")
+        print(f"Downloading table: {resource['titulo']} (ID: {resource['id']})")
+        download_table_to_csv(table_name, resource["link"])
+        correct_file_encoding(resource["file_name"])
+        return resource["file_name"]
+    except Exception as e:
+        logging.error(f"Failed to download {resource['titulo']}: {e}")
+        print(f"Failed to download {resource['titulo']}: {e}")
+        raise
+
+@task
+def get_dataset_metadata(dataset: str) -> List[dict]:
+    """
+    Fetches the metadata of a dataset from the public API, saves it as '<dataset>_metadata.json'
+    in the dataset's input directory, and lists its CSV resources (see `csv_resources`).
+
+    Args:
+        dataset (str): Name of the dataset in DATASET_SPECS.
+
+    Returns:
+        List[dict]: The CSV resources of the dataset.
+    """
+    print(f"Getting metadata of {dataset} from API...")
+    HEADERS = {
+        "accept":"application/json",
+        "chave-api-dados-abertos":f"{constants.API_KEY.value}"
+    }
+    input_dir = dataset_input_dir(dataset)
+    os.makedirs(input_dir, exist_ok=True)
+
+    response = http_session().get(
+        headers = HEADERS,
+        url = f"{constants.API_URL.value}/conjuntos-dados/{get_dataset_spec(dataset)['api_dataset_id']}")
+    response.raise_for_status()
+    metadata = response.json()
+    with open(os.path.join(input_dir, f"{dataset}_metadata.json"), "w") as f:
+        json.dump(metadata, f, indent=4)
+    return csv_resources(metadata)
+
+@task
+def get_dataset_table(dataset: str, resource: dict) -> Optional[str]:
+    """
+    Downloads one CSV resource of a dataset through the shared HTTP session and corrects its
+    encoding.
+
+    Args:
+        dataset (str): Name of the dataset in DATASET_SPECS.
+        resource (dict): A resource from `get_dataset_metadata`.
+
+    Returns:
+        Optional[str]: The file name in the dataset's input directory, or None if the download failed.
+    """
+    input_dir = dataset_input_dir(dataset)
+    try:
+        logging.info(f"Downloading {dataset} table: {resource['titulo']} (ID: {resource['id']})")
+        print(f"Downloading {dataset} table: {resource['titulo']} (ID: {resource['id']})")
+        download_table_to_csv(resource["file_name"].replace(".csv", ""), resource["link"], input_dir, http_session())
+        correct_file_encoding(resource["file_name"], input_dir)
+        return resource["file_name"]
+    except Exception as e:
+        logging.error(f"Failed to download {dataset} table {resource['titulo']}: {e}")
+        print(f"Failed to download {dataset} table {resource['titulo']}: {e}")
+        return None
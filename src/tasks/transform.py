@@ -7,34 +7,158 @@ and uploading processed data to Google Cloud Storage.
 """
 
 import os
+import json
 import logging
 import pandas as pd
+from datetime import timedelta
 from prefect import task
 
 from src.constants import *
 from src.utils.utils import *
+from src.utils.plan import apply_table_spec, apply_table_spec_partitioned
+from src.utils.serializers import result_serializer, result_storage
+from src.utils.spatial import build_spatial_index, save_spatial_index
+from src.utils.text_index import update_text_index
+from src.utils.datasets import dataset_input_dir, get_table_spec
+from src.utils.memory import memory_report, memory_stage, merge_memory_report, writable_copy
+
+CACHE_OPTIONS = {
+    "persist_result": settings.TASK_CACHE,
+    "cache_expiration": timedelta(days=settings.TASK_CACHE_EXPIRATION_DAYS),
+    "result_serializer": result_serializer(),
+    "result_storage": result_storage()
+}
+
+# Constants read by the coercion kernels, which change the output dtypes of every table spec
+COERCION_CONSTANTS = [
+    "DATE_FORMATS",
+    "BOOL_LOOKUP",
+    "TEMPORAL_OUTPUT"
+]
+
+DIM_TABLES_FILES = [
+    "ocorrencia_tipo.csv",
+    "aeronave.csv",
+    "fator_contribuinte.csv",
+    "recomendacao.csv"
+]
+
+DIM_TABLES_MAPPINGS = [
+    "TIPO_RENAME_MAPPING",
+    "AERONAVE_RENAME_MAPPING",
+    "FATOR_RENAME_MAPPING",
+    "RECOMENDACAO_RENAME_MAPPING"
+]
+
+# Table specs of the CENIPA tables (see CENIPA_DATASET_SPEC), shared with the multi-dataset flow
+CENIPA_DATASET = "br_cenipa"
+FACT_TABLE = get_table_spec(CENIPA_DATASET, "ocorrencia.csv")
+TIPO_TABLE = get_table_spec(CENIPA_DATASET, "ocorrencia_tipo.csv")
+AERONAVE_TABLE = get_table_spec(CENIPA_DATASET, "aeronave.csv")
+FATOR_TABLE = get_table_spec(CENIPA_DATASET, "fator_contribuinte.csv")
+RECOMENDACAO_TABLE = get_table_spec(CENIPA_DATASET, "recomendacao.csv")
+DIM_TABLES = [get_table_spec(CENIPA_DATASET, file_name) for file_name in DIM_TABLES_FILES]
+
+def log_code_nulls(dataframe: pd.DataFrame, columns_code: List[str]):
+    """
+    Logs the rows with nulls in the code columns of a table, and the rows where they are all null.
+
+    Args:
+        dataframe (pd.DataFrame): The table, before renaming.
+        columns_code (List[str]): The code columns.
+    """
+    columns_code = [col for col in columns_code if col in dataframe.columns]
+    df_null = dataframe[dataframe[columns_code].isnull().any(axis=1)]
+    if not df_null.empty:
+        logging.info(f"Any row with one or more nulls: {df_null}")
+        print(f"Any row with one or more nulls: {df_null}")
+    df_null = dataframe[dataframe[columns_code].isnull().all(axis=1)]
+    if not df_null.empty:
+        logging.info(f"Any null row: {df_null}")
+        print(f"Any null row: {df_null}")
+
+def prepare_table(dataframe: pd.DataFrame, table_spec: dict) -> pd.DataFrame:
+    """
+    Prepares an input table as declared in its table spec: checks its code columns for nulls,
+    drops columns and renames them.
+
+    Args:
+        dataframe (pd.DataFrame): The input table. It is not modified.
+        table_spec (dict): The table spec (see DATASET_SPECS).
+
+    Returns:
+        pd.DataFrame: The prepared table.
+    """
+    if table_spec.get("code_columns"):
+        log_code_nulls(dataframe, table_spec["code_columns"])
+    return writable_copy(dataframe
+        .drop(columns=[col for col in table_spec.get("drop_columns", []) if col in dataframe.columns])
+        .rename(columns=table_spec.get("rename", {})))
+
+def cast_table(dataframe: pd.DataFrame, table_spec: dict) -> pd.DataFrame:
+    """
+    Applies the column spec of a table spec to a prepared table and checks its consistency.
+    Tables declared as 'partitioned' are cast in row partitions when FACT_TABLE_WORKERS > 1,
+    and the checks run on the merged table.
+
+    Args:
+        dataframe (pd.DataFrame): The prepared table. It is not modified.
+        table_spec (dict): The table spec (see DATASET_SPECS).
+
+    Returns:
+        pd.DataFrame: The cast table.
+    """
+    spec = table_spec.get("spec", {})
+    if table_spec.get("partitioned") and settings.FACT_TABLE_WORKERS > 1:
+        df_cast = apply_table_spec_partitioned(dataframe, spec)
+    else:
+        df_cast = writable_copy(dataframe)
+        apply_table_spec(df_cast, spec)
+    show_uniques(df_cast, [col for col in spec.get("bool", []) if col in df_cast.columns])
+
+    logging.info("Checking consistency after transformations...")
+    print("Checking consistency after transformations...")
+    check_inconsistences(df_cast)
+    return df_cast
+
+def build_table_index(table_spec: dict):
+    """
+    Builds the index declared in a table spec from its saved output table: the spatial grid
+    index ("spatial", see `src/utils/spatial.py`) or the full-text index ("text", see
+    `src/utils/text_index.py`).
+
+    Args:
+        table_spec (dict): The table spec (see DATASET_SPECS).
+    """
+    if table_spec.get("index") == "spatial":
+        save_spatial_index(build_spatial_index(read_output_table(table_spec["output"])))
+    elif table_spec.get("index") == "text":
+        stats = update_text_index(read_output_table(table_spec["output"]))
+        print(f"Text index: {stats}")
 
 # Fact table
-@task(log_prints=True)
+@task(log_prints=True,
+      cache_key_fn=input_hash_cache_key(["ocorrencia.csv"]),
+      **CACHE_OPTIONS)
+@memory_stage
 def load_fact_table() -> pd.DataFrame:
     """
-    Loads the fact table from the input directory.
+    Loads the fact table from the input directory, memory-mapping its Arrow IPC copy when available.
 
     Returns:
         pd.DataFrame: The loaded fact table as a pandas DataFrame.
     """
-    df_fact_table = pd.read_csv(
-        os.path.join(constants.INPUT_DIR_PATH.value, "ocorrencia.csv"),
-        sep=";",
-        encoding="utf-8"
-    )
+    df_fact_table = read_input_table("ocorrencia.csv")
     return df_fact_table
 
-@task(log_prints=True)
+@task(log_prints=True,
+      cache_key_fn=input_hash_cache_key(["ocorrencia.csv"], table_specs=[FACT_TABLE]),
+      **CACHE_OPTIONS)
+@memory_stage
 def check_fact_table(df_fact_table: pd.DataFrame) -> pd.DataFrame:
     """
     Checks the fact table for nulls and code inconsistencies, removes non-unique code columns,
-    and applies renaming.
+    and applies renaming, as declared in its table spec (see `prepare_table`).
 
     Args:
         df_fact_table (pd.DataFrame): The fact table DataFrame.
@@ -43,240 +167,383 @@ def check_fact_table(df_fact_table: pd.DataFrame) -> pd.DataFrame:
         pd.DataFrame: The modified fact table DataFrame.
     """
     logging.info(f"Checking fact table code columns for inconsistencies...")
-    columns_code = [
-        'codigo_ocorrencia', 
-        'codigo_ocorrencia1',
-        'codigo_ocorrencia2',
-        'codigo_ocorrencia3',
-        'codigo_ocorrencia4']
-    df_null = pd.DataFrame([])
-    df_null = df_fact_table[df_fact_table[columns_code].isnull().any(axis=1)]
-    if not df_null.empty:
-        logging.info(f"Any row with one or more nulls: {df_null}")
-        print(f"Any row with one or more nulls: {df_null}")
-        df_null = pd.DataFrame([])
-    df_null = df_fact_table[df_fact_table[columns_code].isnull().all(axis=1)]
-    if not df_null.empty:
-        logging.info(f"Any null row: {df_null}")
-        print(f"Any null row: {df_null}")
-
-    df_fact_table[(df_fact_table['codigo_ocorrencia'] == df_fact_table['codigo_ocorrencia1'])&
-                  (df_fact_table['codigo_ocorrencia'] == df_fact_table['codigo_ocorrencia2'])&
-                  (df_fact_table['codigo_ocorrencia'] == df_fact_table['codigo_ocorrencia3'])&
-                  (df_fact_table['codigo_ocorrencia'] == df_fact_table['codigo_ocorrencia4'])]
-    columns_code.remove('codigo_ocorrencia')
-
-    # Remove columns with codes that are not unique
-    df_fact_table_modif = df_fact_table.drop(columns=columns_code)\
-        .rename(columns=constants.RENAME_MAPPING.value).copy()
+    df_fact_table_modif = prepare_table(df_fact_table, FACT_TABLE)
 
     check_inconsistences(df_fact_table_modif)
     return df_fact_table_modif
 
-@task(log_prints=True)
+@task(log_prints=True,
+      cache_key_fn=input_hash_cache_key(
+          ["ocorrencia.csv"],
+          COERCION_CONSTANTS,
+          table_spec_output_files(FACT_TABLE),
+          [FACT_TABLE]),
+      **CACHE_OPTIONS)
+@memory_stage
 def type_cast_fact_table(df_fact_table_modif: pd.DataFrame):
     """
-    Applies type casting and formatting to the fact table, including float, string, date, time, and boolean columns.
-    Saves the processed table as a CSV file in the output directory.
+    Applies type casting and formatting to the fact table, including float, string, date, time, and boolean columns,
+    as declared in FACT_TABLE_SPEC. Floats and booleans are converted to the nullable 'Float64' and 'boolean' dtypes.
+    With FACT_TABLE_WORKERS > 1, row partitions are transformed in a process pool and the checks run on the merged table.
+    Saves the processed table in the output directory (see `save_output_table`).
 
     Args:
         df_fact_table_modif (pd.DataFrame): The modified fact table DataFrame.
     """
-    df_fact_cast = df_fact_table_modif.copy()
-    for col in constants.FLOAT_COLUMNS.value:
-        df_fact_cast[col] = df_fact_cast[col]\
-            .astype(str)\
-            .str.replace(r'\*+', '0', regex=True)\
-            .replace(r'°', '', regex=True)\
-            .apply(transform_lat_long)
-    format_floats(df_fact_cast, constants.FLOAT_COLUMNS.value)
-    format_string(df_fact_cast, constants.STRING_COLUMNS.value)
-    format_date(df_fact_cast, constants.DATE_COLUMNS.value)
-    format_time(df_fact_cast, constants.TIMESTAMP_COLUMNS.value)
-    show_uniques(df_fact_cast, constants.BOOL_COLUMNS.value)
-    format_bools(df_fact_cast, constants.BOOL_COLUMNS.value)
-    show_uniques(df_fact_cast, constants.BOOL_COLUMNS.value)
+    save_table_outputs(cast_table(df_fact_table_modif, FACT_TABLE), FACT_TABLE)
 
-    logging.info("Checking consistency after transformations...")
-    check_inconsistences(df_fact_cast)
-    df_fact_cast.to_csv(os.path.join(constants.OUTPUT_DIR_PATH.value, "br_cenipa_ocorrencia.csv"), index=False)
+@task(log_prints=True,
+      cache_key_fn=input_hash_cache_key(
+          ["ocorrencia.csv"],
+          COERCION_CONSTANTS + ["SPATIAL_GRID_RESOLUTION"],
+          [os.path.join(constants.INDEX_DIR_PATH.value, constants.SPATIAL_INDEX_FILE.value)],
+          [FACT_TABLE]),
+      **CACHE_OPTIONS)
+def build_fact_spatial_index():
+    """
+    Builds the spatial grid index of the processed fact table (see `src/utils/spatial.py`) and
+    saves it in the index directory, so proximity queries don't scan every coordinate.
+    """
+    try:
+        build_table_index(FACT_TABLE)
+    except Exception as e:
+        logging.error(f"Error building the spatial index: {e}")
+        print(f"Error building the spatial index: {e}")
 
-@task(log_prints=True)
+@task(log_prints=True,
+      cache_key_fn=input_hash_cache_key(DIM_TABLES_FILES),
+      **CACHE_OPTIONS)
+@memory_stage
 def load_dim_tables() -> List[pd.DataFrame]:
     """
-    Loads all dimension tables from the input directory.
+    Loads all dimension tables from the input directory, memory-mapping their Arrow IPC copies
+    when available.
 
     Returns:
         List[pd.DataFrame]: List containing all loaded dimension tables as pandas DataFrames.
+
+    Raises:
+        Exception: If a table can't be read, so the tasks that use them don't run.
     """
     logging.info("Reading dimension tables...")
     print("Reading dimension tables...")
     try:
-        df_tipos = pd.read_csv(
-            os.path.join(constants.INPUT_DIR_PATH.value, "ocorrencia_tipo.csv"),
-            sep=";",
-            encoding="utf-8"
-        )
-        df_aeronave = pd.read_csv(
-            os.path.join(constants.INPUT_DIR_PATH.value, "aeronave.csv"),
-            sep=";",
-            encoding="utf-8"
-        )
-        df_fator = pd.read_csv(
-            os.path.join(constants.INPUT_DIR_PATH.value, "fator_contribuinte.csv"),
-            sep=";",
-            encoding="utf-8"
-        )
-        df_recomendacao = pd.read_csv(
-            os.path.join(constants.INPUT_DIR_PATH.value, "recomendacao.csv"),
-            sep=";",
-            encoding="utf-8"
-        )
+        df_tipos = read_input_table("ocorrencia_tipo.csv")
+        df_aeronave = read_input_table("aeronave.csv")
+        df_fator = read_input_table("fator_contribuinte.csv")
+        df_recomendacao = read_input_table("recomendacao.csv")
     except Exception as e:
         logging.error(f"Error during dimension tables reading: {e}")
         print(f"Error during dimension tables reading: {e}")
+        raise
     dim_tables = [df_tipos, df_aeronave, df_fator, df_recomendacao]
     return dim_tables
 
-@task(log_prints=True)
+@task(log_prints=True,
+      cache_key_fn=input_hash_cache_key(DIM_TABLES_FILES, table_specs=DIM_TABLES),
+      **CACHE_OPTIONS)
+@memory_stage
 def renaming_dim_tables(dim_tables: List[pd.DataFrame]) -> List[pd.DataFrame]:
     """
-    Renames columns in all dimension tables using the mappings defined in constants.
+    Renames columns in all dimension tables using the mappings of their table specs.
 
     Args:
         dim_tables (List[pd.DataFrame]): List of dimension tables.
 
     Returns:
         List[pd.DataFrame]: List of renamed dimension tables.
+
+    Raises:
+        Exception: If a table can't be renamed, so the type casting tasks don't run.
     """
     logging.info("Renaming dimension tables...")
     print("Renaming dimension tables...")
     try:
-        df_tipos_modif = dim_tables[0].rename(columns=constants.TIPO_RENAME_MAPPING.value).copy()
-        df_aeronave_modif = dim_tables[1].rename(columns=constants.AERONAVE_RENAME_MAPPING.value).copy()
-        df_fator_modif = dim_tables[2].rename(columns=constants.FATOR_RENAME_MAPPING.value).copy()
-        df_recomendacao_modif = dim_tables[3].rename(columns=constants.RECOMENDACAO_RENAME_MAPPING.value).copy()
+        df_tipos_modif = writable_copy(dim_tables[0].rename(columns=TIPO_TABLE["rename"]))
+        df_aeronave_modif = writable_copy(dim_tables[1].rename(columns=AERONAVE_TABLE["rename"]))
+        df_fator_modif = writable_copy(dim_tables[2].rename(columns=FATOR_TABLE["rename"]))
+        df_recomendacao_modif = writable_copy(dim_tables[3].rename(columns=RECOMENDACAO_TABLE["rename"]))
         del dim_tables
         return [df_tipos_modif, df_aeronave_modif, df_fator_modif, df_recomendacao_modif]
     except Exception as e:
         logging.error(f"Error during dimension tables renaming: {e}")
         print(f"Error during dimension tables renaming: {e}")
+        raise
 
-@task(log_prints=True)
+@task(log_prints=True, **CACHE_OPTIONS)
+@memory_stage
+def load_dim_table(file_name: str) -> pd.DataFrame:
+    """
+    Loads one dimension table from the input directory, as soon as its file is ready. Used by the
+    pipelined flow, with `dim_table_tasks` setting the cache key of each table.
+
+    Args:
+        file_name (str): Name of the input file (e.g. 'aeronave.csv').
+
+    Returns:
+        pd.DataFrame: The loaded dimension table.
+    """
+    logging.info(f"Reading dimension table {file_name}...")
+    return read_input_table(file_name)
+
+@task(log_prints=True, **CACHE_OPTIONS)
+@memory_stage
+def rename_dim_table(dim_table: pd.DataFrame, mapping_name: str) -> pd.DataFrame:
+    """
+    Renames the columns of one dimension table with a mapping defined in constants.
+
+    Args:
+        dim_table (pd.DataFrame): The dimension table.
+        mapping_name (str): Name of the mapping constant (e.g. 'AERONAVE_RENAME_MAPPING').
+
+    Returns:
+        pd.DataFrame: The renamed dimension table.
+    """
+    return writable_copy(dim_table.rename(columns=constants[mapping_name].value))
+
+def dim_table_tasks(file_name: str, mapping_name: str) -> Tuple:
+    """
+    Returns the load and rename tasks of one dimension table, with cache keys on its own input file.
+
+    Args:
+        file_name (str): Name of the input file (e.g. 'aeronave.csv').
+        mapping_name (str): Name of its rename mapping constant.
+
+    Returns:
+        Tuple: (load task, rename task)
+    """
+    return (
+        load_dim_table.with_options(
+            name=f"load_dim_table-{file_name}",
+            cache_key_fn=input_hash_cache_key([file_name])),
+        rename_dim_table.with_options(
+            name=f"rename_dim_table-{file_name}",
+            cache_key_fn=input_hash_cache_key(
+                [file_name], [mapping_name], table_specs=[get_table_spec(CENIPA_DATASET, file_name)])))
+
+@task(log_prints=True,
+      cache_key_fn=input_hash_cache_key(
+          ["ocorrencia_tipo.csv"],
+          COERCION_CONSTANTS,
+          table_spec_output_files(TIPO_TABLE),
+          [TIPO_TABLE]),
+      **CACHE_OPTIONS)
+@memory_stage
 def type_cast_tipo_table(df_tipo_modif: pd.DataFrame):
     """
-    Applies type casting and formatting to the 'tipo' dimension table and saves it as a CSV file.
+    Applies type casting and formatting to the 'tipo' dimension table, as declared in TIPO_TABLE_SPEC,
+    and saves it in the output directory.
 
     Args:
         df_tipo_modif (pd.DataFrame): The modified 'tipo' dimension table DataFrame.
     """
     if df_tipo_modif is not None:
         try:
-            df_tipo_cast = df_tipo_modif.copy()
-            TIPO_STRING_COLUMNS = list(df_tipo_cast.columns.values)
-            TIPO_STRING_COLUMNS.remove('id_ocorrencia')
-            format_string(df_tipo_cast, TIPO_STRING_COLUMNS)
-            logging.info("Checking consistency after transformations...")
-            print("Checking consistency after transformations...")
-            check_inconsistences(df_tipo_cast)
+            df_tipo_cast = cast_table(df_tipo_modif, TIPO_TABLE)
             del df_tipo_modif
-            df_tipo_cast.to_csv(os.path.join(constants.OUTPUT_DIR_PATH.value, "br_cenipa_tipo_ocorrencia.csv"), index=False)
+            save_table_outputs(df_tipo_cast, TIPO_TABLE)
         except Exception as e:
             logging.error(f"Error during 'tipo' table type casting: {e}")
             print(f"Error during 'tipo' table type casting: {e}")
 
-@task(log_prints=True)
+@task(log_prints=True,
+      cache_key_fn=input_hash_cache_key(
+          ["aeronave.csv"],
+          ["AIRCRAFT_REGISTRY", "AERONAVE_REGISTRY_COLUMNS"] + COERCION_CONSTANTS,
+          table_spec_output_files(AERONAVE_TABLE),
+          [AERONAVE_TABLE]),
+      **CACHE_OPTIONS)
+@memory_stage
 def type_cast_aeronave_table(df_aeronave_modif: pd.DataFrame):
     """
-    Applies type casting and formatting to the 'aeronave' dimension table and saves it as a CSV file.
+    Applies type casting and formatting to the 'aeronave' dimension table, as declared in AERONAVE_TABLE_SPEC,
+    and saves it in the output directory.
+
+    If AIRCRAFT_REGISTRY is set, the aircraft attributes are saved once per aircraft in
+    'br_cenipa_aeronave_registro', 'br_cenipa_aeronave' keeps the per-occurrence columns and the
+    'id_aeronave' key, and the registrations with conflicting attributes are reported in
+    REPORT_DIR_PATH.
 
     Args:
         df_aeronave_modif (pd.DataFrame): The modified 'aeronave' dimension table DataFrame.
     """
     if df_aeronave_modif is not None:
         try:
-            df_aeronave_cast = df_aeronave_modif.copy()
-            format_string(df_aeronave_cast, constants.AERONAVE_STR_COLUMNS.value)
-            format_floats(df_aeronave_cast, constants.AERONAVE_INT_COLUMNS.value)
-            logging.info("Checking consistency after transformations...")
-            print("Checking consistency after transformations...")
-            check_inconsistences(df_aeronave_cast)
+            df_aeronave_cast = cast_table(df_aeronave_modif, AERONAVE_TABLE)
             del df_aeronave_modif
-            df_aeronave_cast.to_csv(os.path.join(constants.OUTPUT_DIR_PATH.value, "br_cenipa_aeronave.csv"), index=False)
+            save_table_outputs(df_aeronave_cast, AERONAVE_TABLE)
         except Exception as e:
             logging.error(f"Error during 'aeronave' table type casting: {e}")
             print(f"Error during 'aeronave' table type casting: {e}")
 
+@task(log_prints=True,
+      cache_key_fn=input_hash_cache_key(
+          ["fator_contribuinte.csv"],
+          COERCION_CONSTANTS,
+          table_spec_output_files(FATOR_TABLE),
+          [FATOR_TABLE]),
+      **CACHE_OPTIONS)
+@memory_stage
 def type_cast_fator_table(df_fator_modif: pd.DataFrame):
     """
-    Applies type casting and formatting to the 'fator contribuinte' dimension table and saves it as a CSV file.
+    Applies type casting and formatting to the 'fator contribuinte' dimension table, as declared in FATOR_TABLE_SPEC,
+    and saves it in the output directory.
 
     Args:
         df_fator_modif (pd.DataFrame): The modified 'fator contribuinte' dimension table DataFrame.
     """
     if df_fator_modif is not None:
         try:
-            df_fator_cast = df_fator_modif.copy()
-            FATOR_STRING_COLUMNS = list(df_fator_cast.columns.values)
-            FATOR_STRING_COLUMNS.remove('id_ocorrencia')
-            format_string(df_fator_cast, FATOR_STRING_COLUMNS)
-            logging.info("Checking consistency after transformations...")
-            print("Checking consistency after transformations...")
-            check_inconsistences(df_fator_cast)
+            df_fator_cast = cast_table(df_fator_modif, FATOR_TABLE)
             del df_fator_modif
-            df_fator_cast.to_csv(os.path.join(constants.OUTPUT_DIR_PATH.value, "br_cenipa_fator_contribuinte.csv"), index=False)
+            save_table_outputs(df_fator_cast, FATOR_TABLE)
         except Exception as e:
             logging.error(f"Error during 'fator contribuinte' table type casting: {e}")
             print(f"Error during 'fator contribuinte' table type casting: {e}")
 
-@task(log_prints=True)
+@task(log_prints=True,
+      cache_key_fn=input_hash_cache_key(
+          ["recomendacao.csv"],
+          COERCION_CONSTANTS,
+          table_spec_output_files(RECOMENDACAO_TABLE),
+          [RECOMENDACAO_TABLE]),
+      **CACHE_OPTIONS)
+@memory_stage
 def type_cast_recom_table(df_recomendacao_modif: pd.DataFrame):
     """
-    Applies type casting and formatting to the 'recomendacao' dimension table and saves it as a CSV file.
+    Applies type casting and formatting to the 'recomendacao' dimension table, as declared in RECOMENDACAO_TABLE_SPEC,
+    and saves it in the output directory.
 
     Args:
         df_recomendacao_modif (pd.DataFrame): The modified 'recomendacao' dimension table DataFrame.
     """
     if df_recomendacao_modif is not None:
         try:
-            df_recomendacao_cast = df_recomendacao_modif.copy()
-            format_string(df_recomendacao_cast, constants.RECOMENDACAO_STR_COLUMNS.value)
-            format_date(df_recomendacao_cast, constants.RECOMENDACAO_DATE_COLUMNS.value)
-            logging.info("Checking consistency after transformations...")
-            print("Checking consistency after transformations...")
-            check_inconsistences(df_recomendacao_cast)
+            df_recomendacao_cast = cast_table(df_recomendacao_modif, RECOMENDACAO_TABLE)
             del df_recomendacao_modif
-            df_recomendacao_cast.to_csv(os.path.join(constants.OUTPUT_DIR_PATH.value, "br_cenipa_recomendacao.csv"), index=False)
+            save_table_outputs(df_recomendacao_cast, RECOMENDACAO_TABLE)
         except Exception as e:
             logging.error(f"Error during 'recomendacao' table type casting: {e}")
             print(f"Error during 'recomendacao' table type casting: {e}")        
 
+@task(log_prints=True,
+      cache_key_fn=input_hash_cache_key(
+          ["recomendacao.csv"],
+          COERCION_CONSTANTS,
+          [os.path.join(constants.INDEX_DIR_PATH.value, constants.TEXT_INDEX_FILE.value),
+           os.path.join(constants.INDEX_DIR_PATH.value, constants.TEXT_INDEX_DOCUMENTS_FILE.value)],
+          [RECOMENDACAO_TABLE]),
+      **CACHE_OPTIONS)
+def build_recom_text_index():
+    """
+    Updates the full-text index of the 'recomendacao' descriptions (see `src/utils/text_index.py`)
+    in the index directory. Only new or changed recommendations are tokenized again.
+    """
+    try:
+        build_table_index(RECOMENDACAO_TABLE)
+    except Exception as e:
+        logging.error(f"Error building the text index: {e}")
+        print(f"Error building the text index: {e}")
+
+@task(log_prints=True)
+@memory_stage
+def transform_dataset_table(dataset: str, file_name: Optional[str]) -> Optional[str]:
+    """
+    Transforms one input file of a dataset as declared in its table spec (see DATASET_SPECS),
+    with the same steps as the CENIPA tasks: prepares the table (`prepare_table`), casts and
+    checks it (`cast_table`), saves its outputs (`save_table_outputs`, which also splits the
+    aircraft registry) and builds its index, if any (`build_table_index`).
+
+    Args:
+        dataset (str): Name of the dataset in DATASET_SPECS.
+        file_name (str, optional): Name of the input file, as returned by the download task.
+
+    Returns:
+        Optional[str]: The output table name, or None if the file was not downloaded or has no table spec.
+    """
+    if file_name is None:
+        return None
+    table_spec = get_table_spec(dataset, file_name)
+    if table_spec is None:
+        logging.info(f"No table spec for {dataset}/{file_name}. Skipping it.")
+        return None
+
+    dataframe = prepare_table(read_input_table(file_name, dataset_input_dir(dataset)), table_spec)
+    save_table_outputs(cast_table(dataframe, table_spec), table_spec)
+    del dataframe
+    build_table_index(table_spec)
+    return table_spec["output"]
+
+@task
+def publish_outputs():
+    """
+    Marks the outputs as published by (re)writing PUBLISH_MARKER_FILE in the output directory,
+    with the publication time and the table names. The local query service reloads the tables
+    and drops its response cache when the marker changes.
+
+    The memory high-water marks of the stages run since the last publication, if any, are merged
+    into the 'memoria_etapas' report: stages skipped by the cache keep their last records.
+    """
+    stages = memory_report(clear=True)
+    if not stages.empty:
+        previous_path = report_path("memoria_etapas")
+        previous = pd.read_csv(previous_path) if os.path.exists(previous_path) else None
+        save_report(merge_memory_report(stages, previous), "memoria_etapas")
+    marker_path = os.path.join(constants.OUTPUT_DIR_PATH.value, constants.PUBLISH_MARKER_FILE.value)
+    temp_path = f"{marker_path}.tmp"
+    with open(temp_path, "w", encoding="utf-8") as f:
+        json.dump({
+            "published_at": pd.Timestamp.now(tz="UTC").isoformat(),
+            "tables": list_output_tables()
+        }, f)
+    os.replace(temp_path, marker_path)
+    logging.info(f"Outputs published: {marker_path}")
+
 @task
 def upload_output():
     """
-    Uploads all CSV files from the output directory to Google Cloud Storage in chunks.
-    Each CSV is split into multiple Parquet files if necessary.
+    Uploads all tables from the output directory to Google Cloud Storage in chunks.
+    Each table is split into multiple Parquet files if necessary. Tables saved with typed
+    dates and times (Parquet) are read from Parquet, the others from CSV.
+
+    If PARTITIONED_OUTPUT is set, the tables are instead laid out as 'ano=YYYY/sigla_uf=XX/'
+    partitions, using the occurrence date and state from the fact table. Tables not keyed by
+    occurrence (e.g. the aircraft registry) are uploaded in chunks.
 
     Returns:
         None
     """
     try:
         folder = constants.OUTPUT_DIR_PATH.value
-        files_names = [f for f in os.listdir(folder) if os.path.isfile(os.path.join(folder, f))]
-        logging.info(f"Found {len(files_names)} files in output folder: {folder}")
+        table_names = list_output_tables()
+        logging.info(f"Found {len(table_names)} tables in output folder: {folder}")
 
-        for file_name in files_names:
+        partition_keys = None
+        if settings.PARTITIONED_OUTPUT:
+            if "br_cenipa_ocorrencia" in table_names:
+                partition_keys = build_partition_keys(read_output_table("br_cenipa_ocorrencia"))
+            else:
+                logging.warning("Fact table not found in output folder. Uploading tables without partitioning.")
+
+        for table_name in table_names:
             try:
-                if file_name.endswith(".csv"):
-                    file_path = os.path.join(folder, file_name)
-                    logging.info(f"Uploading {file_name} to GCS in chunks...")
+                dataframe = read_output_table(table_name)
+                if partition_keys is not None and "id_ocorrencia" in dataframe.columns:
+                    logging.info(f"Uploading {table_name} to GCS in partitions...")
+                    upload_partitioned_dataframe_to_gcs(
+                        add_partition_columns(dataframe, partition_keys),
+                        f"output/{table_name}",
+                        os.getenv("GCP_BUCKET", "br_cenipa")
+                    )
+                else:
+                    logging.info(f"Uploading {table_name} to GCS in chunks...")
                     upload_dataframe_chunks_to_gcs(
-                        pd.read_csv(file_path),
-                        f"output/{file_name.replace('.csv','')}",
+                        dataframe,
+                        f"output/{table_name}",
                         os.getenv("GCP_BUCKET", "br_cenipa")
                     )
-                    logging.info(f"File {file_name} uploaded successfully.")
+                logging.info(f"Table {table_name} uploaded successfully.")
             except Exception as e:
-                logging.error(f"Error uploading {file_name} to GCS: {e}")
+                logging.error(f"Error uploading {table_name} to GCS: {e}")
     except Exception as e:
-        logging.error(f"Error listing files for upload: {e}")
\ No newline at end of file
+        logging.error(f"Error listing files for upload: {e}")
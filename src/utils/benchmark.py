@@ -0,0 +1,592 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmarks for the br_cenipa project.
+
+This module generates synthetic CENIPA tables, shaped like the raw CSV files published on
+dados.gov.br, and measures the cost of the pipeline's storage and transformation options on them.
+
+Usage:
+    python -m src.utils.benchmark {parquet,coercion,plan,partitions,serializers,memory} [--scale N]
+"""
+
+import io
+import os
+import sys
+import time
+import logging
+import argparse
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from typing import Dict, List
+
+from src.constants import constants
+from src.utils.utils import (
+    get_parquet_write_options,
+    write_parquet_buffer,
+    transform_lat_long,
+    format_floats,
+    format_bools,
+    format_time,
+    coerce_floats,
+    coerce_bools,
+    coerce_time,
+    format_string,
+    format_date,
+    coerce_columns
+)
+from src.utils.plan import apply_table_spec, apply_table_spec_partitioned
+
+BASE_NUM_OCORRENCIAS = 10_000
+
+UFS = ["SP", "RJ", "MG", "PR", "RS", "SC", "GO", "MT", "MS", "BA", "PA", "AM", "DF", "***"]
+CLASSIFICACOES = ["ACIDENTE", "INCIDENTE", "INCIDENTE GRAVE"]
+FABRICANTES = ["CESSNA AIRCRAFT", "EMBRAER", "PIPER AIRCRAFT", "BEECH AIRCRAFT", "ROBINSON HELICOPTER", "AIRBUS"]
+PALAVRAS = [
+    "divulgar", "os", "ensinamentos", "colhidos", "nesta", "investigação", "aos", "operadores",
+    "de", "aeronaves", "com", "objetivo", "reforçar", "importância", "manutenção", "procedimentos",
+    "segurança", "voo", "pista", "treinamento", "tripulação", "aeródromo", "combustível", "motor"]
+
+def make_synthetic_tables(scale:int=1, seed:int=42) -> Dict[str, pd.DataFrame]:
+    """
+    Generates synthetic raw CENIPA tables with the same columns, separators and dirty values
+    (e.g. '***' placeholders, degree symbols, 'SIM'/'NÃO' flags) as the published CSV files.
+
+    Args:
+        scale (int, optional): Multiplier over BASE_NUM_OCORRENCIAS occurrences. Defaults to 1.
+        seed (int, optional): Random seed. Defaults to 42.
+
+    Returns:
+        Dict[str, pd.DataFrame]: Raw tables keyed by their input file name (e.g. 'ocorrencia.csv').
+    """
+    rng = np.random.default_rng(seed)
+    n = BASE_NUM_OCORRENCIAS * scale
+    codigos = np.arange(10_000, 10_000 + n)
+
+    def choice(values, size, missing=0.0):
+        result = rng.choice(np.array(values, dtype=object), size=size)
+        if missing:
+            result[rng.random(size) < missing] = np.nan
+        return result
+
+    def dates(size, missing=0.0):
+        days = pd.Timestamp("2007-01-01") + pd.to_timedelta(rng.integers(0, 6000, size), unit="D")
+        result = days.strftime("%d/%m/%Y").to_numpy(dtype=object, copy=True)
+        if missing:
+            result[rng.random(size) < missing] = np.nan
+        return result
+
+    def coordinates(size, low, high):
+        values = rng.uniform(low, high, size)
+        result = np.array([f"{value:.6f}" for value in values], dtype=object)
+        result[rng.random(size) < 0.05] = "-**.******"
+        degrees = rng.random(size) < 0.05
+        result[degrees] = result[degrees] + "°"
+        result[rng.random(size) < 0.05] = np.nan
+        return result
+
+    ocorrencia = pd.DataFrame({
+        "codigo_ocorrencia": codigos,
+        "codigo_ocorrencia1": codigos,
+        "codigo_ocorrencia2": codigos,
+        "codigo_ocorrencia3": codigos,
+        "codigo_ocorrencia4": codigos,
+        "ocorrencia_classificacao": choice(CLASSIFICACOES, n),
+        "ocorrencia_latitude": coordinates(n, -33.0, 4.0),
+        "ocorrencia_longitude": coordinates(n, -73.0, -35.0),
+        "ocorrencia_cidade": choice(["SÃO PAULO", "RIO DE JANEIRO", "BELO HORIZONTE", "SORRISO", "GOIÂNIA"], n),
+        "ocorrencia_uf": choice(UFS, n),
+        "ocorrencia_pais": "BRASIL",
+        "ocorrencia_aerodromo": choice(["SBSP", "SBRJ", "SBBH", "SBGO", "****"], n),
+        "ocorrencia_dia": dates(n),
+        "ocorrencia_hora": [f"{h:02d}:{m:02d}:00" for h, m in zip(rng.integers(0, 24, n), rng.integers(0, 60, n))],
+        "investigacao_aeronave_liberada": choice(["SIM", "NÃO", "***"], n),
+        "investigacao_status": choice(["FINALIZADA", "ATIVA"], n, missing=0.1),
+        "divulgacao_relatorio_numero": choice(["A-001/CENIPA/2019", "IG-123/CENIPA/2020", "***"], n),
+        "divulgacao_relatorio_publicado": choice(["SIM", "NÃO"], n),
+        "divulgacao_dia_publicacao": dates(n, missing=0.6),
+        "total_recomendacoes": rng.integers(0, 5, n),
+        "total_aeronaves_envolvidas": rng.integers(1, 3, n),
+        "ocorrencia_saida_pista": choice(["SIM", "NÃO"], n)
+    })
+
+    n_tipo = int(n * 1.1)
+    tipo = pd.DataFrame({
+        "codigo_ocorrencia1": rng.choice(codigos, n_tipo),
+        "ocorrencia_tipo": choice(["FALHA DO MOTOR EM VOO", "PERDA DE CONTROLE EM VOO", "EXCURSÃO DE PISTA"], n_tipo),
+        "ocorrencia_tipo_categoria": choice(["FALHA OU MAU FUNCIONAMENTO DO MOTOR", "PERDA DE CONTROLE EM VOO"], n_tipo),
+        "taxonomia_tipo_icao": choice(["SCF-PP", "LOC-I", "RE"], n_tipo)
+    })
+
+    n_aeronave = int(n * 1.05)
+    matriculas = np.array([f"PR{i:03d}" for i in rng.integers(0, max(n // 3, 1), n_aeronave)], dtype=object)
+    aeronave = pd.DataFrame({
+        "codigo_ocorrencia2": rng.choice(codigos, n_aeronave),
+        "aeronave_matricula": matriculas,
+        "aeronave_operador_categoria": choice(["***", "PARTICULAR", "TÁXI AÉREO"], n_aeronave),
+        "aeronave_tipo_veiculo": choice(["AVIÃO", "HELICÓPTERO", "ULTRALEVE"], n_aeronave),
+        "aeronave_fabricante": choice(FABRICANTES, n_aeronave),
+        "aeronave_modelo": choice(["172", "EMB-202", "PA-34-200T", "R44 II"], n_aeronave),
+        "aeronave_tipo_icao": choice(["C172", "IPAN", "PA34", "R44"], n_aeronave),
+        "aeronave_motor_tipo": choice(["PISTÃO", "JATO", "TURBOÉLICE"], n_aeronave),
+        "aeronave_motor_quantidade": choice(["MONOMOTOR", "BIMOTOR"], n_aeronave),
+        "aeronave_pmd": rng.integers(500, 80_000, n_aeronave),
+        "aeronave_pmd_categoria": rng.integers(500, 80_000, n_aeronave),
+        "aeronave_assentos": rng.integers(1, 200, n_aeronave).astype(float),
+        "aeronave_ano_fabricacao": rng.integers(1950, 2023, n_aeronave),
+        "aeronave_pais_fabricante": choice(["BRASIL", "ESTADOS UNIDOS", "FRANÇA"], n_aeronave),
+        "aeronave_pais_registro": "BRASIL",
+        "aeronave_registro_categoria": choice(["AVIÃO", "HELICÓPTERO"], n_aeronave),
+        "aeronave_registro_segmento": choice(["PARTICULAR", "AGRÍCOLA", "***"], n_aeronave),
+        "aeronave_voo_origem": choice(["FORA DE AERODROMO", "SBSP", "***"], n_aeronave),
+        "aeronave_voo_destino": choice(["FORA DE AERODROMO", "SBRJ", "***"], n_aeronave),
+        "aeronave_fase_operacao": choice(["POUSO", "DECOLAGEM", "CRUZEIRO"], n_aeronave),
+        "aeronave_tipo_operacao": choice(["PRIVADA", "AGRÍCOLA", "INSTRUÇÃO"], n_aeronave),
+        "aeronave_nivel_dano": choice(["NENHUM", "LEVE", "SUBSTANCIAL", "DESTRUÍDA"], n_aeronave),
+        "aeronave_fatalidades_total": rng.integers(0, 3, n_aeronave)
+    })
+
+    n_fator = int(n * 1.5)
+    fator = pd.DataFrame({
+        "codigo_ocorrencia3": rng.choice(codigos, n_fator),
+        "fator_nome": choice(["JULGAMENTO DE PILOTAGEM", "PLANEJAMENTO DE VOO", "SUPERVISÃO GERENCIAL"], n_fator),
+        "fator_aspecto": choice(["DESEMPENHO DO SER HUMANO", "ASPECTO OPERACIONAL"], n_fator),
+        "fator_condicionante": choice(["OPERAÇÃO DA AERONAVE", "***"], n_fator),
+        "fator_area": choice(["FATOR OPERACIONAL", "FATOR HUMANO"], n_fator)
+    })
+
+    n_recomendacao = int(n * 0.3)
+    recomendacao = pd.DataFrame({
+        "codigo_ocorrencia4": rng.choice(codigos, n_recomendacao),
+        "recomendacao_numero": [f"IG-{i:06d}/CENIPA/2020-01" for i in range(n_recomendacao)],
+        "recomendacao_dia_assinatura": dates(n_recomendacao),
+        "recomendacao_dia_encaminhamento": dates(n_recomendacao),
+        "recomendacao_dia_feedback": dates(n_recomendacao, missing=0.4),
+        "recomendacao_conteudo": [
+            " ".join(rng.choice(PALAVRAS, size)).capitalize() + "."
+            for size in rng.integers(20, 120, n_recomendacao)],
+        "recomendacao_status": choice(["CUMPRIDA", "NÃO CUMPRIDA", "AGUARDANDO RESPOSTA"], n_recomendacao),
+        "recomendacao_destinatario_sigla": choice(["ANAC", "DECEA", "SAC"], n_recomendacao),
+        "recomendacao_destinatario": choice(["AGÊNCIA NACIONAL DE AVIAÇÃO CIVIL", "DEPARTAMENTO DE CONTROLE DO ESPAÇO AÉREO"], n_recomendacao)
+    })
+
+    return {
+        "ocorrencia.csv": ocorrencia,
+        "ocorrencia_tipo.csv": tipo,
+        "aeronave.csv": aeronave,
+        "fator_contribuinte.csv": fator,
+        "recomendacao.csv": recomendacao
+    }
+
+def time_call(function, *args, repeat:int=3, **kwargs):
+    """
+    Calls a function `repeat` times and returns its best wall time and last result.
+
+    Args:
+        function (callable): The function to time.
+        repeat (int, optional): Number of calls. Defaults to 3.
+
+    Returns:
+        tuple: (best time in seconds, result of the last call)
+    """
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function(*args, **kwargs)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+# Options applied uniformly to every column, except for "configured" (PARQUET_WRITE_OPTIONS as is)
+# and "pandas_default" (the former `DataFrame.to_parquet` defaults).
+PARQUET_BENCHMARK_OPTIONS = {
+    "pandas_default": None,
+    "snappy": {"compression": "snappy", "compression_level": None, "use_dictionary": True},
+    "zstd_1": {"compression": "zstd", "compression_level": 1, "use_dictionary": True},
+    "zstd_3": {"compression": "zstd", "compression_level": 3, "use_dictionary": True},
+    "zstd_9": {"compression": "zstd", "compression_level": 9, "use_dictionary": True},
+    "zstd_3_no_dictionary": {"compression": "zstd", "compression_level": 3, "use_dictionary": False},
+    "configured": {}
+}
+
+def benchmark_parquet_options(tables:Dict[str, pd.DataFrame], options:Dict[str, dict]=PARQUET_BENCHMARK_OPTIONS,
+                              repeat:int=3) -> pd.DataFrame:
+    """
+    Measures file size, write time and read time of each Parquet write option on each table.
+
+    Each option other than "configured" is applied to every column, overriding the per-column
+    entries of PARQUET_WRITE_OPTIONS; `None` means the `pyarrow` defaults.
+
+    Args:
+        tables (Dict[str, pd.DataFrame]): Tables keyed by output table name.
+        options (Dict[str, dict], optional): Option overrides keyed by label.
+        repeat (int, optional): Number of timed runs (the best one is kept). Defaults to 3.
+
+    Returns:
+        pd.DataFrame: One row per table and option, with size in bytes and times in seconds.
+    """
+    results = []
+    for table_name, dataframe in tables.items():
+        arrow_table = pa.Table.from_pandas(dataframe, preserve_index=False)
+        for label, overrides in options.items():
+            if overrides is None:
+                write = lambda: write_parquet_buffer(arrow_table, {})
+            else:
+                if overrides:
+                    overrides = {**overrides, "columns": {
+                        col: overrides for col in arrow_table.column_names}}
+                write_options = get_parquet_write_options(table_name, arrow_table.column_names, overrides)
+                write = lambda: write_parquet_buffer(arrow_table, write_options)
+            write_time, buffer = time_call(write, repeat=repeat)
+            contents = buffer.getvalue()
+            read_time, _ = time_call(lambda: pq.read_table(io.BytesIO(contents)), repeat=repeat)
+            results.append({
+                "table": table_name,
+                "option": label,
+                "size_bytes": len(contents),
+                "write_seconds": round(write_time, 4),
+                "read_seconds": round(read_time, 4)
+            })
+    return pd.DataFrame(results)
+
+def synthetic_output_tables(scale:int=1) -> Dict[str, pd.DataFrame]:
+    """
+    Generates synthetic tables with the output column names, keyed by output table name.
+
+    Args:
+        scale (int, optional): Multiplier over BASE_NUM_OCORRENCIAS occurrences. Defaults to 1.
+
+    Returns:
+        Dict[str, pd.DataFrame]: Renamed synthetic tables.
+    """
+    raw_tables = make_synthetic_tables(scale)
+    fact_columns = [f"codigo_ocorrencia{i}" for i in range(1, 5)]
+    return {
+        "br_cenipa_ocorrencia": raw_tables["ocorrencia.csv"]
+            .drop(columns=fact_columns)
+            .rename(columns=constants.RENAME_MAPPING.value),
+        "br_cenipa_tipo_ocorrencia": raw_tables["ocorrencia_tipo.csv"]
+            .rename(columns=constants.TIPO_RENAME_MAPPING.value),
+        "br_cenipa_aeronave": raw_tables["aeronave.csv"]
+            .rename(columns=constants.AERONAVE_RENAME_MAPPING.value),
+        "br_cenipa_fator_contribuinte": raw_tables["fator_contribuinte.csv"]
+            .rename(columns=constants.FATOR_RENAME_MAPPING.value),
+        "br_cenipa_recomendacao": raw_tables["recomendacao.csv"]
+            .rename(columns=constants.RECOMENDACAO_RENAME_MAPPING.value)
+    }
+
+def benchmark_coercion_kernels(scale:int=1, repeat:int=3) -> pd.DataFrame:
+    """
+    Compares the legacy `format_floats`, `format_bools` and `format_time` helpers with the
+    `coerce_floats`, `coerce_bools` and `coerce_time` kernels on the synthetic fact table,
+    reporting their best times. Their parity is checked by tests/test_coercion.py.
+
+    Args:
+        scale (int, optional): Multiplier over BASE_NUM_OCORRENCIAS occurrences. Defaults to 1.
+        repeat (int, optional): Number of timed runs (the best one is kept). Defaults to 3.
+
+    Returns:
+        pd.DataFrame: One row per kernel, with times in seconds and speedup.
+    """
+    df_fact = synthetic_output_tables(scale)["br_cenipa_ocorrencia"]
+    for col in constants.FLOAT_COLUMNS.value:
+        df_fact[col] = df_fact[col]\
+            .astype(str)\
+            .str.replace(r'\*+', '0', regex=True)\
+            .replace(r'°', '', regex=True)\
+            .apply(transform_lat_long)
+
+    cases = [
+        ("floats", constants.FLOAT_COLUMNS.value, format_floats, coerce_floats),
+        ("bools", constants.BOOL_COLUMNS.value, format_bools, coerce_bools),
+        ("time", constants.TIMESTAMP_COLUMNS.value, format_time, coerce_time)
+    ]
+    results = []
+    for kernel, columns, legacy_helper, coerce in cases:
+        def run_legacy():
+            dataframe = df_fact[columns].copy()
+            legacy_helper(dataframe, columns)
+            return dataframe
+
+        def run_kernel():
+            return pd.DataFrame({col: coerce(df_fact[col]) for col in columns})
+
+        legacy_seconds, _ = time_call(run_legacy, repeat=repeat)
+        kernel_seconds, _ = time_call(run_kernel, repeat=repeat)
+        results.append({
+            "kernel": kernel,
+            "legacy_seconds": round(legacy_seconds, 4),
+            "kernel_seconds": round(kernel_seconds, 4),
+            "speedup": round(legacy_seconds / max(kernel_seconds, 1e-9), 1)
+        })
+    return pd.DataFrame(results)
+
+def type_cast_sequentially(table_name:str, dataframe:pd.DataFrame):
+    """
+    Type casts a table with the per-helper sequence used before table specs, in place.
+
+    Args:
+        table_name (str): Name of the output table.
+        dataframe (pd.DataFrame): The renamed table.
+    """
+    if table_name == "br_cenipa_ocorrencia":
+        for col in constants.FLOAT_COLUMNS.value:
+            dataframe[col] = dataframe[col]\
+                .astype(str)\
+                .str.replace(r'\*+', '0', regex=True)\
+                .replace(r'°', '', regex=True)\
+                .apply(transform_lat_long)
+        coerce_columns(dataframe, constants.FLOAT_COLUMNS.value, coerce_floats)
+        format_string(dataframe, constants.STRING_COLUMNS.value)
+        format_date(dataframe, constants.DATE_COLUMNS.value)
+        format_time(dataframe, constants.TIMESTAMP_COLUMNS.value)
+        coerce_columns(dataframe, constants.BOOL_COLUMNS.value, coerce_bools)
+    elif table_name == "br_cenipa_aeronave":
+        format_string(dataframe, constants.AERONAVE_STR_COLUMNS.value)
+        coerce_columns(dataframe, constants.AERONAVE_INT_COLUMNS.value, coerce_floats)
+    elif table_name == "br_cenipa_recomendacao":
+        format_string(dataframe, constants.RECOMENDACAO_STR_COLUMNS.value)
+        format_date(dataframe, constants.RECOMENDACAO_DATE_COLUMNS.value)
+    else:
+        format_string(dataframe, [col for col in dataframe.columns if col != "id_ocorrencia"])
+
+TABLE_SPECS = {
+    "br_cenipa_ocorrencia": "FACT_TABLE_SPEC",
+    "br_cenipa_tipo_ocorrencia": "TIPO_TABLE_SPEC",
+    "br_cenipa_aeronave": "AERONAVE_TABLE_SPEC",
+    "br_cenipa_fator_contribuinte": "FATOR_TABLE_SPEC",
+    "br_cenipa_recomendacao": "RECOMENDACAO_TABLE_SPEC"
+}
+
+def benchmark_table_plans(scale:int=1, repeat:int=3) -> pd.DataFrame:
+    """
+    Compares the sequential type casting helpers with the compiled table specs on the synthetic
+    tables, reporting their best times. Their parity is checked by tests/test_plan.py.
+
+    Args:
+        scale (int, optional): Multiplier over BASE_NUM_OCORRENCIAS occurrences. Defaults to 1.
+        repeat (int, optional): Number of timed runs (the best one is kept). Defaults to 3.
+
+    Returns:
+        pd.DataFrame: One row per table, with times in seconds and speedup.
+    """
+    results = []
+    for table_name, dataframe in synthetic_output_tables(scale).items():
+        def run_sequential():
+            result = dataframe.copy()
+            type_cast_sequentially(table_name, result)
+            return result
+
+        def run_plan():
+            result = dataframe.copy()
+            apply_table_spec(result, constants[TABLE_SPECS[table_name]].value, temporal_output="string")
+            return result
+
+        sequential_seconds, _ = time_call(run_sequential, repeat=repeat)
+        plan_seconds, _ = time_call(run_plan, repeat=repeat)
+        results.append({
+            "table": table_name,
+            "sequential_seconds": round(sequential_seconds, 4),
+            "plan_seconds": round(plan_seconds, 4),
+            "speedup": round(sequential_seconds / max(plan_seconds, 1e-9), 1)
+        })
+    return pd.DataFrame(results)
+
+def benchmark_fact_partitions(scale:int=1, repeat:int=3, workers:List[int]=None) -> pd.DataFrame:
+    """
+    Compares the fact table spec applied in a single process with the partitioned process pool
+    execution, reporting their best times. Their parity is checked by tests/test_fact_partitions.py.
+
+    Args:
+        scale (int, optional): Multiplier over BASE_NUM_OCORRENCIAS occurrences. Defaults to 1.
+        repeat (int, optional): Number of timed runs (the best one is kept). Defaults to 3.
+        workers (List[int], optional): Process counts to try. Defaults to 2, 4 and the CPU count.
+
+    Returns:
+        pd.DataFrame: One row per process count, with times in seconds and speedup.
+    """
+    dataframe = synthetic_output_tables(scale)["br_cenipa_ocorrencia"]
+    spec = constants.FACT_TABLE_SPEC.value
+
+    def run_single():
+        result = dataframe.copy()
+        apply_table_spec(result, spec)
+        return result
+
+    single_seconds, _ = time_call(run_single, repeat=repeat)
+    results = []
+    for count in workers or sorted({2, 4, os.cpu_count() or 1}):
+        partitioned_seconds, _ = time_call(
+            apply_table_spec_partitioned, dataframe, spec, count, repeat=repeat)
+        results.append({
+            "rows": len(dataframe),
+            "workers": count,
+            "single_process_seconds": round(single_seconds, 4),
+            "partitioned_seconds": round(partitioned_seconds, 4),
+            "speedup": round(single_seconds / max(partitioned_seconds, 1e-9), 2)
+        })
+    return pd.DataFrame(results)
+
+def benchmark_result_serializers(scale:int=1, repeat:int=3) -> pd.DataFrame:
+    """
+    Compares Prefect's pickle result serializer with the Arrow IPC serializer on the DataFrames
+    passed between the transform tasks: the fact table and the list of dimension tables.
+    Their round trip is checked by tests/test_serializers.py.
+
+    Args:
+        scale (int, optional): Multiplier over BASE_NUM_OCORRENCIAS occurrences. Defaults to 1.
+        repeat (int, optional): Number of timed runs (the best one is kept). Defaults to 3.
+
+    Returns:
+        pd.DataFrame: One row per (result, serializer), with dump/load times in seconds and
+        serialized size in MiB.
+    """
+    from prefect.serializers import PickleSerializer
+    from src.utils.serializers import ArrowSerializer
+
+    raw_tables = make_synthetic_tables(scale)
+    results_to_serialize = {
+        "fact_table": raw_tables["ocorrencia.csv"],
+        "dim_tables": [raw_tables[name] for name in [
+            "ocorrencia_tipo.csv", "aeronave.csv", "fator_contribuinte.csv", "recomendacao.csv"]]
+    }
+    serializers = {
+        "pickle": PickleSerializer(),
+        "arrow (uncompressed)": ArrowSerializer(compression=None),
+        "arrow (lz4)": ArrowSerializer(compression="lz4"),
+        "arrow (zstd)": ArrowSerializer(compression="zstd")
+    }
+    results = []
+    for result_name, obj in results_to_serialize.items():
+        for serializer_name, serializer in serializers.items():
+            dump_seconds, blob = time_call(serializer.dumps, obj, repeat=repeat)
+            load_seconds, _ = time_call(serializer.loads, blob, repeat=repeat)
+            results.append({
+                "result": result_name,
+                "serializer": serializer_name,
+                "dump_seconds": round(dump_seconds, 4),
+                "load_seconds": round(load_seconds, 4),
+                "size_mib": round(len(blob) / 1024 ** 2, 2)
+            })
+    return pd.DataFrame(results)
+
+def run_transform_stages(scale:int) -> tuple:
+    """
+    Spawned process: runs the fact and dimension transform stages on the synthetic tables, as the
+    transform flow does, and sends back their memory records. Constants are read from the
+    environment set by `benchmark_transform_memory`.
+
+    Args:
+        scale (int): Multiplier over BASE_NUM_OCORRENCIAS occurrences.
+
+    Returns:
+        tuple: Whether copy-on-write was on, and the memory report of the stages.
+    """
+    import contextlib
+    from src.tasks import transform
+    from src.utils.memory import copy_on_write_enabled, enable_copy_on_write, memory_report
+
+    # Enabled as the flow entrypoint does
+    enable_copy_on_write()
+    logging.getLogger().setLevel(logging.ERROR)
+    raw_tables = make_synthetic_tables(scale)
+    with contextlib.redirect_stdout(io.StringIO()):
+        fact_table = transform.check_fact_table.fn(raw_tables.pop("ocorrencia.csv"))
+        transform.type_cast_fact_table.fn(fact_table)
+        del fact_table
+        dim_tables = transform.renaming_dim_tables.fn([raw_tables.pop(name) for name in transform.DIM_TABLES_FILES])
+        type_cast_tasks = [
+            transform.type_cast_tipo_table,
+            transform.type_cast_aeronave_table,
+            transform.type_cast_fator_table,
+            transform.type_cast_recom_table]
+        for type_cast_task, dim_table in zip(type_cast_tasks, dim_tables):
+            type_cast_task.fn(dim_table)
+    return copy_on_write_enabled(), memory_report()
+
+def benchmark_transform_memory(scale:int=1) -> pd.DataFrame:
+    """
+    Compares the memory high-water mark of each transform stage with and without copy-on-write
+    (COPY_ON_WRITE). Each mode runs in a fresh process, so their peak RSS don't mix, and writes
+    its outputs to a temporary directory. The outputs of both modes are compared in tests/test_memory.py.
+
+    Args:
+        scale (int, optional): Multiplier over BASE_NUM_OCORRENCIAS occurrences. Defaults to 1.
+
+    Returns:
+        pd.DataFrame: One row per stage, with the peak RSS and its increase over the RSS at the
+        stage start (MiB) and the time (s) of each mode, and a last row with the highest of each (total time).
+    """
+    import tempfile
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor
+
+    context = multiprocessing.get_context("spawn")
+    reports = {}
+    with tempfile.TemporaryDirectory() as folder:
+        for copy_on_write in [False, True]:
+            mode = "cow" if copy_on_write else "copy"
+            output_dir = os.path.join(folder, mode)
+            os.makedirs(output_dir)
+            environment = {
+                "COPY_ON_WRITE": str(copy_on_write).lower(),
+                "MEMORY_PROFILE": "rss",
+                "TASK_CACHE": "false",
+                "FACT_TABLE_WORKERS": "1",
+                "OUTPUT_DIR_PATH": output_dir,
+                "REPORT_DIR_PATH": os.path.join(folder, f"{mode}_relatorios")}
+            previous = {name: os.environ.get(name) for name in environment}
+            os.environ.update(environment)
+            try:
+                with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+                    enabled, report = executor.submit(run_transform_stages, scale).result()
+            finally:
+                for name, value in previous.items():
+                    if value is None:
+                        os.environ.pop(name, None)
+                    else:
+                        os.environ[name] = value
+            if copy_on_write and not enabled:
+                logging.warning("Copy-on-write could not be enabled.")
+            if not copy_on_write and enabled:
+                logging.warning("Copy-on-write is always on in this pandas version; both modes are equal.")
+            reports[mode] = report.set_index("etapa")
+
+    stages = reports["copy"].index
+    report = pd.DataFrame({"etapa": stages})
+    for mode in ["copy", "cow"]:
+        stage_report = reports[mode].reindex(stages)
+        report[f"{mode}_peak_mib"] = stage_report["pico_mib"].to_numpy()
+        report[f"{mode}_increase_mib"] = (stage_report["pico_mib"] - stage_report["inicio_mib"]).round(1).to_numpy()
+    for mode in ["copy", "cow"]:
+        report[f"{mode}_seconds"] = reports[mode].reindex(stages)["segundos"].to_numpy()
+    total = report.drop(columns="etapa").max().to_frame().T
+    total.insert(0, "etapa", "maximo")
+    total[["copy_seconds", "cow_seconds"]] = report[["copy_seconds", "cow_seconds"]].sum().round(3).to_numpy()
+    return pd.concat([report, total], ignore_index=True)
+
+BENCHMARKS = {
+    "parquet": lambda args: benchmark_parquet_options(synthetic_output_tables(args.scale), repeat=args.repeat),
+    "coercion": lambda args: benchmark_coercion_kernels(args.scale, repeat=args.repeat),
+    "plan": lambda args: benchmark_table_plans(args.scale, repeat=args.repeat),
+    "partitions": lambda args: benchmark_fact_partitions(args.scale, repeat=args.repeat),
+    "serializers": lambda args: benchmark_result_serializers(args.scale, repeat=args.repeat),
+    "memory": lambda args: benchmark_transform_memory(args.scale)
+}
+
+def main(argv:List[str]=None):
+    """
+    Runs a benchmark from the command line and prints its report.
+    """
+    parser = argparse.ArgumentParser(description="br_cenipa benchmarks")
+    parser.add_argument("benchmark", choices=list(BENCHMARKS))
+    parser.add_argument("--scale", type=int, default=1)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    pd.set_option("display.width", 200)
+    print(BENCHMARKS[args.benchmark](args).to_string(index=False))
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
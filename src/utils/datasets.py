@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+"""
+Dataset specs for the br_cenipa project.
+
+This module resolves the dataset specs declared in DATASET_SPECS (dados.gov.br dataset id, input
+directory and per-file table specs), and provides the HTTP session shared by every dataset
+download in a flow run.
+"""
+
+import os
+import requests
+from functools import lru_cache
+from typing import Optional
+from requests.adapters import HTTPAdapter
+
+from src.constants import constants, settings
+
+def get_dataset_spec(dataset:str) -> dict:
+    """
+    Returns the spec of a dataset.
+
+    Args:
+        dataset (str): Name of the dataset in DATASET_SPECS (e.g. 'br_cenipa').
+
+    Returns:
+        dict: The dataset spec.
+    """
+    if dataset not in constants.DATASET_SPECS.value:
+        raise ValueError(f"Unknown dataset '{dataset}'. Available: {', '.join(constants.DATASET_SPECS.value)}.")
+    return constants.DATASET_SPECS.value[dataset]
+
+def dataset_input_dir(dataset:str) -> str:
+    """
+    Returns the input directory of a dataset: its 'input_dir', or a subdirectory of INPUT_DIR_PATH
+    named after the dataset, so files with the same name in different datasets don't collide.
+
+    Args:
+        dataset (str): Name of the dataset.
+
+    Returns:
+        str: The input directory.
+    """
+    return get_dataset_spec(dataset).get("input_dir") or os.path.join(constants.INPUT_DIR_PATH.value, dataset)
+
+def get_table_spec(dataset:str, file_name:str) -> Optional[dict]:
+    """
+    Returns the table spec of an input file of a dataset, or None if the file is not transformed.
+
+    Args:
+        dataset (str): Name of the dataset.
+        file_name (str): Name of the input file (e.g. 'aeronave.csv').
+
+    Returns:
+        Optional[dict]: The table spec.
+    """
+    return get_dataset_spec(dataset)["tables"].get(file_name)
+
+@lru_cache(maxsize=None)
+def http_session() -> requests.Session:
+    """
+    Returns the HTTP session shared by the dataset downloads. Its connection pool holds up to
+    HTTP_POOL_SIZE connections per host and blocks when they are all in use.
+
+    Returns:
+        requests.Session: The shared session.
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=settings.HTTP_POOL_SIZE,
+        pool_maxsize=settings.HTTP_POOL_SIZE,
+        pool_block=True)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
@@ -0,0 +1,208 @@
+# -*- coding: utf-8 -*-
+"""
+Memory usage of the transform stages for the br_cenipa project.
+
+This module enables pandas copy-on-write for the transform flows (COPY_ON_WRITE, set by the flow
+entrypoint), so tables are no longer copied defensively between stages, and records the memory high-water mark of each
+stage (MEMORY_PROFILE).
+"""
+
+import sys
+import time
+import logging
+import functools
+import threading
+import tracemalloc
+import pandas as pd
+from typing import Callable, List, Optional
+
+from src.constants import constants, settings
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+STATUS_PATH = "/proc/self/status"
+CLEAR_REFS_PATH = "/proc/self/clear_refs"
+
+# Stage records, in completion order, the number of stages running in this process and the
+# number of stages started so far
+stage_records: List[dict] = []
+stage_lock = threading.Lock()
+active_stages = 0
+started_stages = 0
+
+def copy_on_write_enabled() -> bool:
+    """
+    Returns whether pandas copy-on-write is on, either set by COPY_ON_WRITE or always on (pandas 3).
+    """
+    if int(pd.__version__.split(".")[0]) >= 3:
+        return True
+    return bool(pd.options.mode.copy_on_write)
+
+def enable_copy_on_write():
+    """
+    Turns pandas copy-on-write on for this process if COPY_ON_WRITE is set. It is always on in pandas 3.
+    """
+    if settings.COPY_ON_WRITE and not copy_on_write_enabled():
+        pd.options.mode.copy_on_write = True
+
+def writable_copy(dataframe:pd.DataFrame) -> pd.DataFrame:
+    """
+    Returns a copy of a table that a stage may transform in place (e.g. with `apply_table_spec`)
+    without modifying its input. With copy-on-write the copy is lazy: columns are shared until
+    they are replaced. Otherwise the data is copied.
+
+    Args:
+        dataframe (pd.DataFrame): The input table.
+
+    Returns:
+        pd.DataFrame: A new DataFrame object.
+    """
+    return dataframe.copy(deep=not copy_on_write_enabled())
+
+def read_status_bytes(field:str) -> Optional[int]:
+    """
+    Reads a memory field (e.g. 'VmRSS', 'VmHWM') of /proc/self/status, in bytes, or None off Linux.
+    """
+    try:
+        with open(STATUS_PATH) as status:
+            for line in status:
+                if line.startswith(f"{field}:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        return None
+    return None
+
+def read_peak_rss() -> Optional[int]:
+    """
+    Returns the peak resident set size of the process, in bytes: since the last reset on Linux,
+    since the process started elsewhere.
+    """
+    peak = read_status_bytes("VmHWM")
+    if peak is None and resource is not None:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        peak = peak if sys.platform == "darwin" else peak * 1024
+    return peak
+
+def reset_peak_rss() -> bool:
+    """
+    Resets the peak resident set size of the process to its current size (Linux only).
+
+    Returns:
+        bool: Whether the peak was reset.
+    """
+    try:
+        with open(CLEAR_REFS_PATH, "w") as clear_refs:
+            clear_refs.write("5")
+        return True
+    except OSError:
+        return False
+
+def start_stage() -> dict:
+    """
+    Starts measuring a stage. The peak is only reset when no other stage is running, so stages
+    that overlap (e.g. in the pipelined flow) report the process peak while they ran.
+    """
+    global active_stages, started_stages
+    with stage_lock:
+        active_stages += 1
+        started_stages += 1
+        exclusive = active_stages == 1
+        state = {"started": time.perf_counter(), "exclusive": exclusive, "reset": False, "order": started_stages}
+        if constants.MEMORY_PROFILE.value == "tracemalloc":
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+            if exclusive:
+                tracemalloc.reset_peak()
+            state["start_bytes"] = tracemalloc.get_traced_memory()[0]
+        else:
+            state["reset"] = exclusive and reset_peak_rss()
+            state["start_bytes"] = read_status_bytes("VmRSS")
+    return state
+
+def finish_stage(stage:str, state:dict) -> dict:
+    """
+    Finishes measuring a stage, logs its memory high-water mark and records it.
+    """
+    global active_stages
+    with stage_lock:
+        active_stages -= 1
+        if constants.MEMORY_PROFILE.value == "tracemalloc":
+            end_bytes, peak_bytes = tracemalloc.get_traced_memory()
+        else:
+            end_bytes, peak_bytes = read_status_bytes("VmRSS"), read_peak_rss()
+        record = {
+            "etapa": stage,
+            "metrica": constants.MEMORY_PROFILE.value,
+            "segundos": round(time.perf_counter() - state["started"], 3),
+            "inicio_mib": to_mib(state["start_bytes"]),
+            "fim_mib": to_mib(end_bytes),
+            "pico_mib": to_mib(peak_bytes),
+            # Whether the peak belongs to this stage alone: no other stage ran while it did
+            "pico_exclusivo": state["exclusive"] and started_stages == state["order"]
+                and (state["reset"] or constants.MEMORY_PROFILE.value == "tracemalloc")
+        }
+        stage_records.append(record)
+    logging.info(
+        f"Stage '{stage}': peak {record['pico_mib']} MiB ({record['metrica']}), "
+        f"{record['inicio_mib']} MiB at start, {record['fim_mib']} MiB at end.")
+    return record
+
+def to_mib(value:Optional[int]) -> Optional[float]:
+    """
+    Converts a number of bytes to MiB, rounded to one decimal.
+    """
+    return None if value is None else round(value / 1024 ** 2, 1)
+
+def memory_stage(function:Callable) -> Callable:
+    """
+    Decorator that records the memory high-water mark of a transform stage, unless MEMORY_PROFILE
+    is "off". Place it below `@task`, so the task keeps the function's name and signature.
+    """
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        if constants.MEMORY_PROFILE.value == "off":
+            return function(*args, **kwargs)
+        state = start_stage()
+        try:
+            return function(*args, **kwargs)
+        finally:
+            finish_stage(function.__name__, state)
+    return wrapper
+
+def merge_memory_report(report:pd.DataFrame, previous:Optional[pd.DataFrame]) -> pd.DataFrame:
+    """
+    Merges the memory records of a run into the report of the previous runs: stages that ran
+    again replace their previous rows, and stages skipped this time (e.g. cache hits) keep them.
+
+    Args:
+        report (pd.DataFrame): The records of this run, from `memory_report`.
+        previous (pd.DataFrame, optional): The previous report, if any.
+
+    Returns:
+        pd.DataFrame: The merged report.
+    """
+    if previous is None or previous.empty:
+        return report
+    kept = previous[~previous["etapa"].isin(report["etapa"])]
+    return pd.concat([kept, report], ignore_index=True) if not kept.empty else report
+
+def memory_report(clear:bool=False) -> pd.DataFrame:
+    """
+    Returns the memory records of the stages run so far in this process, one row per stage.
+
+    Args:
+        clear (bool, optional): Drop the records, so the next report starts empty. Defaults to False.
+
+    Returns:
+        pd.DataFrame: The stage, the metric, its duration in seconds, the memory at its start and
+        end and its peak, in MiB, and whether the peak belongs to the stage alone.
+    """
+    with stage_lock:
+        report = pd.DataFrame(stage_records, columns=[
+            "etapa", "metrica", "segundos", "inicio_mib", "fim_mib", "pico_mib", "pico_exclusivo"])
+        if clear:
+            stage_records.clear()
+    return report
@@ -0,0 +1,250 @@
+# -*- coding: utf-8 -*-
+"""
+Column plans for the br_cenipa project.
+
+This module compiles the declarative table specs of `src/constants.py` (column kind -> columns)
+into execution plans: one fused chain of column kernels per column, with redundant conversions
+dropped and columns missing from the table skipped. Plans are executed column by column in a
+thread pool, so each column is read and assigned only once. Large tables can also be split into
+row partitions transformed in a process pool (see `apply_table_spec_partitioned`).
+"""
+
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Callable, Dict, List
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from src.constants import constants, settings
+from src.utils.utils import (
+    coerce_bools,
+    coerce_dates,
+    coerce_floats,
+    coerce_time,
+    format_date_series,
+    format_string_series,
+    format_time_series,
+    dataframe_to_ipc,
+    ipc_to_dataframe,
+    parse_lat_long
+)
+
+# Column kind -> (kernel, kind of the kernel's output)
+COLUMN_KERNELS = {
+    "lat_long": (parse_lat_long, "float"),
+    "float": (coerce_floats, "float"),
+    "string": (format_string_series, "string"),
+    "date": (format_date_series, "date"),
+    "time": (format_time_series, "time"),
+    "bool": (coerce_bools, "bool")
+}
+
+# Kernels that keep dates and times typed, used when TEMPORAL_OUTPUT is "native"
+NATIVE_TEMPORAL_KERNELS = {
+    "date": (coerce_dates, "date"),
+    "time": (coerce_time, "time")
+}
+
+def compile_plan(spec:dict, columns:List[str],
+                 temporal_output:str=None) -> Dict[str, List[Callable]]:
+    """
+    Compiles a table spec into a column plan for a table with the given columns.
+
+    Each column gets the kernels of the kinds it is listed under, in spec order. A kind is
+    dropped when an earlier kernel already produced it (e.g. 'float' after 'lat_long'), or
+    when it is repeated. Columns that are not in the table are skipped, and columns that are
+    not in the spec (nor covered by "default") are left untouched.
+
+    Args:
+        spec (dict): The table spec, e.g. constants.FACT_TABLE_SPEC.value.
+        columns (List[str]): Columns of the table.
+        temporal_output (str, optional): "native" to keep dates and times typed, or "string"
+            to format them. Defaults to TEMPORAL_OUTPUT.
+
+    Returns:
+        Dict[str, List[Callable]]: The kernels to apply to each column, in order.
+    """
+    kernels_by_kind = dict(COLUMN_KERNELS)
+    if (temporal_output or constants.TEMPORAL_OUTPUT.value) == "native":
+        kernels_by_kind.update(NATIVE_TEMPORAL_KERNELS)
+
+    column_kinds = {}
+    for kind, kind_columns in spec.items():
+        if kind in ["default", "exclude"]:
+            continue
+        if kind not in kernels_by_kind:
+            raise ValueError(f"Unknown column kind '{kind}' in table spec.")
+        for col in kind_columns:
+            column_kinds.setdefault(col, []).append(kind)
+
+    if "default" in spec:
+        for col in columns:
+            if col not in column_kinds and col not in spec.get("exclude", []):
+                column_kinds[col] = [spec["default"]]
+
+    plan = {}
+    for col, kinds in column_kinds.items():
+        if col not in columns:
+            logging.warning(f"Column '{col}' is in the table spec but not in the table. Skipping it.")
+            continue
+        produced = set()
+        kernels = []
+        for kind in kinds:
+            if kind in produced:
+                continue
+            kernel, output_kind = kernels_by_kind[kind]
+            kernels.append(kernel)
+            produced.update([kind, output_kind])
+        plan[col] = kernels
+    return plan
+
+def run_column(series:pd.Series, kernels:List[Callable]) -> pd.Series:
+    """
+    Runs the fused kernels of a column. If a kernel fails, the error is logged and the column
+    is returned unchanged.
+
+    Args:
+        series (pd.Series): The column.
+        kernels (List[Callable]): The column's kernels, in order.
+
+    Returns:
+        pd.Series: The transformed column.
+    """
+    result = series
+    try:
+        for kernel in kernels:
+            result = kernel(result)
+        return result
+    except Exception as e:
+        logging.error(f"Unable to cast column {series.name} with {kernel.__name__} due to: {e}")
+        print(f"Unable to cast column {series.name} with {kernel.__name__} due to: {e}")
+        return series
+
+def execute_plan(dataframe:pd.DataFrame, plan:Dict[str, List[Callable]], max_workers:int=None):
+    """
+    Executes a column plan on a DataFrame, in place. Columns are independent, so they run
+    in a thread pool; each column is assigned once, after all of them are done.
+
+    Args:
+        dataframe (pd.DataFrame): The DataFrame to transform.
+        plan (Dict[str, List[Callable]]): The plan built by `compile_plan`.
+        max_workers (int, optional): Number of threads. Defaults to PLAN_WORKERS.
+    """
+    max_workers = int(max_workers or settings.PLAN_WORKERS)
+    columns = list(plan)
+    if max_workers > 1 and len(columns) > 1:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            results = list(executor.map(
+                lambda col: run_column(dataframe[col], plan[col]),
+                columns))
+    else:
+        results = [run_column(dataframe[col], plan[col]) for col in columns]
+    for col, result in zip(columns, results):
+        dataframe[col] = result
+
+def apply_table_spec(dataframe:pd.DataFrame, spec:dict, max_workers:int=None, temporal_output:str=None):
+    """
+    Compiles a table spec for a DataFrame and executes it, in place.
+
+    Args:
+        dataframe (pd.DataFrame): The DataFrame to transform.
+        spec (dict): The table spec.
+        max_workers (int, optional): Number of threads. Defaults to PLAN_WORKERS.
+        temporal_output (str, optional): "native" or "string". Defaults to TEMPORAL_OUTPUT.
+    """
+    execute_plan(dataframe, compile_plan(spec, list(dataframe.columns), temporal_output), max_workers)
+
+def transform_partition(payload:bytes, spec:dict, temporal_output:str) -> bytes:
+    """
+    Process pool worker: applies a table spec to a row partition sent as Arrow IPC, and returns
+    the result as Arrow IPC. Columns run sequentially, since partitions already use every core.
+
+    Args:
+        payload (bytes): The partition, from `dataframe_to_ipc`.
+        spec (dict): The table spec.
+        temporal_output (str): "native" or "string".
+
+    Returns:
+        bytes: The transformed partition.
+    """
+    partition = ipc_to_dataframe(payload)
+    apply_table_spec(partition, spec, max_workers=1, temporal_output=temporal_output)
+    return dataframe_to_ipc(partition)
+
+def restore_partition_dtypes(result:pd.DataFrame, partitions:List[pd.DataFrame]):
+    """
+    Casts back the columns that `pd.concat` widened because the partitions disagree on their
+    dtype. A column that is all null in a partition comes back from Arrow without its dtype
+    (e.g. as object), so the dtype of the partitions where it has values is applied, in place.
+
+    Args:
+        result (pd.DataFrame): The concatenated partitions.
+        partitions (List[pd.DataFrame]): The partitions.
+    """
+    for col in result.columns:
+        dtypes = {str(partition[col].dtype): partition[col].dtype
+                  for partition in partitions if partition[col].notna().any()}
+        if len(dtypes) != 1:
+            continue
+        dtype = next(iter(dtypes.values()))
+        if result[col].dtype != dtype:
+            try:
+                result[col] = result[col].astype(dtype)
+            except (TypeError, ValueError) as e:
+                logging.warning(f"Unable to restore the dtype {dtype} of column {col} due to: {e}")
+
+def apply_table_spec_partitioned(dataframe:pd.DataFrame, spec:dict, workers:int=None,
+                                 temporal_output:str=None) -> pd.DataFrame:
+    """
+    Applies a table spec to contiguous row ranges of a DataFrame in a process pool. Only the
+    columns in the plan are sent, as Arrow IPC buffers rather than pickled DataFrames, and
+    reassembled in their original order with the dtypes they have in the whole table; the
+    other columns are kept as they are. Checks that need the whole table must run on the result.
+    Workers are spawned, so they don't inherit the state (locks, threads) of the parent process.
+
+    Falls back to `apply_table_spec` in this process when the table is too small to split, or
+    can't be converted to Arrow (e.g. columns with mixed types).
+
+    Args:
+        dataframe (pd.DataFrame): The table. It is not modified.
+        spec (dict): The table spec.
+        workers (int, optional): Number of processes. Defaults to FACT_TABLE_WORKERS.
+        temporal_output (str, optional): "native" or "string". Defaults to TEMPORAL_OUTPUT.
+
+    Returns:
+        pd.DataFrame: The transformed table, with the original index.
+    """
+    workers = int(workers or settings.FACT_TABLE_WORKERS)
+    temporal_output = temporal_output or constants.TEMPORAL_OUTPUT.value
+    partitions = max(1, min(workers * 2, len(dataframe) // max(settings.FACT_TABLE_PARTITION_MIN_ROWS, 1)))
+    bounds = np.linspace(0, len(dataframe), partitions + 1, dtype=int)
+    columns = list(compile_plan(spec, list(dataframe.columns), temporal_output))
+    payloads = None
+    if workers > 1 and partitions > 1 and columns:
+        try:
+            payloads = [
+                dataframe_to_ipc(dataframe.iloc[start:end][columns])
+                for start, end in zip(bounds[:-1], bounds[1:])]
+        except (pa.ArrowInvalid, pa.ArrowTypeError) as e:
+            logging.warning(f"Unable to convert the table to Arrow ({e}). Transforming it in a single process.")
+    if payloads is None:
+        result = dataframe.copy()
+        apply_table_spec(result, spec, temporal_output=temporal_output)
+        return result
+
+    logging.info(f"Transforming {len(dataframe)} rows in {len(payloads)} partitions with {workers} processes...")
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as executor:
+        results = list(executor.map(
+            transform_partition, payloads,
+            [spec] * len(payloads), [temporal_output] * len(payloads)))
+    transformed = [ipc_to_dataframe(payload) for payload in results]
+    merged = pd.concat(transformed, ignore_index=True)
+    restore_partition_dtypes(merged, transformed)
+    merged.index = dataframe.index
+    result = dataframe.copy()
+    for col in columns:
+        result[col] = merged[col]
+    return result
@@ -0,0 +1,100 @@
+# -*- coding: utf-8 -*-
+"""
+Prefect result serialization for the br_cenipa project.
+
+This module defines a Prefect result serializer that writes pandas DataFrames, and lists of
+DataFrames, as compressed Arrow IPC streams instead of pickles, and the result storage used by
+the transform tasks. Other results (e.g. None) fall back to cloudpickle.
+"""
+
+import base64
+import struct
+import logging
+import cloudpickle
+from pathlib import Path
+import pandas as pd
+import pyarrow as pa
+from typing import Any, Literal, Optional
+from pydantic import Field
+from prefect.serializers import Serializer
+
+from src.constants import constants
+from src.utils.utils import dataframe_to_ipc, ipc_to_dataframe
+
+# Payload kinds, written as the first 4 bytes of the payload
+FRAME_DATAFRAME = b"ADF1"
+FRAME_DATAFRAME_LIST = b"ADL1"
+FRAME_PICKLE = b"PKL1"
+
+class ArrowSerializer(Serializer):
+    """
+    Serializes DataFrames, and lists or tuples of DataFrames (None items allowed), as Arrow IPC
+    streams with compressed buffers. Anything else, or DataFrames that can't be converted to
+    Arrow (e.g. mixed-type object columns), is pickled with cloudpickle.
+
+    Prefect stores results inside a JSON record, so the payload is base64-encoded, as with
+    Prefect's own pickle serializer.
+    """
+
+    type: Literal["arrow-ipc"] = Field(default="arrow-ipc", frozen=True)
+    compression: Optional[str] = Field(default_factory=lambda: constants.RESULT_COMPRESSION.value or None)
+
+    def dumps(self, obj: Any) -> bytes:
+        try:
+            if isinstance(obj, pd.DataFrame):
+                payload = FRAME_DATAFRAME + dataframe_to_ipc(obj, self.compression, preserve_index=None)
+            elif isinstance(obj, (list, tuple)) and obj and all(
+                    item is None or isinstance(item, pd.DataFrame) for item in obj):
+                parts = [
+                    b"" if item is None else dataframe_to_ipc(item, self.compression, preserve_index=None)
+                    for item in obj]
+                header = struct.pack(f"<?I{len(parts)}q", isinstance(obj, tuple), len(parts), *[
+                    -1 if item is None else len(part) for item, part in zip(obj, parts)])
+                payload = FRAME_DATAFRAME_LIST + header + b"".join(parts)
+            else:
+                payload = FRAME_PICKLE + cloudpickle.dumps(obj)
+        except (pa.ArrowInvalid, pa.ArrowTypeError, pa.ArrowNotImplementedError) as e:
+            logging.warning(f"Unable to serialize result as Arrow ({e}). Pickling it instead.")
+            payload = FRAME_PICKLE + cloudpickle.dumps(obj)
+        return base64.encodebytes(payload)
+
+    def loads(self, blob: bytes) -> Any:
+        payload = base64.decodebytes(blob)
+        kind, body = payload[:4], memoryview(payload)[4:]
+        if kind == FRAME_DATAFRAME:
+            return ipc_to_dataframe(pa.py_buffer(body))
+        if kind == FRAME_DATAFRAME_LIST:
+            is_tuple, count = struct.unpack_from("<?I", body)
+            offset = struct.calcsize("<?I")
+            lengths = struct.unpack_from(f"<{count}q", body, offset)
+            offset += struct.calcsize(f"<{count}q")
+            items = []
+            for length in lengths:
+                if length < 0:
+                    items.append(None)
+                    continue
+                items.append(ipc_to_dataframe(pa.py_buffer(body[offset:offset + length])))
+                offset += length
+            return tuple(items) if is_tuple else items
+        if kind == FRAME_PICKLE:
+            return cloudpickle.loads(body)
+        raise ValueError(f"Unknown result payload kind {bytes(kind)!r}.")
+
+def result_serializer() -> Serializer:
+    """
+    Returns the serializer of the transform task results, as set by RESULT_SERIALIZER
+    ("arrow" or any Prefect serializer type, e.g. "pickle").
+    """
+    if constants.RESULT_SERIALIZER.value == "arrow":
+        return ArrowSerializer()
+    return Serializer(type=constants.RESULT_SERIALIZER.value)
+
+def result_storage() -> Optional[Path]:
+    """
+    Returns the storage of the transform task results: a local directory at RESULT_STORAGE_PATH
+    (Prefect resolves a path to a local file system without a saved block), or None to keep
+    Prefect's default storage.
+    """
+    if not constants.RESULT_STORAGE_PATH.value:
+        return None
+    return Path(constants.RESULT_STORAGE_PATH.value).resolve()
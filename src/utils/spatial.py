@@ -0,0 +1,272 @@
+# -*- coding: utf-8 -*-
+"""
+Spatial grid index for the br_cenipa project.
+
+This module assigns each occurrence to a cell of a regular latitude/longitude grid and persists
+the occurrences sorted by cell, so that bounding-box and radius queries only read the cells
+that intersect the query instead of scanning every coordinate.
+"""
+
+import os
+import math
+import logging
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from typing import Dict, Optional, Tuple
+
+from src.constants import constants, settings
+
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE = 111.32
+
+def grid_shape(resolution:float) -> Tuple[int, int]:
+    """
+    Returns the number of rows (latitude) and columns (longitude) of the grid.
+
+    Args:
+        resolution (float): Size of a cell, in degrees.
+
+    Returns:
+        Tuple[int, int]: (rows, columns)
+    """
+    return math.ceil(180 / resolution), math.ceil(360 / resolution)
+
+def grid_cells(latitude:np.ndarray, longitude:np.ndarray, resolution:float) -> np.ndarray:
+    """
+    Computes the grid cell of each coordinate, numbered row by row from (-90, -180).
+
+    Args:
+        latitude (np.ndarray): Latitudes, in degrees.
+        longitude (np.ndarray): Longitudes, in degrees.
+        resolution (float): Size of a cell, in degrees.
+
+    Returns:
+        np.ndarray: The cell of each coordinate, as int64.
+    """
+    rows, columns = grid_shape(resolution)
+    row = np.clip(np.floor((latitude + 90) / resolution), 0, rows - 1).astype(np.int64)
+    col = np.clip(np.floor((longitude + 180) / resolution), 0, columns - 1).astype(np.int64)
+    return row * columns + col
+
+def haversine_km(latitude:np.ndarray, longitude:np.ndarray, center_latitude:float, center_longitude:float) -> np.ndarray:
+    """
+    Computes the great-circle distance between coordinates and a center point.
+
+    Args:
+        latitude (np.ndarray): Latitudes, in degrees.
+        longitude (np.ndarray): Longitudes, in degrees.
+        center_latitude (float): Latitude of the center, in degrees.
+        center_longitude (float): Longitude of the center, in degrees.
+
+    Returns:
+        np.ndarray: The distances, in kilometers.
+    """
+    lat1, lon1 = np.radians(latitude), np.radians(longitude)
+    lat2, lon2 = math.radians(center_latitude), math.radians(center_longitude)
+    a = np.sin((lat1 - lat2) / 2) ** 2 + np.cos(lat1) * math.cos(lat2) * np.sin((lon1 - lon2) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(a))
+
+def build_spatial_index(df_fact_table:pd.DataFrame, resolution:float=settings.SPATIAL_GRID_RESOLUTION) -> pa.Table:
+    """
+    Builds the spatial index of the fact table: one row per occurrence with valid coordinates,
+    with its grid cell ('celula_grade'), sorted by cell. The grid resolution is stored in the
+    schema metadata.
+
+    Coordinates that are exactly zero are left out: they come from the '***' placeholders
+    of the source data, which the cleaning turns into 0.
+
+    Args:
+        df_fact_table (pd.DataFrame): The processed fact table.
+        resolution (float, optional): Size of a cell, in degrees. Defaults to SPATIAL_GRID_RESOLUTION.
+
+    Returns:
+        pa.Table: The spatial index.
+    """
+    latitude = pd.to_numeric(df_fact_table["latitude_ocorrencia"], errors="coerce").astype(float).to_numpy()
+    longitude = pd.to_numeric(df_fact_table["longitude_ocorrencia"], errors="coerce").astype(float).to_numpy()
+    valid = (
+        np.isfinite(latitude) & np.isfinite(longitude)
+        & (np.abs(latitude) <= 90) & (np.abs(longitude) <= 180)
+        & (latitude != 0) & (longitude != 0))
+    logging.info(f"Indexing {valid.sum()} of {len(valid)} occurrences with valid coordinates...")
+
+    cells = grid_cells(latitude[valid], longitude[valid], resolution)
+    order = np.argsort(cells, kind="stable")
+    table = pa.table({
+        "celula_grade": cells[order],
+        "id_ocorrencia": df_fact_table["id_ocorrencia"].to_numpy()[valid][order],
+        "latitude_ocorrencia": latitude[valid][order],
+        "longitude_ocorrencia": longitude[valid][order],
+        "sigla_aerodromo": df_fact_table["sigla_aerodromo"].astype(object).to_numpy()[valid][order]
+    })
+    return table.replace_schema_metadata({"resolucao_grade": str(resolution)})
+
+def save_spatial_index(table:pa.Table, path:Optional[str]=None):
+    """
+    Saves the spatial index as a Parquet file.
+
+    Args:
+        table (pa.Table): The index built by `build_spatial_index`.
+        path (str, optional): Destination file. Defaults to SPATIAL_INDEX_FILE in INDEX_DIR_PATH.
+    """
+    path = path or os.path.join(constants.INDEX_DIR_PATH.value, constants.SPATIAL_INDEX_FILE.value)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    pq.write_table(table, path)
+    logging.info(f"Spatial index saved to {path}")
+
+class SpatialIndex:
+    """
+    Bounding-box and radius queries over the occurrences, backed by the persisted grid index.
+
+    Example:
+        index = SpatialIndex.load()
+        index.query_radius(-23.6261, -46.6564, radius_km=10)
+        index.query_aerodromo("SBSP", radius_km=10)
+    """
+
+    def __init__(self, table:pa.Table):
+        metadata = table.schema.metadata or {}
+        self.resolution = float(metadata.get(b"resolucao_grade", settings.SPATIAL_GRID_RESOLUTION))
+        self.rows, self.columns = grid_shape(self.resolution)
+        self.cells = table.column("celula_grade").to_numpy()
+        self.ids = table.column("id_ocorrencia").to_numpy()
+        self.latitude = table.column("latitude_ocorrencia").to_numpy()
+        self.longitude = table.column("longitude_ocorrencia").to_numpy()
+        self.aerodromo_locations = self.median_locations(table.column("sigla_aerodromo").to_pandas())
+
+    def median_locations(self, aerodromos:pd.Series) -> Dict[str, Tuple[float, float]]:
+        """
+        Computes the median coordinates of the occurrences of each aerodrome, once, so that
+        `locate_aerodromo` is a dictionary lookup.
+
+        Args:
+            aerodromos (pd.Series): ICAO code of each occurrence of the index.
+
+        Returns:
+            Dict[str, Tuple[float, float]]: (latitude, longitude) by upper-case ICAO code.
+        """
+        medians = pd.DataFrame({
+            "sigla_aerodromo": aerodromos.astype(object).where(aerodromos.notna(), "").astype(str).str.upper().to_numpy(),
+            "latitude_ocorrencia": self.latitude,
+            "longitude_ocorrencia": self.longitude
+        }).groupby("sigla_aerodromo", sort=False).median()
+        return {
+            sigla: (float(latitude), float(longitude))
+            for sigla, latitude, longitude in zip(
+                medians.index, medians["latitude_ocorrencia"], medians["longitude_ocorrencia"])
+            if sigla
+        }
+
+    @classmethod
+    def load(cls, path:Optional[str]=None) -> "SpatialIndex":
+        """
+        Loads the persisted spatial index.
+
+        Args:
+            path (str, optional): Index file. Defaults to SPATIAL_INDEX_FILE in INDEX_DIR_PATH.
+
+        Returns:
+            SpatialIndex: The loaded index.
+        """
+        path = path or os.path.join(constants.INDEX_DIR_PATH.value, constants.SPATIAL_INDEX_FILE.value)
+        return cls(pq.read_table(path))
+
+    def candidates(self, min_latitude:float, min_longitude:float, max_latitude:float, max_longitude:float) -> np.ndarray:
+        """
+        Returns the positions of the occurrences in the cells that intersect a bounding box.
+        Each grid row of the box is a contiguous range of sorted cells, found by binary search.
+
+        Returns:
+            np.ndarray: Positions in the index.
+        """
+        first_row, first_col = divmod(int(grid_cells(np.array([min_latitude]), np.array([min_longitude]), self.resolution)[0]), self.columns)
+        last_row, last_col = divmod(int(grid_cells(np.array([max_latitude]), np.array([max_longitude]), self.resolution)[0]), self.columns)
+        row_starts = np.arange(first_row, last_row + 1, dtype=np.int64) * self.columns
+        starts = np.searchsorted(self.cells, row_starts + first_col, side="left")
+        ends = np.searchsorted(self.cells, row_starts + last_col, side="right")
+        if not len(starts):
+            return np.array([], dtype=np.int64)
+        return np.concatenate([np.arange(start, end) for start, end in zip(starts, ends)])
+
+    def query_bbox(self, min_latitude:float, min_longitude:float, max_latitude:float, max_longitude:float) -> pd.DataFrame:
+        """
+        Finds the occurrences inside a bounding box (without crossing the antimeridian).
+
+        Args:
+            min_latitude (float): Southern limit, in degrees.
+            min_longitude (float): Western limit, in degrees.
+            max_latitude (float): Northern limit, in degrees.
+            max_longitude (float): Eastern limit, in degrees.
+
+        Returns:
+            pd.DataFrame: 'id_ocorrencia', 'latitude_ocorrencia' and 'longitude_ocorrencia' of the matches.
+        """
+        positions = self.candidates(min_latitude, min_longitude, max_latitude, max_longitude)
+        inside = (
+            (self.latitude[positions] >= min_latitude) & (self.latitude[positions] <= max_latitude)
+            & (self.longitude[positions] >= min_longitude) & (self.longitude[positions] <= max_longitude))
+        positions = positions[inside]
+        return pd.DataFrame({
+            "id_ocorrencia": self.ids[positions],
+            "latitude_ocorrencia": self.latitude[positions],
+            "longitude_ocorrencia": self.longitude[positions]
+        })
+
+    def query_radius(self, latitude:float, longitude:float, radius_km:float) -> pd.DataFrame:
+        """
+        Finds the occurrences within a distance of a point, sorted by distance.
+
+        Args:
+            latitude (float): Latitude of the center, in degrees.
+            longitude (float): Longitude of the center, in degrees.
+            radius_km (float): Search radius, in kilometers.
+
+        Returns:
+            pd.DataFrame: 'id_ocorrencia', coordinates and 'distancia_km' of the matches.
+        """
+        delta_latitude = radius_km / KM_PER_DEGREE
+        delta_longitude = radius_km / (KM_PER_DEGREE * max(math.cos(math.radians(latitude)), 1e-6))
+        positions = self.candidates(
+            max(latitude - delta_latitude, -90), max(longitude - delta_longitude, -180),
+            min(latitude + delta_latitude, 90), min(longitude + delta_longitude, 180))
+        distances = haversine_km(self.latitude[positions], self.longitude[positions], latitude, longitude)
+        inside = distances <= radius_km
+        positions, distances = positions[inside], distances[inside]
+        order = np.argsort(distances, kind="stable")
+        return pd.DataFrame({
+            "id_ocorrencia": self.ids[positions][order],
+            "latitude_ocorrencia": self.latitude[positions][order],
+            "longitude_ocorrencia": self.longitude[positions][order],
+            "distancia_km": distances[order]
+        })
+
+    def locate_aerodromo(self, sigla_aerodromo:str) -> Optional[Tuple[float, float]]:
+        """
+        Estimates the location of an aerodrome as the median coordinates of its occurrences.
+
+        Args:
+            sigla_aerodromo (str): ICAO code of the aerodrome (e.g. 'SBSP').
+
+        Returns:
+            Optional[Tuple[float, float]]: (latitude, longitude), or None if it has no occurrences.
+        """
+        return self.aerodromo_locations.get(sigla_aerodromo.upper())
+
+    def query_aerodromo(self, sigla_aerodromo:str, radius_km:float) -> pd.DataFrame:
+        """
+        Finds the occurrences within a distance of an aerodrome.
+
+        Args:
+            sigla_aerodromo (str): ICAO code of the aerodrome (e.g. 'SBSP').
+            radius_km (float): Search radius, in kilometers.
+
+        Returns:
+            pd.DataFrame: Same as `query_radius`; empty if the aerodrome can't be located.
+        """
+        location = self.locate_aerodromo(sigla_aerodromo)
+        if location is None:
+            logging.warning(f"Aerodrome {sigla_aerodromo} has no occurrences with valid coordinates.")
+            return pd.DataFrame(columns=["id_ocorrencia", "latitude_ocorrencia", "longitude_ocorrencia", "distancia_km"])
+        return self.query_radius(location[0], location[1], radius_km)
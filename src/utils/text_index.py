@@ -0,0 +1,287 @@
+# -*- coding: utf-8 -*-
+"""
+Full-text index for the br_cenipa project.
+
+This module builds a positional inverted index (term -> 'id_recomendacao' -> positions) over the
+recommendation texts, with accent-insensitive Portuguese tokenization. The index is persisted as
+Parquet next to the outputs, sorted by term, and updated incrementally from a per-recommendation
+content hash. Queries support AND/OR/NOT operators and quoted phrases.
+"""
+
+import os
+import re
+import logging
+import unicodedata
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+from typing import Dict, List, Optional, Set, Tuple
+
+from src.constants import constants
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+QUERY_PATTERN = re.compile(r'"[^"]*"|\S+')
+
+STOPWORDS = {
+    "a", "ao", "aos", "as", "com", "como", "da", "das", "de", "do", "dos", "e", "em", "entre",
+    "ha", "isso", "isto", "ja", "la", "mais", "mas", "na", "nas", "nem", "no", "nos", "o", "os",
+    "ou", "para", "pela", "pelas", "pelo", "pelos", "por", "que", "se", "sem", "ser", "seu",
+    "seus", "sob", "sobre", "sua", "suas", "tambem", "um", "uma", "umas", "uns"
+}
+
+def normalize_text(text:str) -> str:
+    """
+    Lowercases a text and removes its accents (e.g. 'Manutenção' -> 'manutencao').
+
+    Args:
+        text (str): The text to normalize.
+
+    Returns:
+        str: The normalized text.
+    """
+    decomposed = unicodedata.normalize("NFKD", str(text).lower())
+    return "".join(char for char in decomposed if not unicodedata.combining(char))
+
+def tokenize(text:str) -> List[Tuple[str, int]]:
+    """
+    Splits a text into accent-insensitive tokens, dropping Portuguese stopwords. Positions count
+    the stopwords too, so phrases keep their spacing.
+
+    Args:
+        text (str): The text to tokenize.
+
+    Returns:
+        List[Tuple[str, int]]: (token, position) pairs.
+    """
+    if text is None or (isinstance(text, float) and np.isnan(text)):
+        return []
+    return [
+        (token, position)
+        for position, token in enumerate(TOKEN_PATTERN.findall(normalize_text(text)))
+        if token not in STOPWORDS]
+
+def index_paths(index_dir:Optional[str]=None) -> Tuple[str, str]:
+    """
+    Returns the paths of the postings and document files of the text index.
+
+    Args:
+        index_dir (str, optional): Index directory. Defaults to INDEX_DIR_PATH.
+
+    Returns:
+        Tuple[str, str]: (postings path, documents path)
+    """
+    index_dir = index_dir or constants.INDEX_DIR_PATH.value
+    return (
+        os.path.join(index_dir, constants.TEXT_INDEX_FILE.value),
+        os.path.join(index_dir, constants.TEXT_INDEX_DOCUMENTS_FILE.value))
+
+def document_hashes(df_recomendacao:pd.DataFrame, text_column:str="descricao") -> pd.DataFrame:
+    """
+    Groups the texts by 'id_recomendacao' and hashes each document's content.
+
+    Args:
+        df_recomendacao (pd.DataFrame): The processed 'recomendacao' table.
+        text_column (str, optional): Column to index. Defaults to 'descricao'.
+
+    Returns:
+        pd.DataFrame: 'id_recomendacao', 'texto' and 'hash_texto' (uint64) of each document.
+    """
+    documents = df_recomendacao[["id_recomendacao", text_column]]\
+        .dropna(subset=["id_recomendacao"])\
+        .astype({"id_recomendacao": str})
+    documents = documents[text_column].fillna("").astype(str)\
+        .groupby(documents["id_recomendacao"], sort=True).agg(" ".join)\
+        .rename("texto").reset_index()
+    documents["hash_texto"] = pd.util.hash_pandas_object(documents["texto"], index=False).to_numpy()
+    return documents
+
+def build_postings(documents:pd.DataFrame) -> pa.Table:
+    """
+    Tokenizes the documents into postings: one row per (term, document) with its positions.
+
+    Args:
+        documents (pd.DataFrame): Documents from `document_hashes`.
+
+    Returns:
+        pa.Table: 'termo', 'id_recomendacao' and 'posicoes' (list of int32).
+    """
+    terms, ids, positions = [], [], []
+    for doc_id, text in zip(documents["id_recomendacao"], documents["texto"]):
+        doc_positions = {}
+        for token, position in tokenize(text):
+            doc_positions.setdefault(token, []).append(position)
+        terms.extend(doc_positions)
+        ids.extend([doc_id] * len(doc_positions))
+        positions.extend(doc_positions.values())
+    return pa.table({
+        "termo": pa.array(terms, pa.string()),
+        "id_recomendacao": pa.array(ids, pa.string()),
+        "posicoes": pa.array(positions, pa.list_(pa.int32()))
+    })
+
+def update_text_index(df_recomendacao:pd.DataFrame, index_dir:Optional[str]=None) -> Dict[str, int]:
+    """
+    Updates the persisted text index with the current recommendations. Only the recommendations
+    that are new or whose text hash changed are tokenized again; postings of removed or changed
+    recommendations are dropped. The index is rebuilt from scratch when it doesn't exist.
+
+    Args:
+        df_recomendacao (pd.DataFrame): The processed 'recomendacao' table.
+        index_dir (str, optional): Index directory. Defaults to INDEX_DIR_PATH.
+
+    Returns:
+        Dict[str, int]: Number of added, updated, removed and total documents.
+    """
+    postings_path, documents_path = index_paths(index_dir)
+    documents = document_hashes(df_recomendacao)
+
+    if os.path.exists(postings_path) and os.path.exists(documents_path):
+        previous = pq.read_table(documents_path).to_pandas()
+        postings = pq.read_table(postings_path)
+    else:
+        previous = pd.DataFrame({"id_recomendacao": pd.Series(dtype=str), "hash_texto": pd.Series(dtype=np.uint64)})
+        postings = build_postings(documents.iloc[:0])
+
+    merged = documents.merge(previous, on="id_recomendacao", how="outer", suffixes=("", "_anterior"), indicator=True)
+    added = merged.loc[merged["_merge"] == "left_only", "id_recomendacao"]
+    removed = merged.loc[merged["_merge"] == "right_only", "id_recomendacao"]
+    updated = merged.loc[
+        (merged["_merge"] == "both") & (merged["hash_texto"] != merged["hash_texto_anterior"]),
+        "id_recomendacao"]
+    stats = {"added": len(added), "updated": len(updated), "removed": len(removed), "total": len(documents)}
+
+    if not (len(added) or len(updated) or len(removed)) and os.path.exists(postings_path):
+        logging.info("Text index is up to date.")
+        return stats
+
+    stale = pa.array(pd.concat([removed, updated]).tolist(), pa.string())
+    kept = postings.filter(pc.invert(pc.is_in(postings["id_recomendacao"], value_set=stale)))
+    changed = documents[documents["id_recomendacao"].isin(pd.concat([added, updated]))]
+    postings = pa.concat_tables([kept, build_postings(changed)])\
+        .sort_by([("termo", "ascending"), ("id_recomendacao", "ascending")])
+
+    os.makedirs(os.path.dirname(postings_path), exist_ok=True)
+    pq.write_table(postings, postings_path)
+    pq.write_table(pa.Table.from_pandas(documents[["id_recomendacao", "hash_texto"]], preserve_index=False), documents_path)
+    logging.info(f"Text index updated: {stats}")
+    return stats
+
+class TextIndex:
+    """
+    Boolean and phrase search over the recommendation texts, backed by the persisted index.
+
+    Queries are terms combined with AND (default), OR and NOT, and "quoted phrases". AND binds
+    tighter than OR, and parentheses are not supported.
+
+    Example:
+        index = TextIndex.load()
+        index.search('treinamento manutencao')
+        index.search('"plano de manutenção" OR inspeção NOT helicóptero')
+    """
+
+    def __init__(self, postings:pa.Table, documents:pa.Table):
+        self.terms = np.asarray(postings.column("termo").to_numpy(zero_copy_only=False), dtype=str)
+        self.ids = postings.column("id_recomendacao").to_numpy(zero_copy_only=False)
+        self.positions = postings.column("posicoes")
+        self.all_ids = set(documents.column("id_recomendacao").to_pylist())
+
+    @classmethod
+    def load(cls, index_dir:Optional[str]=None) -> "TextIndex":
+        """
+        Loads the persisted text index.
+
+        Args:
+            index_dir (str, optional): Index directory. Defaults to INDEX_DIR_PATH.
+
+        Returns:
+            TextIndex: The loaded index.
+        """
+        postings_path, documents_path = index_paths(index_dir)
+        return cls(pq.read_table(postings_path), pq.read_table(documents_path))
+
+    def term_range(self, term:str) -> Tuple[int, int]:
+        """
+        Returns the row range of a term's postings, found by binary search.
+        """
+        return (
+            int(np.searchsorted(self.terms, term, side="left")),
+            int(np.searchsorted(self.terms, term, side="right")))
+
+    def term_documents(self, term:str) -> Set[str]:
+        """
+        Returns the recommendations that contain a (normalized) term.
+        """
+        start, end = self.term_range(term)
+        return set(self.ids[start:end])
+
+    def term_positions(self, term:str) -> Dict[str, Set[int]]:
+        """
+        Returns the positions of a (normalized) term in each recommendation that contains it.
+        """
+        start, end = self.term_range(term)
+        return dict(zip(
+            self.ids[start:end],
+            (set(positions) for positions in self.positions.slice(start, end - start).to_pylist())))
+
+    def phrase_documents(self, phrase:str) -> Optional[Set[str]]:
+        """
+        Returns the recommendations that contain a phrase, with its words in order. Stopwords in
+        the phrase match any word.
+
+        Args:
+            phrase (str): The phrase.
+
+        Returns:
+            Optional[Set[str]]: The matching recommendations, or None if the phrase has only stopwords.
+        """
+        tokens = tokenize(phrase)
+        if not tokens:
+            return None
+        if len(tokens) == 1:
+            return self.term_documents(tokens[0][0])
+
+        first_position = tokens[0][1]
+        postings = [(self.term_positions(token), position - first_position) for token, position in tokens]
+        candidates = set.intersection(*(set(term_postings) for term_postings, _ in postings))
+        return {
+            doc_id for doc_id in candidates
+            if any(
+                all(start + offset in term_postings[doc_id] for term_postings, offset in postings[1:])
+                for start in postings[0][0][doc_id])}
+
+    def search(self, query:str) -> List[str]:
+        """
+        Searches the recommendations.
+
+        Args:
+            query (str): Terms and "quoted phrases" combined with AND, OR and NOT.
+
+        Returns:
+            List[str]: The sorted 'id_recomendacao' of the matches.
+        """
+        groups, group, negate = [], ([], []), False
+        for operand in QUERY_PATTERN.findall(query):
+            if operand == "OR":
+                groups.append(group)
+                group, negate = ([], []), False
+                continue
+            if operand == "AND":
+                continue
+            if operand == "NOT":
+                negate = True
+                continue
+            matches = self.phrase_documents(operand.strip('"'))
+            if matches is not None:
+                group[1 if negate else 0].append(matches)
+            negate = False
+        groups.append(group)
+
+        results = set()
+        for positives, negatives in groups:
+            if not positives and not negatives:
+                continue
+            matches = set.intersection(*positives) if positives else set(self.all_ids)
+            results |= matches.difference(*negatives)
+        return sorted(results)
@@ -9,12 +9,21 @@ consistency checks, and uploading data to Google Cloud Storage in chunks.
 import os
 import io
 import re
+import json
+import hashlib
+import inspect
+import types
+import uuid
 import logging
 import math
+from functools import lru_cache
 from google.cloud import storage
 from loguru import logger
+import numpy as np
 import pandas as pd
-from typing import List
+import pyarrow as pa
+import pyarrow.parquet as pq
+from typing import Callable, Iterator, List, Optional, Tuple
 
 # Wehscraping option libs
 from selenium import webdriver
@@ -23,11 +32,10 @@ from selenium.webdriver.chrome.service import Service
 from webdriver_manager.chrome import ChromeDriverManager
 
 # API option libs
-import json
 import requests
 
 # Internals
-from src.constants import constants
+from src.constants import constants, settings
 
 logging.basicConfig(level=logging.INFO)
 
@@ -48,7 +56,7 @@ def set_driver():
     driver = webdriver.Chrome(service=service, options=options)
     return driver
 
-def download_table_to_csv(table_name, table_url, table_path=constants.INPUT_DIR_PATH.value):
+def download_table_to_csv(table_name, table_url, table_path=constants.INPUT_DIR_PATH.value, session=None):
     """
     Downloads a table from a given URL and saves it as a CSV file in the specified path.
 
@@ -56,9 +64,10 @@ def download_table_to_csv(table_name, table_url, table_path=constants.INPUT_DIR_
         table_name (str): Name of the table (used as file name).
         table_url (str): URL to download the table from.
         table_path (str, optional): Directory to save the CSV file. Defaults to constants.INPUT_DIR_PATH.value.
+        session (requests.Session, optional): Session whose connection pool is used. Defaults to None.
     """
     try:
-        response = requests.get(table_url)
+        response = (session or requests).get(table_url)
         response.raise_for_status()
 
         if os.path.exists(table_path) is False:
@@ -75,15 +84,306 @@ def download_table_to_csv(table_name, table_url, table_path=constants.INPUT_DIR_
 def correct_csv_encoding():
     """
     Converts the encoding of all CSV files in the input directory from 'latin1' to 'utf-8'.
-    Overwrites the original files.
+    Overwrites the original files and, if ARROW_HANDOFF is set, also writes each table
+    as an Arrow IPC file next to it.
     """
     logging.info("Correcting CSV file encodings from 'latin1' to 'utf-8'...")
     print("Correcting CSV file encodings from 'latin1' to 'utf-8'...")
     for  file_name in os.listdir(constants.INPUT_DIR_PATH.value):
         if file_name.endswith(".csv"):
-            file_path = os.path.join(constants.INPUT_DIR_PATH.value, file_name)
-            pd.read_csv(file_path, sep=";", encoding="latin1")\
-            .to_csv(file_path, sep=";", encoding="utf-8", index=False)
+            correct_file_encoding(file_name)
+
+def correct_file_encoding(file_name:str, folder:Optional[str]=None):
+    """
+    Converts the encoding of one CSV file in the input directory from 'latin1' to 'utf-8',
+    overwriting it, and writes its Arrow IPC copy if ARROW_HANDOFF is set.
+
+    Args:
+        file_name (str): Name of the CSV file (e.g. 'ocorrencia.csv').
+        folder (str, optional): Directory of the file. Defaults to INPUT_DIR_PATH.
+    """
+    file_path = os.path.join(folder or constants.INPUT_DIR_PATH.value, file_name)
+    dataframe = pd.read_csv(file_path, sep=";", encoding="latin1")
+    dataframe.to_csv(file_path, sep=";", encoding="utf-8", index=False)
+    if settings.ARROW_HANDOFF:
+        write_arrow_ipc(dataframe, file_path)
+
+def arrow_ipc_path(csv_path:str) -> str:
+    """
+    Returns the path of the Arrow IPC copy of a CSV file.
+
+    Args:
+        csv_path (str): Path of the CSV file.
+
+    Returns:
+        str: The same path with the '.arrow' extension.
+    """
+    return f"{os.path.splitext(csv_path)[0]}.arrow"
+
+def write_arrow_ipc(dataframe:pd.DataFrame, csv_path:str):
+    """
+    Writes a table as an uncompressed Arrow IPC (Feather v2) file next to its CSV file,
+    so that it can be memory-mapped instead of parsed. If the table can't be converted
+    to Arrow, the stale IPC file is removed and readers fall back to the CSV file.
+
+    Args:
+        dataframe (pd.DataFrame): The table, as read from the CSV file.
+        csv_path (str): Path of the CSV file.
+    """
+    ipc_path = arrow_ipc_path(csv_path)
+    try:
+        dataframe.reset_index(drop=True).to_feather(ipc_path, compression="uncompressed")
+        logging.info(f"Arrow IPC copy written to {ipc_path}")
+    except Exception as e:
+        logging.warning(f"Unable to write Arrow IPC copy of {csv_path} due to: {e}")
+        if os.path.exists(ipc_path):
+            os.remove(ipc_path)
+
+def restore_object_nulls(dataframe:pd.DataFrame, columns:Optional[List[str]]=None) -> pd.DataFrame:
+    """
+    Replaces the None values that Arrow nulls become in object columns by NaN, as read_csv gives.
+
+    Args:
+        dataframe (pd.DataFrame): A table converted from Arrow. It is modified in place.
+        columns (List[str], optional): Columns that may have nulls. Defaults to all columns.
+
+    Returns:
+        pd.DataFrame: The same table.
+    """
+    object_columns = dataframe.select_dtypes(include="object").columns
+    if columns is not None:
+        object_columns = object_columns.intersection(columns)
+    if len(object_columns):
+        dataframe[object_columns] = dataframe[object_columns]\
+            .where(dataframe[object_columns].notna(), float("nan"))
+    return dataframe
+
+def dataframe_to_ipc(dataframe:pd.DataFrame, compression:Optional[str]=None, preserve_index:Optional[bool]=False) -> bytes:
+    """
+    Serializes a table as an Arrow IPC stream, keeping its pandas dtypes in the schema metadata.
+
+    Args:
+        dataframe (pd.DataFrame): The table.
+        compression (str, optional): IPC buffer compression ('zstd' or 'lz4'). Defaults to None.
+        preserve_index (bool, optional): Also store the index; None stores a RangeIndex as
+            metadata only. Defaults to False.
+
+    Returns:
+        bytes: The IPC stream.
+    """
+    table = pa.Table.from_pandas(dataframe, preserve_index=preserve_index)
+    sink = pa.BufferOutputStream()
+    options = pa.ipc.IpcWriteOptions(compression=compression)
+    with pa.ipc.new_stream(sink, table.schema, options=options) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+def ipc_to_dataframe(payload) -> pd.DataFrame:
+    """
+    Deserializes a table written by `dataframe_to_ipc`.
+
+    Args:
+        payload (bytes | pa.Buffer): The IPC stream.
+
+    Returns:
+        pd.DataFrame: The table, with NaN for nulls in object columns.
+    """
+    table = pa.ipc.open_stream(payload).read_all()
+    nullable = [name for name, column in zip(table.column_names, table.columns) if column.null_count]
+    return restore_object_nulls(table.to_pandas(), nullable)
+
+def read_input_table(file_name:str, folder:Optional[str]=None) -> pd.DataFrame:
+    """
+    Reads an input table. Memory-maps its Arrow IPC copy when it exists and is not older
+    than the CSV file; otherwise parses the CSV file.
+
+    Args:
+        file_name (str): Name of the CSV file in the input directory (e.g. 'ocorrencia.csv').
+        folder (str, optional): Directory of the file. Defaults to INPUT_DIR_PATH.
+
+    Returns:
+        pd.DataFrame: The input table.
+    """
+    csv_path = os.path.join(folder or constants.INPUT_DIR_PATH.value, file_name)
+    ipc_path = arrow_ipc_path(csv_path)
+    if os.path.exists(ipc_path) and (
+            not os.path.exists(csv_path) or os.path.getmtime(ipc_path) >= os.path.getmtime(csv_path)):
+        try:
+            with pa.memory_map(ipc_path, "r") as source:
+                table = pa.ipc.open_file(source).read_all()
+            nullable = [name for name, column in zip(table.column_names, table.columns) if column.null_count]
+            return restore_object_nulls(table.to_pandas(), nullable)
+        except Exception as e:
+            logging.warning(f"Unable to read Arrow IPC copy {ipc_path} due to: {e}. Reading CSV file instead.")
+    return pd.read_csv(csv_path, sep=";", encoding="utf-8")
+
+FILE_HASHES = {}
+
+def hash_file(file_path:str, chunk_size:int=1024 * 1024) -> str:
+    """
+    Computes the SHA-256 hash of a file's contents, reading it in chunks.
+    Hashes are memoized by path, size and modification time, so a file shared by several
+    tasks is only read once per run.
+
+    Args:
+        file_path (str): Path of the file to hash.
+        chunk_size (int, optional): Number of bytes read at a time. Defaults to 1 MiB.
+
+    Returns:
+        str: The hexadecimal digest of the file.
+    """
+    file_stat = os.stat(file_path)
+    memo_key = (os.path.abspath(file_path), file_stat.st_size, file_stat.st_mtime_ns)
+    if memo_key not in FILE_HASHES:
+        digest = hashlib.sha256()
+        with open(file_path, "rb") as f:
+            for chunk in iter(lambda: f.read(chunk_size), b""):
+                digest.update(chunk)
+        FILE_HASHES[memo_key] = digest.hexdigest()
+    return FILE_HASHES[memo_key]
+
+def output_generation(task_name:str, output_paths:List[str]) -> Optional[str]:
+    """
+    Returns the generation of a task's side-effect outputs, stored in TASK_CACHE_STATE_PATH.
+    A new generation is started when one of the outputs is missing, which changes the task's
+    cache key, so the task runs again and rewrites them. While all outputs exist, the generation
+    and the key stay the same.
+
+    Args:
+        task_name (str): Name of the task.
+        output_paths (List[str]): Paths of the files the task writes as a side effect.
+
+    Returns:
+        Optional[str]: The generation, or None if the task has no side-effect outputs.
+    """
+    if not output_paths:
+        return None
+    state_path = os.path.join(constants.TASK_CACHE_STATE_PATH.value, f"{task_name}.generation")
+    if all(os.path.exists(path) for path in output_paths) and os.path.exists(state_path):
+        with open(state_path, encoding="utf-8") as f:
+            generation = f.read().strip()
+        if generation:
+            return generation
+    generation = uuid.uuid4().hex
+    os.makedirs(constants.TASK_CACHE_STATE_PATH.value, exist_ok=True)
+    with open(f"{state_path}.tmp", "w", encoding="utf-8") as f:
+        f.write(generation)
+    os.replace(f"{state_path}.tmp", state_path)
+    return generation
+
+def config_value(name:str):
+    """
+    Returns the value of a `settings` attribute or, if there is none, of a `constants` member.
+
+    Args:
+        name (str): Name of the setting or constant (e.g. 'SPATIAL_GRID_RESOLUTION', 'RENAME_MAPPING').
+    """
+    if hasattr(settings, name):
+        return getattr(settings, name)
+    return constants[name].value
+
+@lru_cache(maxsize=None)
+def code_hash(function:Callable) -> str:
+    """
+    Hashes the source of a function and of the project functions and classes it references,
+    recursively (e.g. a task, the helpers it calls and the kernels they call). Decorators that
+    set `__wrapped__` are unwrapped. The constants are left out: the cache keys list the ones
+    each task uses.
+
+    Args:
+        function (Callable): The function.
+
+    Returns:
+        str: The SHA-256 of the sources, in hex.
+    """
+    sources = {}
+    pending = [inspect.unwrap(function)]
+    while pending:
+        obj = pending.pop()
+        name = f"{obj.__module__}.{obj.__qualname__}"
+        if name in sources:
+            continue
+        try:
+            sources[name] = inspect.getsource(obj)
+        except (OSError, TypeError):
+            sources[name] = ""
+        if inspect.isclass(obj):
+            pending.extend(
+                inspect.unwrap(member) for member in vars(obj).values() if inspect.isfunction(member))
+            continue
+        code_objects = [obj.__code__]
+        while code_objects:
+            code = code_objects.pop()
+            code_objects.extend(const for const in code.co_consts if isinstance(const, types.CodeType))
+            for referenced in code.co_names:
+                # Tables of kernels (e.g. COLUMN_KERNELS) are followed to their functions
+                values = [obj.__globals__.get(referenced)]
+                while values:
+                    value = values.pop()
+                    if isinstance(value, dict):
+                        values.extend(value.values())
+                    elif isinstance(value, (list, tuple)):
+                        values.extend(value)
+                    else:
+                        value = getattr(value, "fn", value)
+                        if (inspect.isfunction(value) or inspect.isclass(value))\
+                                and value.__module__.startswith("src.")\
+                                and value.__module__ != "src.constants":
+                            pending.append(inspect.unwrap(value))
+    return hashlib.sha256(json.dumps(sources, sort_keys=True).encode()).hexdigest()
+
+def input_hash_cache_key(
+    input_files: List[str],
+    constant_names: List[str] = None,
+    output_files: List[str] = None,
+    table_specs: List[dict] = None) -> Callable:
+    """
+    Builds a Prefect `cache_key_fn` keyed by the content hash of a task's input files, by
+    the constants (mappings and column lists) and table specs it depends on, and by the source
+    of the task and of the project code it calls (see `code_hash`). Task parameters are not
+    hashed, since they are derived from the same input files.
+
+    The key also includes the generation of the task's side-effect outputs (see
+    `output_generation`): when one of them is missing, the key changes and the cached result
+    is not used, so the task runs again and rewrites them.
+
+    No key is returned, and the task runs normally, when caching is disabled (TASK_CACHE)
+    or when an input file is missing.
+
+    Args:
+        input_files (List[str]): Input file names, relative to the input directory.
+        constant_names (List[str], optional): Names of the `constants` members and `settings`
+            used by the task.
+        output_files (List[str], optional): Paths of the files the task writes as a side effect
+            (e.g. from `output_table_files`).
+        table_specs (List[dict], optional): Entries of DATASET_SPECS used by the task.
+
+    Returns:
+        Callable: A function with the (context, parameters) signature expected by Prefect.
+    """
+    constant_names = constant_names or []
+    output_files = output_files or []
+    table_specs = table_specs or []
+
+    def cache_key_fn(context, parameters) -> Optional[str]:
+        if not settings.TASK_CACHE:
+            return None
+        input_paths = [os.path.join(constants.INPUT_DIR_PATH.value, f) for f in input_files]
+        if not all(os.path.exists(path) for path in input_paths):
+            return None
+        task = getattr(context, "task", None)
+        task_name = getattr(task, "name", None)
+        task_function = getattr(task, "fn", None)
+        key = {
+            "task": task_name,
+            "code": code_hash(task_function) if task_function else None,
+            "inputs": {path: hash_file(path) for path in input_paths},
+            "constants": {name: config_value(name) for name in constant_names},
+            "table_specs": table_specs,
+            "outputs": output_generation(str(task_name), output_files)
+        }
+        return hashlib.sha256(json.dumps(key, sort_keys=True, default=str).encode()).hexdigest()
+    return cache_key_fn
 
 def show_uniques(df, columns):
     """
@@ -319,32 +619,846 @@ def format_bools(dataframe:pd.DataFrame, bool_columns:List[str]):
         logging.error(f"Unable to cast columns to bool type due to: {e}\nStopped at {col} column.")
         print(f"Unable to cast columns to bool type due to: {e}\nStopped at {col} column.")
 
+def coerce_floats(series:pd.Series) -> pd.Series:
+    """
+    Converts a column to the nullable 'Float64' dtype. Missing or unparseable values become
+    <NA> instead of the 'nan' string or 0.
+
+    Values are parsed directly; only the ones that fail (e.g. with a decimal comma or
+    inner whitespace) are cleaned as strings and parsed again.
+
+    Args:
+        series (pd.Series): The column to convert.
+
+    Returns:
+        pd.Series: The column as 'Float64'.
+    """
+    if pd.api.types.is_numeric_dtype(series.dtype):
+        return series.astype("Float64")
+    values = pd.to_numeric(series, errors="coerce")
+    failed = values.isna() & series.notna()
+    if failed.any():
+        values[failed] = pd.to_numeric(
+            series[failed].astype(str)
+                .str.replace(r'\s+', '', regex=True)
+                .str.replace(',', '.', regex=False),
+            errors="coerce")
+    return values.astype("Float64")
+
+def coerce_bools(series:pd.Series) -> pd.Series:
+    """
+    Converts a column to the nullable 'boolean' dtype using the BOOL_LOOKUP table
+    ('sim' -> True, 'não' -> False). Values outside the table become <NA>.
+
+    Only the distinct values of the column are normalized and looked up; the result is then
+    gathered by their codes, so no per-row string is allocated.
+
+    Args:
+        series (pd.Series): The column to convert.
+
+    Returns:
+        pd.Series: The column as 'boolean'.
+    """
+    if pd.api.types.is_bool_dtype(series.dtype):
+        return series.astype("boolean")
+    codes, uniques = pd.factorize(series, use_na_sentinel=True)
+    normalized = pd.Index(uniques).astype(str).str.strip().str.lower()
+    lookup = np.array(
+        [constants.BOOL_LOOKUP.value.get(value) for value in normalized] + [None],
+        dtype=object)
+    return pd.Series(
+        pd.array(lookup[codes], dtype="boolean"),
+        index=series.index,
+        name=series.name)
+
+def coerce_time(series:pd.Series, time_format:str="%H:%M:%S") -> pd.Series:
+    """
+    Converts a time of day column to 'timedelta64[ns]' (duration since midnight).
+    Only the distinct values are parsed; unparseable values become NaT.
+
+    Args:
+        series (pd.Series): The column to convert.
+        time_format (str, optional): Format of the time strings. Defaults to '%H:%M:%S'.
+
+    Returns:
+        pd.Series: The column as 'timedelta64[ns]'.
+    """
+    if pd.api.types.is_timedelta64_dtype(series.dtype):
+        return series
+    codes, uniques = pd.factorize(series, use_na_sentinel=True)
+    parsed = pd.to_datetime(
+        pd.Index(uniques).astype(str).str.strip(),
+        format=time_format,
+        errors="coerce")
+    durations = (parsed - parsed.normalize()).append(pd.TimedeltaIndex([pd.NaT]))
+    return pd.Series(
+        durations.take(codes),
+        index=series.index,
+        name=series.name)
+
+def map_uniques(series:pd.Series, function:Callable) -> pd.Series:
+    """
+    Applies a vectorized function to the distinct values of a column (missing values included)
+    and gathers the result back by their codes, so repeated values are only processed once.
+
+    Args:
+        series (pd.Series): The column to transform.
+        function (Callable): Function from a Series of distinct values to a Series of the same length.
+
+    Returns:
+        pd.Series: The transformed column, with the original index and name.
+    """
+    codes, uniques = pd.factorize(series, use_na_sentinel=False)
+    mapped = function(pd.Series(uniques))
+    result = mapped.take(codes)
+    result.index = series.index
+    result.name = series.name
+    return result
+
+def normalize_string_values(values:pd.Series, col:str) -> pd.Series:
+    """
+    Normalizes string values the same way as `format_string`, according to the column name
+    prefix ('id', 'nome' or 'sigla').
+
+    Args:
+        values (pd.Series): The values to normalize.
+        col (str): Name of the column the values belong to.
+
+    Returns:
+        pd.Series: The normalized values.
+    """
+    values = values\
+        .astype(str)\
+        .str.strip()\
+        .str.replace(r'\*|nan|Nan', '', regex=True)\
+        .str.replace(r'\s+', ' ', regex=True)
+    if not col.startswith('id'):
+        values = values.str.lower()
+    if col.startswith('nome'):
+        values = values.str.title().str.replace(
+            r'\b(De|Da|Do|Das|Dos|E|D\')\b',
+            lambda x: x.group(0).lower(),
+            regex=True)
+    if col.startswith('sigla'):
+        values = values.str.upper()
+    return values.fillna('')
+
+def format_string_series(series:pd.Series) -> pd.Series:
+    """
+    Column kernel equivalent to `format_string`, applied to the distinct values only.
+
+    Args:
+        series (pd.Series): The column to format. Its name selects the case formatting.
+
+    Returns:
+        pd.Series: The formatted column.
+    """
+    return map_uniques(series, lambda values: normalize_string_values(values, str(series.name)))
+
+def parse_lat_long_values(values:pd.Series) -> pd.Series:
+    """
+    Vectorized equivalent of the latitude/longitude cleaning done before `format_floats`:
+    replaces '*' placeholders by '0', removes degree symbols and applies `transform_lat_long`.
+
+    Args:
+        values (pd.Series): The raw coordinate values.
+
+    Returns:
+        pd.Series: The cleaned coordinates, as strings.
+    """
+    cleaned = values\
+        .astype(str)\
+        .str.replace(r'\*+', '0', regex=True)\
+        .str.replace('°', '', regex=False)
+    extraction = cleaned.str.extract(r'(-?[\d\.]+)', expand=False)
+    groups = extraction.str.extract(r'^(-?\d+)([\.\d]+)')
+    shifted = groups[0].str[:-1] + '.' + groups[0].str[-1] + groups[1].str.replace('.', '', regex=False)
+    return shifted\
+        .where(groups[0].notna(), extraction)\
+        .where(extraction.notna(), cleaned)
+
+def parse_lat_long(series:pd.Series) -> pd.Series:
+    """
+    Column kernel that cleans a latitude or longitude column and converts it to 'Float64'.
+
+    Args:
+        series (pd.Series): The raw coordinate column.
+
+    Returns:
+        pd.Series: The coordinates as 'Float64'.
+    """
+    return coerce_floats(map_uniques(series, parse_lat_long_values))
+
+def parse_date_values(values:pd.Series) -> pd.Series:
+    """
+    Parses date strings trying each format of DATE_FORMATS in order; values that match
+    none of them become NaT.
+
+    Args:
+        values (pd.Series): The date strings.
+
+    Returns:
+        pd.Series: The parsed dates as 'datetime64[ns]'.
+    """
+    values = values.astype(str).str.strip()
+    parsed = pd.Series(pd.NaT, index=values.index, dtype="datetime64[ns]")
+    for date_format in constants.DATE_FORMATS.value:
+        missing = parsed.isna()
+        if not missing.any():
+            break
+        parsed[missing] = pd.to_datetime(values[missing], format=date_format, errors="coerce")
+    return parsed
+
+def format_date_values(values:pd.Series) -> pd.Series:
+    """
+    Parses date strings and formats them as 'YYYY-MM-DD'.
+
+    Args:
+        values (pd.Series): The date strings.
+
+    Returns:
+        pd.Series: The formatted dates (NaN when unparseable).
+    """
+    return parse_date_values(values).dt.strftime('%Y-%m-%d')
+
+def format_date_series(series:pd.Series) -> pd.Series:
+    """
+    Column kernel equivalent to `format_date`, applied to the distinct values only.
+
+    Args:
+        series (pd.Series): The date column.
+
+    Returns:
+        pd.Series: The dates formatted as 'YYYY-MM-DD'.
+    """
+    return map_uniques(series, format_date_values)
+
+def coerce_dates(series:pd.Series) -> pd.Series:
+    """
+    Column kernel that parses a date column into 'datetime64[ns]' (at midnight), without
+    formatting it back to strings. Only the distinct values are parsed.
+
+    Args:
+        series (pd.Series): The date column.
+
+    Returns:
+        pd.Series: The dates as 'datetime64[ns]'.
+    """
+    if pd.api.types.is_datetime64_any_dtype(series.dtype):
+        return series.dt.normalize()
+    return map_uniques(series, parse_date_values)
+
+def format_time_values(values:pd.Series) -> pd.Series:
+    """
+    Parses 'HH:MM:SS' strings and formats them back, dropping invalid values.
+
+    Args:
+        values (pd.Series): The time strings.
+
+    Returns:
+        pd.Series: The formatted times (NaN when unparseable).
+    """
+    return pd.to_datetime(
+        values.astype(str).str.strip(),
+        format="%H:%M:%S",
+        errors="coerce").dt.strftime('%H:%M:%S')
+
+def format_time_series(series:pd.Series) -> pd.Series:
+    """
+    Column kernel equivalent to `format_time`, applied to the distinct values only.
+
+    Args:
+        series (pd.Series): The time column.
+
+    Returns:
+        pd.Series: The times formatted as 'HH:MM:SS'.
+    """
+    return map_uniques(series, format_time_values)
+
+def format_duration_values(values:pd.Series) -> pd.Series:
+    """
+    Formats durations since midnight as 'HH:MM:SS' strings.
+
+    Args:
+        values (pd.Series): The durations, as 'timedelta64'.
+
+    Returns:
+        pd.Series: The formatted times (NaN when missing).
+    """
+    return (pd.Timestamp(0) + values).dt.strftime('%H:%M:%S')
+
+def format_temporal_columns(dataframe:pd.DataFrame) -> pd.DataFrame:
+    """
+    Returns a copy of a table with its native date ('datetime64') and time of day ('timedelta64')
+    columns formatted as 'YYYY-MM-DD' and 'HH:MM:SS' strings, for CSV consumers.
+
+    Args:
+        dataframe (pd.DataFrame): The table.
+
+    Returns:
+        pd.DataFrame: The table with string dates and times.
+    """
+    formatted = {}
+    for col in dataframe.columns:
+        if pd.api.types.is_datetime64_any_dtype(dataframe[col].dtype):
+            formatted[col] = map_uniques(dataframe[col], lambda values: values.dt.strftime('%Y-%m-%d'))
+        elif pd.api.types.is_timedelta64_dtype(dataframe[col].dtype):
+            formatted[col] = map_uniques(dataframe[col], format_duration_values)
+    return dataframe.assign(**formatted) if formatted else dataframe
+
+def to_arrow_table(dataframe:pd.DataFrame) -> pa.Table:
+    """
+    Converts a table to Arrow, storing its 'data_*' datetime columns as 'date32' and its
+    time of day ('timedelta64') columns as 'time64[us]'.
+
+    Args:
+        dataframe (pd.DataFrame): The table.
+
+    Returns:
+        pa.Table: The Arrow table.
+    """
+    table = pa.Table.from_pandas(dataframe, preserve_index=False)
+    for i, field in enumerate(table.schema):
+        if pa.types.is_timestamp(field.type) and field.name.startswith("data_"):
+            table = table.set_column(i, field.name, table.column(i).cast(pa.date32()))
+        elif pa.types.is_duration(field.type):
+            table = table.set_column(
+                i,
+                field.name,
+                table.column(i).cast(pa.duration("us")).cast(pa.int64()).cast(pa.time64("us")))
+    return table
+
+def output_table_path(table_name:str, extension:str) -> str:
+    """
+    Returns the path of an output table file (e.g. 'output/br_cenipa_ocorrencia.csv').
+
+    Args:
+        table_name (str): Name of the output table.
+        extension (str): 'csv' or 'parquet'.
+    """
+    return os.path.join(constants.OUTPUT_DIR_PATH.value, f"{table_name}.{extension}")
+
+def output_table_files(table_name:str) -> List[str]:
+    """
+    Returns the paths of the files that `save_output_table` writes for a table: the CSV file,
+    and the Parquet file if TEMPORAL_OUTPUT is "native".
+
+    Args:
+        table_name (str): Name of the output table.
+
+    Returns:
+        List[str]: The file paths.
+    """
+    extensions = ["csv", "parquet"] if constants.TEMPORAL_OUTPUT.value == "native" else ["csv"]
+    return [output_table_path(table_name, extension) for extension in extensions]
+
+def save_output_table(dataframe:pd.DataFrame, table_name:str):
+    """
+    Saves a processed table in the output directory as a CSV file, with dates and times as
+    strings. If TEMPORAL_OUTPUT is "native", also saves it as a Parquet file that keeps the
+    typed date and time columns.
+
+    Args:
+        dataframe (pd.DataFrame): The processed table.
+        table_name (str): Name of the output table (e.g. 'br_cenipa_ocorrencia').
+    """
+    format_temporal_columns(dataframe).to_csv(output_table_path(table_name, "csv"), index=False)
+    parquet_path = output_table_path(table_name, "parquet")
+    if constants.TEMPORAL_OUTPUT.value == "native":
+        pq.write_table(
+            to_arrow_table(dataframe),
+            parquet_path,
+            **get_parquet_write_options(table_name, list(dataframe.columns)))
+    elif os.path.exists(parquet_path):
+        os.remove(parquet_path)
+
+def remove_output_table(table_name:str):
+    """
+    Removes the CSV and Parquet files of an output table, if they exist.
+
+    Args:
+        table_name (str): Name of the output table.
+    """
+    for extension in ["csv", "parquet"]:
+        path = output_table_path(table_name, extension)
+        if os.path.exists(path):
+            os.remove(path)
+
+def table_spec_output_files(table_spec:dict) -> List[str]:
+    """
+    Returns the paths of the files that `save_table_outputs` writes for a table spec of
+    DATASET_SPECS: its output table and, if it is split with AIRCRAFT_REGISTRY, the registry
+    table and the conflict report.
+
+    Args:
+        table_spec (dict): The table spec.
+
+    Returns:
+        List[str]: The file paths.
+    """
+    files = output_table_files(table_spec["output"])
+    if table_spec.get("registry") and settings.AIRCRAFT_REGISTRY:
+        files += output_table_files(table_spec["registry"]) + [report_path(table_spec["registry_report"])]
+    return files
+
+def save_table_outputs(dataframe:pd.DataFrame, table_spec:dict):
+    """
+    Saves a processed table as declared in its table spec of DATASET_SPECS.
+
+    If the spec has a 'registry' table and AIRCRAFT_REGISTRY is set, the table is split with
+    `split_aircraft_registry`: the registry and the link table (under the output name) are saved
+    and the conflicts are reported in REPORT_DIR_PATH. Otherwise the table is saved as is, and a
+    registry left by a previous run is removed.
+
+    Args:
+        dataframe (pd.DataFrame): The processed table.
+        table_spec (dict): The table spec.
+    """
+    registry_name = table_spec.get("registry")
+    if registry_name and settings.AIRCRAFT_REGISTRY:
+        registry, link, conflicts = split_aircraft_registry(dataframe)
+        logging.info(
+            f"Aircraft registry: {len(registry)} aircraft in {len(dataframe)} rows, "
+            f"{conflicts['matricula_aeronave'].nunique()} registrations with conflicting attributes.")
+        save_report(conflicts, table_spec["registry_report"])
+        save_output_table(registry, registry_name)
+        save_output_table(link, table_spec["output"])
+    else:
+        if registry_name:
+            remove_output_table(registry_name)
+        save_output_table(dataframe, table_spec["output"])
+
+def split_aircraft_registry(df_aeronave:pd.DataFrame,
+                            registry_columns:Optional[List[str]]=None) -> Tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame]:
+    """
+    Splits the 'aeronave' table into a deduplicated aircraft registry and a link table.
+
+    Each distinct 'matricula_aeronave' gets an 'id_aeronave' (int32, in sorted registration order).
+    Rows without a registration are keyed by their attributes instead. Rows are compared by a
+    hash of their registry columns. When a registration has several attribute versions, the
+    most frequent one is kept in the registry (the first one seen on ties), and its differing
+    columns are listed in the conflict report.
+
+    Args:
+        df_aeronave (pd.DataFrame): The processed 'aeronave' table.
+        registry_columns (List[str], optional): Aircraft attributes moved to the registry.
+            Defaults to AERONAVE_REGISTRY_COLUMNS.
+
+    Returns:
+        Tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame]: The registry ('id_aeronave' and the
+        registry columns), the link table ('id_aeronave' and the other columns) and the
+        conflict report (one row per conflicting registration and column).
+    """
+    registry_columns = [
+        col for col in (registry_columns or constants.AERONAVE_REGISTRY_COLUMNS.value)
+        if col in df_aeronave.columns]
+    attributes = df_aeronave[registry_columns]
+    row_hashes = pd.util.hash_pandas_object(attributes, index=False).to_numpy()
+
+    matriculas = df_aeronave["matricula_aeronave"]
+    registered = (matriculas.notna() & (matriculas.astype(str).str.strip() != "")).to_numpy()
+    keys = np.where(registered, matriculas.astype(str).to_numpy(), "#" + pd.Series(row_hashes).astype(str).to_numpy())
+    codes, _ = pd.factorize(pd.Series(keys), sort=True)
+
+    # Most frequent attribute version of each aircraft, the first one seen on ties
+    versions = pd.DataFrame({"codigo": codes, "hash": row_hashes, "linha": np.arange(len(codes))})
+    counts = versions.groupby(["codigo", "hash"], sort=False)["linha"].agg(["size", "min"]).reset_index()
+    chosen = counts.sort_values(["codigo", "size", "min"], ascending=[True, False, True])\
+        .drop_duplicates("codigo")
+
+    registry = attributes.iloc[chosen["min"].to_numpy()].reset_index(drop=True)
+    registry.insert(0, "id_aeronave", (chosen["codigo"].to_numpy() + 1).astype(np.int32))
+
+    link = df_aeronave.drop(columns=registry_columns)
+    link.insert(1 if "id_ocorrencia" in link.columns else 0, "id_aeronave", (codes + 1).astype(np.int32))
+
+    conflicting = counts["codigo"].value_counts()
+    conflicting = conflicting[conflicting > 1].index
+    conflicts = pd.DataFrame(columns=["matricula_aeronave", "coluna", "valores", "quantidade_linhas"])
+    if len(conflicting):
+        rows = np.isin(codes, conflicting)
+        subset = attributes[rows].astype(object).where(attributes[rows].notna(), None)
+        groups = subset.groupby(codes[rows], sort=True)
+        distinct = groups.nunique(dropna=False)
+        reports = []
+        for col in [col for col in registry_columns if col != "matricula_aeronave"]:
+            differing = distinct.index[distinct[col] > 1]
+            if not len(differing):
+                continue
+            values = groups[col].agg(lambda column: " | ".join(sorted({str(value) for value in column})))
+            reports.append(pd.DataFrame({
+                "matricula_aeronave": groups["matricula_aeronave"].first().loc[differing].to_numpy(),
+                "coluna": col,
+                "valores": values.loc[differing].to_numpy(),
+                "quantidade_linhas": groups.size().loc[differing].to_numpy()
+            }))
+        if reports:
+            conflicts = pd.concat(reports, ignore_index=True)\
+                .sort_values(["matricula_aeronave", "coluna"], ignore_index=True)
+    return registry, link, conflicts
+
+def save_report(report:pd.DataFrame, report_name:str):
+    """
+    Saves a data quality report as a CSV file in the report directory, which is not uploaded.
+
+    Args:
+        report (pd.DataFrame): The report.
+        report_name (str): Name of the report (e.g. 'br_cenipa_aeronave_conflitos').
+    """
+    os.makedirs(constants.REPORT_DIR_PATH.value, exist_ok=True)
+    report.to_csv(report_path(report_name), index=False)
+    logging.info(f"Report saved to {report_path(report_name)}")
+
+def report_path(report_name:str) -> str:
+    """
+    Returns the path of a data quality report (see `save_report`).
+
+    Args:
+        report_name (str): Name of the report.
+    """
+    return os.path.join(constants.REPORT_DIR_PATH.value, f"{report_name}.csv")
+
+def list_output_tables() -> List[str]:
+    """
+    Lists the tables saved in the output directory, as CSV or Parquet files.
+
+    Returns:
+        List[str]: The table names, sorted.
+    """
+    folder = constants.OUTPUT_DIR_PATH.value
+    return sorted({
+        os.path.splitext(f)[0] for f in os.listdir(folder)
+        if os.path.isfile(os.path.join(folder, f)) and f.endswith((".csv", ".parquet"))})
+
+def read_output_table(table_name:str, memory_map:bool=False) -> pd.DataFrame:
+    """
+    Reads a processed table from the output directory, preferring its typed Parquet file
+    over the CSV file.
+
+    Args:
+        table_name (str): Name of the output table (e.g. 'br_cenipa_ocorrencia').
+        memory_map (bool, optional): Memory-map the Parquet file instead of reading it. Defaults to False.
+
+    Returns:
+        pd.DataFrame: The table. Dates and times read from Parquet are `datetime.date`
+        and `datetime.time` objects, so they are written back as 'date32' and 'time64'.
+    """
+    parquet_path = output_table_path(table_name, "parquet")
+    if os.path.exists(parquet_path):
+        return pq.read_table(parquet_path, memory_map=memory_map).to_pandas()
+    return pd.read_csv(output_table_path(table_name, "csv"))
+
+def read_aircraft_table(memory_map:bool=False) -> pd.DataFrame:
+    """
+    Reads the 'aeronave' output table with the aircraft attributes, joining the link table
+    with the aircraft registry when the table was split (see AIRCRAFT_REGISTRY).
+
+    Args:
+        memory_map (bool, optional): Memory-map the Parquet files instead of reading them. Defaults to False.
+
+    Returns:
+        pd.DataFrame: One row per aircraft and occurrence.
+    """
+    df_aeronave = read_output_table("br_cenipa_aeronave", memory_map=memory_map)
+    if "id_aeronave" not in df_aeronave.columns or "matricula_aeronave" in df_aeronave.columns:
+        return df_aeronave
+    registry = read_output_table("br_cenipa_aeronave_registro", memory_map=memory_map)
+    return df_aeronave.merge(registry, on="id_aeronave", how="left", validate="many_to_one")
+
+def coerce_columns(dataframe:pd.DataFrame, columns:List[str], kernel:Callable):
+    """
+    Applies a coercion kernel (e.g. `coerce_floats`) to the given columns, in place.
+
+    Args:
+        dataframe (pd.DataFrame): The DataFrame to format.
+        columns (List[str]): List of column names to convert.
+        kernel (Callable): Function that converts a column.
+    """
+    for col in columns:
+        try:
+            dataframe[col] = kernel(dataframe[col])
+        except Exception as e:
+            logging.error(f"Unable to cast column {col} with {kernel.__name__} due to: {e}")
+            print(f"Unable to cast column {col} with {kernel.__name__} due to: {e}")
+
+def get_parquet_write_options(table_name:str, columns:List[str], overrides:dict=None) -> dict:
+    """
+    Resolves the Parquet write options of a table into `pyarrow.parquet.write_table` arguments.
+
+    Options are taken from the "default" entry of PARQUET_WRITE_OPTIONS, then from the table entry,
+    then from `overrides`; per-column entries (under "columns") take precedence over table-level ones.
+
+    Args:
+        table_name (str): Name of the output table (e.g. 'br_cenipa_recomendacao').
+        columns (List[str]): Columns of the table being written.
+        overrides (dict, optional): Options that override the configured ones.
+
+    Returns:
+        dict: Keyword arguments for `pyarrow.parquet.write_table`.
+    """
+    options = {}
+    column_options = {}
+    for source in [
+            constants.PARQUET_WRITE_OPTIONS.value["default"],
+            constants.PARQUET_WRITE_OPTIONS.value.get(table_name, {}),
+            overrides or {}]:
+        options.update({key: value for key, value in source.items() if key != "columns"})
+        for col, col_options in source.get("columns", {}).items():
+            column_options.setdefault(col, {}).update(col_options)
+
+    def column_option(col, key):
+        return column_options.get(col, {}).get(key, options.get(key))
+
+    compression = {col: column_option(col, "compression") for col in columns}
+    compression_level = {
+        col: column_option(col, "compression_level") for col in columns
+        if str(compression[col]).lower() in constants.PARQUET_LEVEL_CODECS.value
+        and column_option(col, "compression_level") is not None}
+    return {
+        "compression": compression,
+        "compression_level": compression_level or None,
+        "use_dictionary": [col for col in columns if column_option(col, "use_dictionary")],
+        "write_statistics": [col for col in columns if column_option(col, "write_statistics")],
+        "row_group_size": options.get("row_group_size")
+    }
+
+def write_parquet_buffer(table:pa.Table, write_options:dict) -> io.BytesIO:
+    """
+    Serializes an Arrow table as Parquet into an in-memory buffer.
+
+    Args:
+        table (pa.Table): The table to serialize.
+        write_options (dict): Options resolved by `get_parquet_write_options`.
+
+    Returns:
+        io.BytesIO: The Parquet file contents, positioned at the start.
+    """
+    buffer = io.BytesIO()
+    pq.write_table(table, buffer, **write_options)
+    buffer.seek(0)
+    return buffer
+
 def upload_dataframe_chunks_to_gcs(
     dataframe: pd.DataFrame,
     blob_prefix: str,
     bucket_name: str=os.getenv("GCP_BUCKET", "br_cenipa"),
-    chunk_size: int = 100_000):
+    chunk_size: int = 100_000,
+    write_options: dict = None):
     """
     Splits a DataFrame into chunks and uploads each chunk as a Parquet file to Google Cloud Storage.
 
     Args:
         dataframe (pd.DataFrame): The DataFrame to upload.
-        blob_prefix (str): Prefix for the blob (file) name in GCS.
+        blob_prefix (str): Prefix for the blob (file) name in GCS. Its last component is used
+            as the table name to look up the Parquet write options.
         bucket_name (str, optional): Name of the GCS bucket. Defaults to value from environment variable 'GCP_BUCKET'.
         chunk_size (int, optional): Number of rows per chunk/file. Defaults to 100,000.
+        write_options (dict, optional): Overrides for the table's Parquet write options.
     """
     client = storage.Client()
     bucket = client.bucket(bucket_name)
     num_chunks = math.ceil(len(dataframe) / chunk_size)
+    schema = pa.Schema.from_pandas(dataframe, preserve_index=False)
+    parquet_options = get_parquet_write_options(
+        os.path.basename(blob_prefix), list(dataframe.columns), write_options)
 
     for i in range(num_chunks):
         start = i * chunk_size
         end = min((i + 1) * chunk_size, len(dataframe))
         chunk = dataframe.iloc[start:end]
-        buffer = io.BytesIO()
-        chunk.to_parquet(buffer, index=False)
-        buffer.seek(0)
+        buffer = write_parquet_buffer(
+            pa.Table.from_pandas(chunk, schema=schema, preserve_index=False),
+            parquet_options)
         blob_name = f"{blob_prefix}_part{i+1}.parquet"
         blob = bucket.blob(blob_name)
         blob.upload_from_file(buffer, content_type='application/octet-stream')
-        logging.info(f"Chunk {i+1}/{num_chunks} enviado para gs://{bucket_name}/{blob_name}")
\ No newline at end of file
+        logging.info(f"Chunk {i+1}/{num_chunks} enviado para gs://{bucket_name}/{blob_name}")
+
+def build_partition_keys(df_fact_table:pd.DataFrame) -> pd.DataFrame:
+    """
+    Builds the partition keys ('ano' and 'sigla_uf') of each occurrence from the fact table,
+    so that the fact table and the dimension tables can share the same partition layout.
+
+    Args:
+        df_fact_table (pd.DataFrame): The processed fact table, with 'id_ocorrencia',
+            'data_ocorrencia' and 'sigla_uf' columns.
+
+    Returns:
+        pd.DataFrame: One row per 'id_ocorrencia' with its 'ano' and 'sigla_uf' partition keys.
+    """
+    partition_keys = pd.DataFrame({
+        "id_ocorrencia": df_fact_table["id_ocorrencia"],
+        "ano": pd.to_datetime(
+            df_fact_table[constants.PARTITION_DATE_COLUMN.value],
+            errors="coerce").dt.year.astype("Int64"),
+        "sigla_uf": df_fact_table["sigla_uf"]
+    })
+    return partition_keys.drop_duplicates(subset="id_ocorrencia")
+
+def add_partition_columns(dataframe:pd.DataFrame, partition_keys:pd.DataFrame) -> pd.DataFrame:
+    """
+    Adds the partition columns missing from a table by joining it with the partition keys
+    on 'id_ocorrencia'.
+
+    Args:
+        dataframe (pd.DataFrame): The table to partition.
+        partition_keys (pd.DataFrame): The partition keys built by `build_partition_keys`.
+
+    Returns:
+        pd.DataFrame: The table with all partition columns.
+    """
+    if "ano" not in dataframe.columns and constants.PARTITION_DATE_COLUMN.value in dataframe.columns:
+        dataframe = dataframe.assign(ano=pd.to_datetime(
+            dataframe[constants.PARTITION_DATE_COLUMN.value],
+            errors="coerce").dt.year.astype("Int64"))
+    missing_columns = [
+        col for col in constants.PARTITION_COLUMNS.value
+        if col not in dataframe.columns]
+    if not missing_columns:
+        return dataframe
+    return dataframe.merge(
+        partition_keys[["id_ocorrencia", *missing_columns]],
+        on="id_ocorrencia",
+        how="left")
+
+def format_partition_values(series:pd.Series) -> pd.Series:
+    """
+    Formats a partition column as strings, replacing missing values by the Hive default partition.
+
+    Args:
+        series (pd.Series): The partition column.
+
+    Returns:
+        pd.Series: The partition values as strings.
+    """
+    values = series.astype("string").str.strip()
+    return values.mask(values.isna() | (values == ""), constants.PARTITION_NULL_VALUE.value)\
+        .astype(str)
+
+def estimate_rows_per_file(
+    dataframe: pd.DataFrame,
+    schema: pa.Schema,
+    parquet_options: dict,
+    target_file_size: int,
+    sample_rows: int = 10_000) -> int:
+    """
+    Estimates how many rows fit in a Parquet file of `target_file_size` bytes by encoding a
+    sample of the rows with the table's write options. The in-memory size of a DataFrame is a
+    poor proxy: compression and dictionary encoding usually shrink it several times.
+
+    Args:
+        dataframe (pd.DataFrame): The data columns to write.
+        schema (pa.Schema): The Arrow schema of the data columns.
+        parquet_options (dict): The Parquet write options of the table.
+        target_file_size (int): Target file size in bytes.
+        sample_rows (int, optional): Number of rows encoded to measure the size. Defaults to 10,000.
+
+    Returns:
+        int: The number of rows per file, at least 1.
+    """
+    if dataframe.empty:
+        return 1
+    step = max(len(dataframe) // sample_rows, 1)
+    sample = dataframe.iloc[::step].iloc[:sample_rows]
+    buffer = write_parquet_buffer(
+        pa.Table.from_pandas(sample, schema=schema, preserve_index=False),
+        parquet_options)
+    bytes_per_row = buffer.getbuffer().nbytes / len(sample)
+    return max(int(target_file_size / max(bytes_per_row, 1)), 1)
+
+def iter_partitioned_parquet(
+    dataframe: pd.DataFrame,
+    table_name: str,
+    partition_columns: List[str] = constants.PARTITION_COLUMNS.value,
+    target_file_size: int = settings.PARQUET_TARGET_FILE_SIZE,
+    write_options: dict = None) -> Iterator[Tuple[str, io.BytesIO]]:
+    """
+    Splits a DataFrame into Hive-style partitions (e.g. 'ano=2020/sigla_uf=SP/') and serializes
+    each partition as one or more Parquet files of roughly `target_file_size` bytes.
+
+    Rows are sorted inside each partition so that the min/max statistics of each row group
+    are narrow enough for readers to skip them.
+
+    Args:
+        dataframe (pd.DataFrame): The DataFrame to write, including the partition columns.
+        table_name (str): Name of the table, used to look up the Parquet write options.
+        partition_columns (List[str], optional): Columns used as partition keys.
+        target_file_size (int, optional): Target file size in bytes, estimated from the encoded
+            size of a sample of the rows.
+        write_options (dict, optional): Overrides for the table's Parquet write options
+            (compression, row_group_size, write_statistics...).
+
+    Yields:
+        Tuple[str, io.BytesIO]: The relative path of each Parquet file and its contents.
+    """
+    dataframe = dataframe.assign(**{
+        col: format_partition_values(dataframe[col]) for col in partition_columns})
+    data_columns = [col for col in dataframe.columns if col not in partition_columns]
+    schema = pa.Schema.from_pandas(dataframe[data_columns], preserve_index=False)
+    parquet_options = get_parquet_write_options(table_name, data_columns, write_options)
+    sort_columns = [
+        col for col in [constants.PARTITION_DATE_COLUMN.value, "id_ocorrencia"]
+        if col in data_columns]
+
+    rows_per_file = estimate_rows_per_file(
+        dataframe[data_columns], schema, parquet_options, target_file_size)
+
+    for partition_values, partition in dataframe.groupby(partition_columns, sort=True):
+        if not isinstance(partition_values, tuple):
+            partition_values = (partition_values,)
+        partition_path = "/".join(
+            f"{col}={value}" for col, value in zip(partition_columns, partition_values))
+        partition = partition[data_columns]
+        if sort_columns:
+            partition = partition.sort_values(sort_columns, kind="stable")
+
+        num_files = math.ceil(len(partition) / rows_per_file)
+        for i in range(num_files):
+            table = pa.Table.from_pandas(
+                partition.iloc[i * rows_per_file:(i + 1) * rows_per_file],
+                schema=schema,
+                preserve_index=False)
+            buffer = write_parquet_buffer(table, parquet_options)
+            yield f"{partition_path}/part-{i:05d}.parquet", buffer
+
+def upload_partitioned_dataframe_to_gcs(
+    dataframe: pd.DataFrame,
+    blob_prefix: str,
+    bucket_name: str=os.getenv("GCP_BUCKET", "br_cenipa"),
+    partition_columns: List[str] = constants.PARTITION_COLUMNS.value,
+    target_file_size: int = settings.PARQUET_TARGET_FILE_SIZE,
+    write_options: dict = None):
+    """
+    Uploads a DataFrame to Google Cloud Storage as Hive-partitioned Parquet files
+    (e.g. 'gs://bucket/prefix/ano=2020/sigla_uf=SP/part-00000.parquet'), so that engines such as
+    BigQuery external tables and DuckDB can prune partitions. Files previously uploaded under
+    the prefix are deleted first.
+
+    Args:
+        dataframe (pd.DataFrame): The DataFrame to upload, including the partition columns.
+        blob_prefix (str): Prefix for the partitioned dataset in GCS. Its last component is used
+            as the table name to look up the Parquet write options.
+        bucket_name (str, optional): Name of the GCS bucket. Defaults to value from environment variable 'GCP_BUCKET'.
+        partition_columns (List[str], optional): Columns used as partition keys.
+        target_file_size (int, optional): Target file size in bytes.
+        write_options (dict, optional): Overrides for the table's Parquet write options.
+    """
+    client = storage.Client()
+    bucket = client.bucket(bucket_name)
+
+    # Files of partitions that no longer exist (or that now have fewer files) would otherwise
+    # be read back together with the new ones
+    for blob in bucket.list_blobs(prefix=f"{blob_prefix}/"):
+        blob.delete()
+        logging.info(f"Arquivo antigo removido de gs://{bucket_name}/{blob.name}")
+
+    for relative_path, buffer in iter_partitioned_parquet(
+            dataframe,
+            os.path.basename(blob_prefix),
+            partition_columns=partition_columns,
+            target_file_size=target_file_size,
+            write_options=write_options):
+        blob_name = f"{blob_prefix}/{relative_path}"
+        blob = bucket.blob(blob_name)
+        blob.upload_from_file(buffer, content_type='application/octet-stream')
+        logging.info(f"Partição enviada para gs://{bucket_name}/{blob_name}")
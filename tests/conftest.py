@@ -0,0 +1,21 @@
+# -*- coding: utf-8 -*-
+"""
+Test configuration: the constants are read from the environment when `src.constants` is first
+imported, so the data directories are pointed at a temporary directory before any test module
+imports the project.
+"""
+
+import os
+import tempfile
+
+TEST_DATA_DIR = tempfile.mkdtemp(prefix="br_cenipa_tests_")
+
+os.environ.update(
+    INPUT_DIR_PATH=os.path.join(TEST_DATA_DIR, "input"),
+    OUTPUT_DIR_PATH=os.path.join(TEST_DATA_DIR, "output"),
+    REPORT_DIR_PATH=os.path.join(TEST_DATA_DIR, "output", "relatorios"),
+    INDEX_DIR_PATH=os.path.join(TEST_DATA_DIR, "output", "indices"),
+    TASK_CACHE_STATE_PATH=os.path.join(TEST_DATA_DIR, "output", ".cache"),
+    TASK_CACHE="true")
+for folder in ["input", "output"]:
+    os.makedirs(os.path.join(TEST_DATA_DIR, folder), exist_ok=True)
@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+"""
+Tests for the split of the 'aeronave' table into the aircraft registry and the link table.
+"""
+
+import os
+
+import pandas as pd
+
+from src.constants import settings
+from src.utils.datasets import get_table_spec
+from src.utils.utils import (
+    output_table_files,
+    read_aircraft_table,
+    save_table_outputs,
+    split_aircraft_registry
+)
+
+COLUMNS = ["matricula_aeronave", "nome_fabricante", "nome_modelo"]
+
+def aeronave_table(rows):
+    dataframe = pd.DataFrame(rows, columns=COLUMNS)
+    dataframe.insert(0, "id_ocorrencia", range(1, len(dataframe) + 1))
+    dataframe["fase_operacao"] = "cruzeiro"
+    return dataframe
+
+def test_most_frequent_version_is_kept():
+    registry, link, conflicts = split_aircraft_registry(aeronave_table([
+        ["PPABC", "EMBRAER", "EMB-110"],
+        ["PPABC", "NEIVA", "EMB-110"],
+        ["PPABC", "NEIVA", "EMB-110"],
+        ["PRXYZ", "BOEING", "737"]]), COLUMNS)
+
+    assert registry.to_dict("records") == [
+        {"id_aeronave": 1, "matricula_aeronave": "PPABC", "nome_fabricante": "NEIVA", "nome_modelo": "EMB-110"},
+        {"id_aeronave": 2, "matricula_aeronave": "PRXYZ", "nome_fabricante": "BOEING", "nome_modelo": "737"}]
+    assert link["id_aeronave"].tolist() == [1, 1, 1, 2]
+    assert conflicts.to_dict("records") == [{
+        "matricula_aeronave": "PPABC", "coluna": "nome_fabricante",
+        "valores": "EMBRAER | NEIVA", "quantidade_linhas": 3}]
+
+def test_ties_keep_the_first_version_seen():
+    rows = [["PPABC", "EMBRAER", "EMB-110"], ["PPABC", "NEIVA", "EMB-110"]]
+    for order in [rows, rows[::-1]]:
+        registry, _, conflicts = split_aircraft_registry(aeronave_table(order * 2), COLUMNS)
+        assert registry["nome_fabricante"].tolist() == [order[0][1]]
+        assert conflicts["valores"].tolist() == ["EMBRAER | NEIVA"]
+
+def test_aircraft_without_registration_are_keyed_by_their_attributes():
+    registry, link, conflicts = split_aircraft_registry(aeronave_table([
+        [None, "CESSNA", "152"],
+        ["", "CESSNA", "152"],
+        [None, "PIPER", "PA-28"]]), COLUMNS)
+    assert len(registry) == 3
+    assert link["id_aeronave"].nunique() == 3
+    assert conflicts.empty
+
+def test_read_aircraft_table_joins_the_registry(monkeypatch):
+    monkeypatch.setattr(settings, "AIRCRAFT_REGISTRY", True)
+    table_spec = get_table_spec("br_cenipa", "aeronave.csv")
+    df_aeronave = aeronave_table([
+        ["PPABC", "NEIVA", "EMB-110"],
+        ["PRXYZ", "BOEING", "737"],
+        ["PPABC", "NEIVA", "EMB-110"]])
+    save_table_outputs(df_aeronave, table_spec)
+
+    joined = read_aircraft_table().sort_values("id_ocorrencia", ignore_index=True)
+    pd.testing.assert_frame_equal(
+        joined[df_aeronave.columns], df_aeronave, check_dtype=False)
+    assert joined["id_aeronave"].tolist() == [1, 2, 1]
+
+def test_registry_is_removed_when_disabled(monkeypatch):
+    table_spec = get_table_spec("br_cenipa", "aeronave.csv")
+    monkeypatch.setattr(settings, "AIRCRAFT_REGISTRY", True)
+    df_aeronave = aeronave_table([["PPABC", "NEIVA", "EMB-110"]])
+    save_table_outputs(df_aeronave, table_spec)
+
+    monkeypatch.setattr(settings, "AIRCRAFT_REGISTRY", False)
+    save_table_outputs(df_aeronave, table_spec)
+    assert not any(os.path.exists(path) for path in output_table_files(table_spec["registry"]))
+    pd.testing.assert_frame_equal(read_aircraft_table(), df_aeronave, check_dtype=False)
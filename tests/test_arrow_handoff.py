@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+"""
+Tests for the Arrow IPC copies of the input tables written by the extract stage.
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.constants import settings
+from src.utils.utils import arrow_ipc_path, correct_file_encoding, read_input_table
+
+RAW_CSV = (
+    "codigo_ocorrencia;ocorrencia_uf;ocorrencia_latitude;total_recomendacoes\n"
+    "1;SP;-23,5;2\n"
+    "2;;***;\n"
+    "3;MG;;0\n")
+
+@pytest.fixture
+def input_folder(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "ARROW_HANDOFF", True)
+    (tmp_path / "ocorrencia.csv").write_bytes(RAW_CSV.replace("MG", "São Paulo").encode("latin1"))
+    correct_file_encoding("ocorrencia.csv", folder=str(tmp_path))
+    return str(tmp_path)
+
+def read_csv(folder):
+    return pd.read_csv(os.path.join(folder, "ocorrencia.csv"), sep=";", encoding="utf-8")
+
+def test_ipc_copy_matches_the_csv(input_folder):
+    assert os.path.exists(arrow_ipc_path(os.path.join(input_folder, "ocorrencia.csv")))
+    dataframe = read_input_table("ocorrencia.csv", folder=input_folder)
+    pd.testing.assert_frame_equal(dataframe, read_csv(input_folder))
+    assert dataframe.loc[2, "ocorrencia_uf"] == "São Paulo"
+
+def test_nulls_of_object_columns_come_back_as_nan(input_folder):
+    dataframe = read_input_table("ocorrencia.csv", folder=input_folder)
+    # Arrow turns nulls of string columns into None; the transforms expect NaN, as read_csv gives
+    assert dataframe["ocorrencia_uf"].dtype == object
+    assert dataframe.loc[1, "ocorrencia_uf"] is not None
+    assert np.isnan(dataframe.loc[1, "ocorrencia_uf"])
+    assert np.isnan(dataframe.loc[2, "ocorrencia_latitude"])
+    assert np.isnan(dataframe.loc[1, "total_recomendacoes"])
+
+def test_csv_is_read_when_the_copy_is_older(input_folder):
+    csv_path = os.path.join(input_folder, "ocorrencia.csv")
+    read_csv(input_folder).assign(ocorrencia_uf="RJ").to_csv(csv_path, sep=";", index=False)
+    ipc_mtime = os.path.getmtime(arrow_ipc_path(csv_path))
+    os.utime(csv_path, (ipc_mtime + 10, ipc_mtime + 10))
+    assert (read_input_table("ocorrencia.csv", folder=input_folder)["ocorrencia_uf"] == "RJ").all()
+
+def test_csv_is_read_when_the_copy_is_unreadable(input_folder):
+    with open(arrow_ipc_path(os.path.join(input_folder, "ocorrencia.csv")), "wb") as f:
+        f.write(b"not an arrow file")
+    pd.testing.assert_frame_equal(
+        read_input_table("ocorrencia.csv", folder=input_folder), read_csv(input_folder))
+
+def test_no_copy_without_arrow_handoff(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "ARROW_HANDOFF", False)
+    (tmp_path / "ocorrencia.csv").write_bytes(RAW_CSV.encode("latin1"))
+    correct_file_encoding("ocorrencia.csv", folder=str(tmp_path))
+    assert not os.path.exists(arrow_ipc_path(str(tmp_path / "ocorrencia.csv")))
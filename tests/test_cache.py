@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+"""
+Tests for the transform task cache keys.
+"""
+
+import inspect
+import os
+from types import SimpleNamespace
+
+from src.constants import constants
+from src.utils.utils import code_hash, coerce_floats, input_hash_cache_key, output_table_files
+
+CONTEXT = SimpleNamespace(task=SimpleNamespace(name="type_cast_test_table"))
+
+def write(path, content):
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(content)
+
+def test_key_is_kept_from_the_first_run_while_outputs_exist():
+    write(os.path.join(constants.INPUT_DIR_PATH.value, "teste.csv"), "a;b\n1;2\n")
+    outputs = output_table_files("br_cenipa_teste")
+    cache_key_fn = input_hash_cache_key(["teste.csv"], ["BOOL_LOOKUP"], outputs)
+
+    # First run: the outputs don't exist yet, but the result is still stored under a key
+    first_key = cache_key_fn(CONTEXT, {})
+    assert first_key is not None
+    for path in outputs:
+        write(path, "")
+    # Second run: same key, so the stored result is used
+    assert cache_key_fn(CONTEXT, {}) == first_key
+
+    # A missing output (CSV or Parquet) changes the key once, so the task runs again
+    os.remove(outputs[-1])
+    refreshed_key = cache_key_fn(CONTEXT, {})
+    assert refreshed_key != first_key
+    write(outputs[-1], "")
+    assert cache_key_fn(CONTEXT, {}) == refreshed_key
+
+def test_key_changes_with_the_inputs():
+    path = os.path.join(constants.INPUT_DIR_PATH.value, "teste_entrada.csv")
+    write(path, "a\n1\n")
+    cache_key_fn = input_hash_cache_key(["teste_entrada.csv"])
+    first_key = cache_key_fn(CONTEXT, {})
+    write(path, "a\n2\n")
+    os.utime(path, ns=(0, 10 ** 9))
+    assert cache_key_fn(CONTEXT, {}) != first_key
+
+def test_no_key_without_inputs():
+    assert input_hash_cache_key(["inexistente.csv"])(CONTEXT, {}) is None
+
+def test_key_includes_settings_and_constants():
+    write(os.path.join(constants.INPUT_DIR_PATH.value, "teste_config.csv"), "a\n1\n")
+    cache_key_fn = input_hash_cache_key(["teste_config.csv"], ["SPATIAL_GRID_RESOLUTION", "RENAME_MAPPING"])
+    assert cache_key_fn(CONTEXT, {}) is not None
+
+def test_key_changes_with_the_table_spec():
+    write(os.path.join(constants.INPUT_DIR_PATH.value, "teste_spec.csv"), "a\n1\n")
+    table_spec = {"output": "br_cenipa_teste", "rename": {"a": "b"}, "spec": {"string": ["b"]}}
+    first_key = input_hash_cache_key(["teste_spec.csv"], table_specs=[table_spec])(CONTEXT, {})
+    changed_spec = {**table_spec, "rename": {"a": "c"}}
+    assert input_hash_cache_key(["teste_spec.csv"], table_specs=[changed_spec])(CONTEXT, {}) != first_key
+
+def test_key_changes_with_the_code_the_task_calls(monkeypatch):
+    from src.tasks.transform import type_cast_fact_table
+    write(os.path.join(constants.INPUT_DIR_PATH.value, "teste_codigo.csv"), "a\n1\n")
+    context = SimpleNamespace(task=type_cast_fact_table)
+    cache_key_fn = input_hash_cache_key(["teste_codigo.csv"])
+    first_key = cache_key_fn(context, {})
+    assert cache_key_fn(context, {}) == first_key
+
+    # A kernel called through the table plan changes, not the task itself
+    getsource = inspect.getsource
+    monkeypatch.setattr(
+        inspect, "getsource", lambda obj: getsource(obj) + "\n# changed" if obj is coerce_floats else getsource(obj))
+    code_hash.cache_clear()
+    try:
+        assert cache_key_fn(context, {}) != first_key
+    finally:
+        monkeypatch.undo()
+        code_hash.cache_clear()
@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+"""
+Parity tests between the column coercion kernels and the legacy per-row helpers.
+"""
+
+import numpy as np
+import pandas as pd
+
+from src.utils.utils import (
+    coerce_bools,
+    coerce_dates,
+    coerce_floats,
+    coerce_time,
+    format_bools,
+    format_date,
+    format_floats,
+    format_time,
+    parse_lat_long,
+    transform_lat_long
+)
+
+def legacy(helper, values):
+    """
+    Applies a legacy `format_*` helper to each value on its own, so one unparseable value
+    does not leave the rest of the column uncast.
+    """
+    results = []
+    for value in values:
+        dataframe = pd.DataFrame({"coluna": pd.Series([value], dtype=object)})
+        helper(dataframe, ["coluna"])
+        results.append(dataframe["coluna"].iloc[0])
+    return results
+
+def test_floats_match_the_legacy_helper():
+    raw = pd.Series(["12,5", " 3.25 ", "1 000,5", "-7", "0"], dtype=object)
+    expected = [float(value) for value in legacy(format_floats, raw)]
+    assert coerce_floats(raw).tolist() == expected
+
+def test_missing_floats_become_na_instead_of_zero():
+    raw = pd.Series(["nan", np.nan, "", "***", "abc"], dtype=object)
+    # The legacy helper turned 'nan' and NaN into 0 and left the others as strings
+    assert legacy(format_floats, raw)[:2] == [0.0, 0.0]
+    result = coerce_floats(raw)
+    assert result.dtype == "Float64"
+    assert result.isna().all()
+
+def test_lat_long_matches_the_per_row_parser():
+    raw = pd.Series(["-23.5", "-235", "***", "0°", "-8.0123", "***.***", "-47°55"], dtype=object)
+    expected = raw\
+        .astype(str)\
+        .str.replace(r'\*+', '0', regex=True)\
+        .replace(r'°', '', regex=True)\
+        .apply(transform_lat_long)\
+        .astype(float)
+    assert parse_lat_long(raw).tolist() == expected.tolist()
+    assert pd.isna(parse_lat_long(pd.Series([np.nan, ""], dtype=object))).all()
+
+def test_bools_match_the_legacy_mapping():
+    raw = pd.Series(["Sim", " sim ", "não", " NÃO ", "nao", "True", "False"], dtype=object)
+    assert coerce_bools(raw).tolist() == [True, True, False, False, False, True, False]
+    # The legacy helper mapped 'sim'/'não' to 'True'/'False' and then cast with `astype(bool)`,
+    # which turns every non-empty string (the 'False' it wrote included) into True
+    assert legacy(format_bools, raw) == [True] * len(raw)
+
+def test_unmapped_bools_become_na_instead_of_true():
+    raw = pd.Series(["***", "indeterminado", "", np.nan], dtype=object)
+    assert legacy(format_bools, raw)[:2] == [True, True]
+    result = coerce_bools(raw)
+    assert result.dtype == "boolean"
+    assert result.isna().all()
+
+def test_time_matches_the_legacy_helper():
+    raw = pd.Series(["10:20:30", " 08:00:00", "00:00:00", "25:00:00", "", "***", np.nan], dtype=object)
+    expected = legacy(format_time, raw)
+    result = coerce_time(raw)
+    assert result.dtype == "timedelta64[ns]"
+    formatted = (pd.Timestamp(0) + result).dt.strftime("%H:%M:%S")
+    assert formatted.isna().tolist() == pd.isna(expected).tolist()
+    assert formatted.dropna().tolist() == [value for value in expected if not pd.isna(value)]
+
+def test_dates_match_the_legacy_helper():
+    raw = pd.Series([
+        "25/12/2020", "01-02-2021", "2021-03-04", "2021/05/06 ",
+        "31/02/2021", "2021-13-01", "", "***", np.nan], dtype=object)
+    expected = legacy(format_date, raw)
+    result = coerce_dates(raw)
+    assert pd.api.types.is_datetime64_any_dtype(result.dtype)
+    formatted = result.dt.strftime("%Y-%m-%d")
+    assert formatted.isna().tolist() == pd.isna(expected).tolist()
+    assert formatted.dropna().tolist() == [value for value in expected if not pd.isna(value)]
+    assert formatted.tolist()[:4] == ["2020-12-25", "2021-02-01", "2021-03-04", "2021-05-06"]
+
+def test_dates_of_a_single_format_column_match_the_legacy_helper():
+    raw = pd.Series(["25/12/2020", "01/02/2021", "25/12/2020", "31/02/2021"], dtype=object)
+    dataframe = pd.DataFrame({"coluna": raw.copy()})
+    format_date(dataframe, ["coluna"])
+    formatted = coerce_dates(raw).dt.strftime("%Y-%m-%d")
+    assert formatted.tolist()[:3] == dataframe["coluna"].tolist()[:3]
+    assert pd.isna(formatted.iloc[3]) and pd.isna(dataframe["coluna"].iloc[3])
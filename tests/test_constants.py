@@ -0,0 +1,39 @@
+# -*- coding: utf-8 -*-
+"""
+Tests for the constants and settings of the br_cenipa project.
+"""
+
+import os
+import subprocess
+import sys
+
+from src.constants import constants, settings
+
+def test_constants_hold_no_flags():
+    # Enum members with equal values are aliases, so True and 1 would share a member
+    flags = [member.name for member in constants if isinstance(member.value, (bool, int, float))]
+    assert flags == []
+
+def test_settings_keep_their_types():
+    assert settings.FACT_TABLE_WORKERS == int(os.getenv("FACT_TABLE_WORKERS", 1))
+    assert type(settings.FACT_TABLE_WORKERS) is int
+    assert type(settings.TASK_CACHE) is bool
+
+def test_settings_keep_their_types_with_colliding_values():
+    # Settings that used to collapse into ARROW_HANDOFF
+    environment = dict(
+        os.environ,
+        PIPELINE_WORKERS="1",
+        FACT_TABLE_WORKERS="1",
+        PLAN_WORKERS="1",
+        DATASET_WORKERS="1",
+        HTTP_POOL_SIZE="1",
+        ARROW_HANDOFF="true",
+        TASK_CACHE="true")
+    script = (
+        "from src.constants import settings as s; "
+        "assert s.ARROW_HANDOFF is True and s.TASK_CACHE is True; "
+        "assert all(type(value) is int and value == 1 for value in "
+        "[s.PIPELINE_WORKERS, s.FACT_TABLE_WORKERS, s.PLAN_WORKERS, s.DATASET_WORKERS, s.HTTP_POOL_SIZE])")
+    subprocess.run([sys.executable, "-c", script], env=environment, check=True,
+                   cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
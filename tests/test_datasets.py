@@ -0,0 +1,36 @@
+# -*- coding: utf-8 -*-
+"""
+Tests for the table specs shared by the CENIPA tasks and the multi-dataset flow.
+"""
+
+import os
+import pandas as pd
+
+from src.constants import settings
+from src.utils.datasets import get_table_spec
+from src.utils.utils import read_aircraft_table, save_table_outputs, table_spec_output_files
+
+def test_aircraft_table_is_saved_as_registry_and_link_table(monkeypatch):
+    monkeypatch.setattr(settings, "AIRCRAFT_REGISTRY", True)
+    table_spec = get_table_spec("br_cenipa", "aeronave.csv")
+    df_aeronave = pd.DataFrame({
+        "id_ocorrencia": [1, 2, 3],
+        "matricula_aeronave": ["PPABC", "PPABC", "PRXYZ"],
+        "nome_modelo": ["A320", "A320", "B737"],
+        "fase_operacao": ["pouso", "decolagem", "cruzeiro"]
+    })
+    save_table_outputs(df_aeronave, table_spec)
+
+    # Every file listed for the cache key is written
+    assert all(os.path.exists(path) for path in table_spec_output_files(table_spec))
+    link = pd.read_csv(table_spec_output_files(table_spec)[0])
+    assert "nome_modelo" not in link.columns
+    assert link["id_aeronave"].tolist() == [1, 1, 2]
+    joined = read_aircraft_table()
+    assert joined.sort_values("id_ocorrencia")["nome_modelo"].tolist() == ["A320", "A320", "B737"]
+
+def test_tables_without_registry_are_saved_as_is():
+    table_spec = get_table_spec("br_cenipa", "fator_contribuinte.csv")
+    save_table_outputs(pd.DataFrame({"id_ocorrencia": [1], "nome_fator": ["fadiga"]}), table_spec)
+    assert table_spec_output_files(table_spec)[0].endswith("br_cenipa_fator_contribuinte.csv")
+    assert pd.read_csv(table_spec_output_files(table_spec)[0]).columns.tolist() == ["id_ocorrencia", "nome_fator"]
@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+"""
+Parity tests between the table spec applied in a single process and in row partitions
+across a process pool.
+"""
+
+import numpy as np
+import pandas as pd
+
+from src.constants import constants, settings
+from src.utils.benchmark import synthetic_output_tables
+from src.utils.plan import apply_table_spec, apply_table_spec_partitioned, restore_partition_dtypes
+
+def fact_table(rows=400):
+    dataframe = synthetic_output_tables(1)["br_cenipa_ocorrencia"].iloc[:rows].reset_index(drop=True)
+    # Every column is null in the last partitions, so they come back from Arrow without a dtype
+    for col in dataframe.columns.drop("id_ocorrencia"):
+        dataframe.loc[rows // 2:, col] = np.nan
+    # Columns outside the spec are kept as they are, even if Arrow would infer another type
+    dataframe["total_aeronaves_envolvidas"] = pd.Series([1, 2] * (rows // 2), dtype=object)
+    dataframe["ocorrencia_saida_pista"] = pd.Series([1, None] * (rows // 2), dtype=object)
+    dataframe.index = dataframe.index + 1000
+    return dataframe
+
+def test_partitioned_result_matches_the_single_process(monkeypatch):
+    monkeypatch.setattr(settings, "FACT_TABLE_PARTITION_MIN_ROWS", 50)
+    dataframe = fact_table()
+    original = dataframe.copy()
+    spec = constants.FACT_TABLE_SPEC.value
+
+    single = dataframe.copy()
+    apply_table_spec(single, spec)
+    partitioned = apply_table_spec_partitioned(dataframe, spec, workers=2)
+
+    pd.testing.assert_frame_equal(partitioned, single)
+    pd.testing.assert_frame_equal(dataframe, original)
+
+def test_small_tables_are_not_split(monkeypatch):
+    monkeypatch.setattr(settings, "FACT_TABLE_PARTITION_MIN_ROWS", 10_000)
+    dataframe = fact_table(40)
+    single = dataframe.copy()
+    apply_table_spec(single, constants.FACT_TABLE_SPEC.value)
+    pd.testing.assert_frame_equal(
+        apply_table_spec_partitioned(dataframe, constants.FACT_TABLE_SPEC.value, workers=2), single)
+
+def test_dtypes_widened_by_concat_are_restored():
+    partitions = [
+        pd.DataFrame({"latitude": pd.array([-23.5], dtype="Float64"), "data": pd.to_datetime(["2020-01-01"])}),
+        pd.DataFrame({"latitude": pd.Series([None], dtype=object), "data": pd.Series([None], dtype=object)})]
+    # pandas 2 still leaves all-NA entries out when picking the dtype of a concat, but that is
+    # deprecated: later versions return object columns, as here
+    merged = pd.concat([partition.astype(object) for partition in partitions], ignore_index=True)
+    restore_partition_dtypes(merged, partitions)
+    assert merged["latitude"].dtype == "Float64"
+    assert merged["data"].dtype == "datetime64[ns]"
+    assert merged["latitude"].isna().tolist() == [False, True]
@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+"""
+Tests for copy-on-write in the transform stages and the memory report.
+"""
+
+import sys
+
+import pandas as pd
+import pytest
+
+from src.tasks.transform import CENIPA_DATASET, cast_table, prepare_table
+from src.utils.benchmark import benchmark_transform_memory, make_synthetic_tables
+from src.utils.datasets import get_table_spec
+from src.utils.memory import copy_on_write_enabled, merge_memory_report, writable_copy
+from src.utils.plan import apply_table_spec
+from src.utils.utils import split_aircraft_registry
+
+def transform_tables(copy_on_write):
+    """
+    Runs the prepare and cast stages on the synthetic tables with copy-on-write on or off.
+    """
+    with pd.option_context("mode.copy_on_write", copy_on_write):
+        assert copy_on_write_enabled() == copy_on_write
+        outputs = {}
+        for file_name, raw in make_synthetic_tables(1).items():
+            table_spec = get_table_spec(CENIPA_DATASET, file_name)
+            outputs[file_name] = cast_table(prepare_table(raw, table_spec), table_spec)
+        outputs["registro"], outputs["aeronave.csv"], outputs["conflitos"] = split_aircraft_registry(outputs["aeronave.csv"])
+        return outputs
+
+def test_copy_on_write_does_not_change_the_outputs():
+    with_cow, without_cow = transform_tables(True), transform_tables(False)
+    assert with_cow.keys() == without_cow.keys()
+    for name in with_cow:
+        pd.testing.assert_frame_equal(with_cow[name], without_cow[name], obj=name)
+
+@pytest.mark.parametrize("copy_on_write", [True, False])
+def test_writable_copy_does_not_modify_the_input(copy_on_write):
+    with pd.option_context("mode.copy_on_write", copy_on_write):
+        raw = make_synthetic_tables(1)["ocorrencia.csv"]
+        table_spec = get_table_spec(CENIPA_DATASET, "ocorrencia.csv")
+        prepared = prepare_table(raw, table_spec)
+        before = prepared.copy(deep=True)
+
+        dataframe = writable_copy(prepared)
+        apply_table_spec(dataframe, table_spec["spec"])
+        dataframe.iloc[0, 0] = None
+
+        pd.testing.assert_frame_equal(prepared, before)
+        assert not dataframe.equals(before)
+
+def test_memory_report_keeps_the_stages_skipped_by_the_cache():
+    columns = ["etapa", "pico_mib"]
+    previous = pd.DataFrame([["load_fact_table", 10.0], ["type_cast_fact_table", 20.0]], columns=columns)
+    report = pd.DataFrame([["type_cast_fact_table", 15.0], ["type_cast_fact_table", 16.0]], columns=columns)
+    merged = merge_memory_report(report, previous)
+    assert merged.values.tolist() == [
+        ["load_fact_table", 10.0], ["type_cast_fact_table", 15.0], ["type_cast_fact_table", 16.0]]
+    assert merge_memory_report(report, None).equals(report)
+
+@pytest.mark.skipif(not sys.platform.startswith("linux"), reason="peak RSS is reset per stage on Linux only")
+def test_copy_on_write_lowers_the_peak_rss_of_the_copying_stages():
+    # Spawned runs at 10x the synthetic data. Only the stages that used to copy whole tables are
+    # compared: the later cast stages allocate the same new columns in both modes, so the peaks of
+    # the whole runs are within noise of each other
+    report = benchmark_transform_memory(10).set_index("etapa")
+    for stage in ["check_fact_table", "renaming_dim_tables"]:
+        assert report.loc[stage, "cow_peak_mib"] < report.loc[stage, "copy_peak_mib"] - 5, stage
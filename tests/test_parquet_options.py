@@ -0,0 +1,45 @@
+# -*- coding: utf-8 -*-
+"""
+Tests for the per-table and per-column Parquet write options.
+"""
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from src.utils.utils import get_parquet_write_options, write_parquet_buffer
+
+def test_table_and_column_entries_override_the_default():
+    options = get_parquet_write_options("br_cenipa_recomendacao", ["id_ocorrencia", "descricao"])
+    assert options["compression"] == {"id_ocorrencia": "zstd", "descricao": "zstd"}
+    assert options["compression_level"] == {"id_ocorrencia": 3, "descricao": 9}
+    assert options["use_dictionary"] == ["id_ocorrencia"]
+    assert options["write_statistics"] == ["id_ocorrencia"]
+
+def test_overrides_take_precedence_over_the_configured_options():
+    options = get_parquet_write_options(
+        "br_cenipa_recomendacao",
+        ["id_ocorrencia", "descricao"],
+        {"compression": "snappy", "columns": {"descricao": {"use_dictionary": True}}})
+    # The configured column entry still wins over the table-level override
+    assert options["compression"] == {"id_ocorrencia": "snappy", "descricao": "zstd"}
+    assert options["compression_level"] == {"descricao": 9}
+    assert options["use_dictionary"] == ["id_ocorrencia", "descricao"]
+
+def test_compression_level_is_dropped_for_codecs_without_levels():
+    options = get_parquet_write_options("br_cenipa_ocorrencia", ["id_ocorrencia"], {"compression": "snappy"})
+    assert options["compression_level"] is None
+
+def test_written_file_follows_the_column_options():
+    dataframe = pd.DataFrame({
+        "id_ocorrencia": range(200),
+        "descricao": [f"recomendação {i % 7}" for i in range(200)]})
+    table = pa.Table.from_pandas(dataframe, preserve_index=False)
+    options = get_parquet_write_options("br_cenipa_recomendacao", table.column_names)
+    metadata = pq.ParquetFile(write_parquet_buffer(table, options)).metadata.row_group(0)
+
+    identifier, description = metadata.column(0), metadata.column(1)
+    assert identifier.compression == description.compression == "ZSTD"
+    assert identifier.is_stats_set and not description.is_stats_set
+    assert any("DICTIONARY" in encoding for encoding in identifier.encodings)
+    assert not any("DICTIONARY" in encoding for encoding in description.encodings)
@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*-
+"""
+Tests for the Hive-partitioned Parquet output and its upload to Google Cloud Storage.
+"""
+
+import io
+
+import pandas as pd
+import pyarrow.parquet as pq
+
+from src.utils import utils
+from src.utils.utils import iter_partitioned_parquet, upload_partitioned_dataframe_to_gcs
+
+def make_table(rows=60):
+    return pd.DataFrame({
+        "id_ocorrencia": list(range(rows, 0, -1)),
+        "data_ocorrencia": pd.date_range("2020-01-01", periods=rows, freq="D")[::-1],
+        "descricao": [f"ocorrência número {i}" for i in range(rows)],
+        "ano": [2020 if i % 3 else 2021 for i in range(rows)],
+        "sigla_uf": ["SP" if i % 2 else None for i in range(rows)]})
+
+def read_files(files):
+    return {path: pq.read_table(buffer).to_pandas() for path, buffer in files}
+
+def test_partition_paths_use_hive_layout_and_default_partition():
+    files = read_files(iter_partitioned_parquet(make_table(), "ocorrencia"))
+    assert sorted({path.rsplit("/", 1)[0] for path in files}) == [
+        "ano=2020/sigla_uf=SP",
+        "ano=2020/sigla_uf=__HIVE_DEFAULT_PARTITION__",
+        "ano=2021/sigla_uf=SP",
+        "ano=2021/sigla_uf=__HIVE_DEFAULT_PARTITION__"]
+    assert all(path.endswith("/part-00000.parquet") for path in files)
+    # The partition values live in the path, not in the files
+    assert all(list(df.columns) == ["id_ocorrencia", "data_ocorrencia", "descricao"]
+               for df in files.values())
+    assert sum(len(df) for df in files.values()) == 60
+
+def test_partitions_are_sorted_by_date_and_split_by_encoded_size():
+    dataframe = make_table(4000)
+    files = read_files(iter_partitioned_parquet(
+        dataframe, "ocorrencia", target_file_size=8_000))
+    partition = sorted(path for path in files if path.startswith("ano=2020/sigla_uf=SP/"))
+    assert len(partition) > 1
+    assert partition[:2] == [
+        "ano=2020/sigla_uf=SP/part-00000.parquet", "ano=2020/sigla_uf=SP/part-00001.parquet"]
+    dates = pd.concat([files[path]["data_ocorrencia"] for path in partition], ignore_index=True)
+    assert dates.is_monotonic_increasing
+    assert len(dates) == ((dataframe["ano"] == 2020) & (dataframe["sigla_uf"] == "SP")).sum()
+    # The files are sized from the encoded bytes, so they land near the target
+    # instead of far below it as with the in-memory size
+    sizes = [len(buffer.getvalue()) for path, buffer in iter_partitioned_parquet(
+        dataframe, "ocorrencia", target_file_size=8_000)]
+    assert max(sizes) < 8_000 * 2
+    assert sum(sizes) / len(sizes) > 8_000 / 4
+
+class FakeBlob:
+    def __init__(self, bucket, name):
+        self.bucket = bucket
+        self.name = name
+
+    def upload_from_file(self, buffer, content_type=None):
+        self.bucket.objects[self.name] = buffer.read()
+
+    def delete(self):
+        del self.bucket.objects[self.name]
+
+class FakeBucket:
+    def __init__(self, objects):
+        self.objects = dict(objects)
+
+    def blob(self, name):
+        return FakeBlob(self, name)
+
+    def list_blobs(self, prefix=""):
+        return [FakeBlob(self, name) for name in list(self.objects) if name.startswith(prefix)]
+
+class FakeClient:
+    def __init__(self, bucket):
+        self._bucket = bucket
+
+    def bucket(self, name):
+        return self._bucket
+
+def test_upload_replaces_the_previous_files_of_the_prefix(monkeypatch):
+    bucket = FakeBucket({
+        "ocorrencia/ano=1999/sigla_uf=RJ/part-00000.parquet": b"antigo",
+        "ocorrencia/ano=2020/sigla_uf=SP/part-00007.parquet": b"antigo",
+        "ocorrencia_registro/part-00000.parquet": b"outra tabela"})
+    monkeypatch.setattr(utils.storage, "Client", lambda: FakeClient(bucket))
+
+    upload_partitioned_dataframe_to_gcs(make_table(), "ocorrencia", bucket_name="teste")
+
+    assert "ocorrencia_registro/part-00000.parquet" in bucket.objects
+    uploaded = sorted(name for name in bucket.objects if name.startswith("ocorrencia/"))
+    assert uploaded == [
+        "ocorrencia/" + path for path, _ in iter_partitioned_parquet(make_table(), "ocorrencia")]
+    table = pq.read_table(io.BytesIO(bucket.objects[uploaded[0]]))
+    assert table.num_rows > 0
@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+"""
+Tests for the compilation of table specs into column plans and their parity with the
+sequential type casting helpers.
+"""
+
+import pandas as pd
+import pytest
+
+from src.constants import constants
+from src.utils.benchmark import TABLE_SPECS, synthetic_output_tables, type_cast_sequentially
+from src.utils.plan import apply_table_spec, compile_plan
+from src.utils.utils import (
+    coerce_dates,
+    coerce_floats,
+    format_date_series,
+    format_string_series,
+    parse_lat_long
+)
+
+def test_kinds_produced_by_an_earlier_kernel_are_dropped():
+    plan = compile_plan({"lat_long": ["latitude"], "float": ["latitude", "peso"]}, ["latitude", "peso"])
+    # 'lat_long' already yields floats, so 'float' is not applied again
+    assert plan == {"latitude": [parse_lat_long], "peso": [coerce_floats]}
+
+def test_repeated_kinds_are_applied_once():
+    plan = compile_plan({"string": ["nome", "nome"]}, ["nome"])
+    assert plan == {"nome": [format_string_series]}
+
+def test_default_covers_the_columns_not_in_the_spec_nor_excluded():
+    plan = compile_plan(
+        {"default": "string", "exclude": ["id_ocorrencia"], "float": ["peso"]},
+        ["id_ocorrencia", "tipo", "peso"])
+    assert plan == {"peso": [coerce_floats], "tipo": [format_string_series]}
+
+def test_columns_missing_from_the_table_are_skipped():
+    assert compile_plan({"string": ["nome", "inexistente"]}, ["nome", "outra"]) == {
+        "nome": [format_string_series]}
+
+def test_unknown_kinds_are_rejected():
+    with pytest.raises(ValueError):
+        compile_plan({"inteiro": ["total"]}, ["total"])
+
+def test_temporal_output_selects_the_date_kernel():
+    assert compile_plan({"date": ["data"]}, ["data"], temporal_output="string") == {"data": [format_date_series]}
+    assert compile_plan({"date": ["data"]}, ["data"], temporal_output="native") == {"data": [coerce_dates]}
+
+@pytest.mark.parametrize("table_name", list(TABLE_SPECS))
+def test_table_specs_match_the_sequential_helpers(table_name):
+    dataframe = synthetic_output_tables(1)[table_name]
+    sequential = dataframe.copy()
+    type_cast_sequentially(table_name, sequential)
+    planned = dataframe.copy()
+    apply_table_spec(planned, constants[TABLE_SPECS[table_name]].value, temporal_output="string")
+
+    as_text = lambda series: series.astype(object).where(series.notna(), "").astype(str)
+    mismatches = [
+        col for col in dataframe.columns
+        if not as_text(sequential[col]).equals(as_text(planned[col]))]
+    assert mismatches == []
@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+"""
+Round-trip tests for the Arrow IPC result serializer of the transform tasks.
+"""
+
+import base64
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.utils.benchmark import make_synthetic_tables
+from src.utils.serializers import (
+    FRAME_DATAFRAME,
+    FRAME_DATAFRAME_LIST,
+    FRAME_PICKLE,
+    ArrowSerializer
+)
+
+def frame_kind(blob):
+    return base64.decodebytes(blob)[:4]
+
+@pytest.fixture(scope="module")
+def tables():
+    return make_synthetic_tables(1)
+
+@pytest.mark.parametrize("compression", [None, "lz4", "zstd"])
+def test_dataframe_roundtrip(tables, compression):
+    serializer = ArrowSerializer(compression=compression)
+    dataframe = tables["ocorrencia.csv"]
+    blob = serializer.dumps(dataframe)
+    assert frame_kind(blob) == FRAME_DATAFRAME
+    pd.testing.assert_frame_equal(serializer.loads(blob), dataframe)
+
+def test_nullable_dtypes_and_index_roundtrip():
+    dataframe = pd.DataFrame({
+        "latitude": pd.array([-23.5, None], dtype="Float64"),
+        "indicador": pd.array([True, None], dtype="boolean"),
+        "nome": ["sp", np.nan],
+        "data": pd.to_datetime(["2020-01-01", None]),
+        "hora": pd.to_timedelta(["10:00:00", None])}, index=[5, 9])
+    serializer = ArrowSerializer(compression="zstd")
+    loaded = serializer.loads(serializer.dumps(dataframe))
+    pd.testing.assert_frame_equal(loaded, dataframe)
+    # Nulls of object columns come back as NaN, as from read_csv, not None
+    assert loaded.loc[9, "nome"] is not None and np.isnan(loaded.loc[9, "nome"])
+
+def test_list_and_tuple_of_dataframes_roundtrip(tables):
+    serializer = ArrowSerializer(compression="zstd")
+    dim_tables = [tables[name] for name in ["ocorrencia_tipo.csv", "aeronave.csv"]] + [None]
+    blob = serializer.dumps(dim_tables)
+    assert frame_kind(blob) == FRAME_DATAFRAME_LIST
+    loaded = serializer.loads(blob)
+    assert isinstance(loaded, list) and loaded[2] is None
+    for original, copy in zip(dim_tables[:2], loaded[:2]):
+        pd.testing.assert_frame_equal(copy, original)
+
+    loaded = serializer.loads(serializer.dumps(tuple(dim_tables[:2])))
+    assert isinstance(loaded, tuple) and len(loaded) == 2
+    assert serializer.loads(serializer.dumps([None, None])) == [None, None]
+
+@pytest.mark.parametrize("obj", [
+    None,
+    {"added": 1},
+    [],
+    ["texto", pd.DataFrame({"a": [1]})],
+    pd.DataFrame({"misto": [1, "a", 2.5]})])
+def test_other_results_are_pickled(obj):
+    serializer = ArrowSerializer()
+    blob = serializer.dumps(obj)
+    assert frame_kind(blob) == FRAME_PICKLE
+    loaded = serializer.loads(blob)
+    if isinstance(obj, pd.DataFrame):
+        pd.testing.assert_frame_equal(loaded, obj)
+    elif isinstance(obj, list) and obj:
+        assert loaded[0] == obj[0]
+        pd.testing.assert_frame_equal(loaded[1], obj[1])
+    else:
+        assert loaded == obj
+
+def test_unknown_frames_are_rejected():
+    with pytest.raises(ValueError):
+        ArrowSerializer().loads(base64.encodebytes(b"XXXX" + b"\x00" * 8))
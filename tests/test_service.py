@@ -0,0 +1,106 @@
+# -*- coding: utf-8 -*-
+"""
+Tests for the local read-only query service.
+"""
+
+import json
+import os
+import threading
+import urllib.error
+import urllib.request
+
+import pandas as pd
+import pytest
+
+from src.constants import constants
+from src.service.server import QueryService, serve
+from src.utils.utils import save_output_table
+
+MARKER_PATH = os.path.join(constants.OUTPUT_DIR_PATH.value, constants.PUBLISH_MARKER_FILE.value)
+
+def publish(sigla_uf="SP"):
+    """
+    Saves the fact and aircraft tables and rewrites the publish marker, as the transform flow does.
+    """
+    save_output_table(pd.DataFrame({
+        "id_ocorrencia": [1, 2, 3, 4],
+        "sigla_uf": [sigla_uf, "RJ", sigla_uf, None],
+        "classificacao_ocorrencia": ["ACIDENTE", "INCIDENTE", "INCIDENTE", "ACIDENTE"],
+        "data_ocorrencia": pd.to_datetime(["2020-01-10", "2020-06-01", "2021-03-05", "2021-12-31"])
+    }), "br_cenipa_ocorrencia")
+    save_output_table(pd.DataFrame({
+        "id_ocorrencia": [1, 3, 3],
+        "matricula_aeronave": ["PPABC", "PPABC", "PRXYZ"]
+    }), "br_cenipa_aeronave")
+    previous = os.stat(MARKER_PATH).st_mtime_ns if os.path.exists(MARKER_PATH) else 0
+    with open(MARKER_PATH, "w", encoding="utf-8") as f:
+        json.dump({"tables": ["br_cenipa_ocorrencia", "br_cenipa_aeronave"]}, f)
+    os.utime(MARKER_PATH, ns=(previous + 10 ** 9, previous + 10 ** 9))
+
+def ids(response):
+    return [item["id_ocorrencia"] for item in json.loads(response)["items"]]
+
+@pytest.fixture
+def service():
+    publish()
+    return QueryService()
+
+def test_filters_are_intersected(service):
+    assert ids(service.query("sigla_uf=sp")) == [1, 3]
+    assert ids(service.query("sigla_uf=SP&classificacao_ocorrencia=incidente")) == [3]
+    assert ids(service.query("sigla_uf=SP&sigla_uf=RJ&classificacao_ocorrencia=incidente")) == [2, 3]
+    assert ids(service.query("matricula_aeronave=ppabc&data_inicio=2021-01-01")) == [3]
+    assert ids(service.query("data_inicio=2020-06-01&data_fim=2021-03-05")) == [2, 3]
+    assert json.loads(service.query("sigla_uf=SP&limit=1&offset=1")) == {
+        "total": 2, "count": 1, "offset": 1, "items": json.loads(service.query("id_ocorrencia=3"))["items"]}
+
+def test_equivalent_queries_share_a_cache_entry(service):
+    service.query("sigla_uf=SP&classificacao_ocorrencia=ACIDENTE")
+    service.query("classificacao_ocorrencia=acidente&sigla_uf=sp")
+    assert service.cached_response.cache_info().hits == 1
+
+def test_new_publish_marker_reloads_the_outputs(service):
+    assert ids(service.query("sigla_uf=MG")) == []
+    # Outputs rewritten without a new marker are not read
+    save_output_table(pd.DataFrame({
+        "id_ocorrencia": [9],
+        "sigla_uf": ["MG"],
+        "classificacao_ocorrencia": ["ACIDENTE"],
+        "data_ocorrencia": pd.to_datetime(["2022-01-01"])
+    }), "br_cenipa_ocorrencia")
+    assert ids(service.query("sigla_uf=MG")) == []
+
+    publish(sigla_uf="MG")
+    assert ids(service.query("sigla_uf=MG")) == [1, 3]
+    assert service.cached_response.cache_info().currsize == 1
+
+@pytest.fixture
+def server(service):
+    http_server = serve("127.0.0.1", 0, service)
+    thread = threading.Thread(target=http_server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{http_server.server_address[1]}"
+    http_server.shutdown()
+    http_server.server_close()
+
+def get(url):
+    try:
+        with urllib.request.urlopen(url) as response:
+            return response.status, json.loads(response.read())
+    except urllib.error.HTTPError as e:
+        return e.code, json.loads(e.read())
+
+@pytest.mark.parametrize("query", [
+    "cidade=Campinas",
+    "limit=-1",
+    "limit=dez",
+    "data_inicio=ontem"])
+def test_bad_parameters_are_answered_with_400(server, query):
+    status, body = get(f"{server}/ocorrencias?{query}")
+    assert status == 400
+    assert "error" in body
+
+def test_http_answers(server):
+    assert get(f"{server}/ocorrencias?sigla_uf=RJ")[1]["total"] == 1
+    assert get(f"{server}/health")[1]["occurrences"] == 4
+    assert get(f"{server}/inexistente")[0] == 404
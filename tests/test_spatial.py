@@ -0,0 +1,34 @@
+# -*- coding: utf-8 -*-
+"""
+Tests for the spatial grid index.
+"""
+
+import numpy as np
+import pandas as pd
+
+from src.utils.spatial import SpatialIndex, build_spatial_index
+
+def fact_table():
+    return pd.DataFrame({
+        "id_ocorrencia": [1, 2, 3, 4, 5, 6, 7],
+        "latitude_ocorrencia": [-23.62, -23.63, -23.64, 0.0, -0.0, -22.9, np.nan],
+        "longitude_ocorrencia": [-46.65, -46.66, -46.64, 0.0, -43.1, -0.0, -43.2],
+        "sigla_aerodromo": ["SBSP", "sbsp", "SBSP", "SBSP", "SBRJ", "SBRJ", None]
+    })
+
+def test_placeholder_coordinates_are_not_indexed():
+    table = build_spatial_index(fact_table())
+    assert sorted(table.column("id_ocorrencia").to_pylist()) == [1, 2, 3]
+
+def test_aerodromes_are_located_by_the_median_of_their_occurrences():
+    index = SpatialIndex(build_spatial_index(fact_table()))
+    assert index.locate_aerodromo("sbsp") == (-23.63, -46.65)
+    # Its only occurrences have placeholder coordinates
+    assert index.locate_aerodromo("SBRJ") is None
+    assert index.locate_aerodromo("") is None
+
+def test_radius_query_around_an_aerodrome():
+    index = SpatialIndex(build_spatial_index(fact_table()))
+    result = index.query_aerodromo("SBSP", radius_km=5)
+    assert result["id_ocorrencia"].tolist() == [2, 1, 3]
+    assert index.query_aerodromo("SBRJ", radius_km=5).empty
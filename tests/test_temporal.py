@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+"""
+Tests for the typed date and time columns of the output tables (TEMPORAL_OUTPUT=native).
+"""
+
+import datetime
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from src.utils.plan import apply_table_spec
+from src.utils.utils import output_table_path, read_output_table, save_output_table, to_arrow_table
+
+SPEC = {"string": ["sigla_uf"], "date": ["data_ocorrencia", "data_publicacao_relatorio"], "time": ["hora_ocorrencia"]}
+
+def cast_table():
+    dataframe = pd.DataFrame({
+        "sigla_uf": ["SP", "RJ", "MG"],
+        "data_ocorrencia": ["25/12/2020", "2021-03-04", "31/02/2021"],
+        "data_publicacao_relatorio": [np.nan, "01/02/2022", "2022-05-06"],
+        "hora_ocorrencia": ["10:20:30", "***", "23:59:59"]})
+    apply_table_spec(dataframe, SPEC, temporal_output="native")
+    return dataframe
+
+def test_native_kernels_keep_dates_and_times_typed():
+    dataframe = cast_table()
+    assert dataframe["data_ocorrencia"].dtype == "datetime64[ns]"
+    assert dataframe["hora_ocorrencia"].dtype == "timedelta64[ns]"
+    assert dataframe["data_ocorrencia"].isna().tolist() == [False, False, True]
+    assert dataframe["hora_ocorrencia"].isna().tolist() == [False, True, False]
+
+def test_arrow_table_has_date32_and_time64_columns():
+    schema = to_arrow_table(cast_table()).schema
+    assert schema.field("data_ocorrencia").type == pa.date32()
+    assert schema.field("data_publicacao_relatorio").type == pa.date32()
+    assert schema.field("hora_ocorrencia").type == pa.time64("us")
+    assert schema.field("sigla_uf").type == pa.string()
+
+def test_outputs_are_typed_in_parquet_and_formatted_in_csv():
+    save_output_table(cast_table(), "br_cenipa_teste_temporal")
+
+    table = pq.read_table(output_table_path("br_cenipa_teste_temporal", "parquet"))
+    assert table.schema.field("data_ocorrencia").type == pa.date32()
+    assert table.schema.field("hora_ocorrencia").type == pa.time64("us")
+    assert table.column("data_ocorrencia").to_pylist() == [
+        datetime.date(2020, 12, 25), datetime.date(2021, 3, 4), None]
+    assert table.column("hora_ocorrencia").to_pylist() == [
+        datetime.time(10, 20, 30), None, datetime.time(23, 59, 59)]
+
+    csv = pd.read_csv(output_table_path("br_cenipa_teste_temporal", "csv"), dtype=str)
+    assert csv["data_ocorrencia"].tolist()[:2] == ["2020-12-25", "2021-03-04"]
+    assert csv["hora_ocorrencia"].tolist()[::2] == ["10:20:30", "23:59:59"]
+    assert csv["hora_ocorrencia"].isna().tolist() == [False, True, False]
+
+def test_saved_table_is_written_back_with_the_same_types():
+    save_output_table(cast_table(), "br_cenipa_teste_temporal")
+    dataframe = read_output_table("br_cenipa_teste_temporal")
+    assert to_arrow_table(dataframe).schema.field("data_ocorrencia").type == pa.date32()
+    assert to_arrow_table(dataframe).schema.field("hora_ocorrencia").type == pa.time64("us")
@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+"""
+Tests for the full-text index over the recommendation texts.
+"""
+
+import pandas as pd
+import pytest
+
+from src.utils.text_index import TextIndex, update_text_index
+
+RECOMENDACOES = pd.DataFrame({
+    "id_recomendacao": ["R1", "R2", "R3", "R4", "R4"],
+    "descricao": [
+        "Revisar o plano de manutenção da aeronave.",
+        "Reforçar o treinamento de manutenção dos pilotos.",
+        "Realizar inspeção no helicóptero antes do voo.",
+        "Atualizar o plano de voo",
+        "e o treinamento da tripulação."]})
+
+@pytest.fixture
+def index_dir(tmp_path):
+    update_text_index(RECOMENDACOES, index_dir=str(tmp_path))
+    return str(tmp_path)
+
+def test_terms_are_combined_with_and_by_default(index_dir):
+    index = TextIndex.load(index_dir)
+    assert index.search("manutenção") == ["R1", "R2"]
+    assert index.search("treinamento manutencao") == ["R2"]
+    assert index.search("treinamento AND manutenção") == ["R2"]
+
+def test_or_and_not(index_dir):
+    index = TextIndex.load(index_dir)
+    assert index.search("inspeção OR treinamento") == ["R2", "R3", "R4"]
+    assert index.search("treinamento NOT pilotos") == ["R4"]
+    assert index.search("NOT voo") == ["R1", "R2"]
+    # AND binds tighter than OR
+    assert index.search("plano voo OR helicoptero") == ["R3", "R4"]
+
+def test_phrases_match_words_in_order(index_dir):
+    index = TextIndex.load(index_dir)
+    assert index.search('"plano de manutenção"') == ["R1"]
+    assert index.search('"plano de voo"') == ["R4"]
+    assert index.search('"manutenção de plano"') == []
+    # Stopwords in a phrase match any word
+    assert index.search('"plano da manutenção"') == ["R1"]
+
+def test_texts_of_a_recommendation_are_indexed_together(index_dir):
+    assert TextIndex.load(index_dir).search('tripulacao voo') == ["R4"]
+
+def test_update_only_retokenizes_changed_recommendations(index_dir):
+    changed = RECOMENDACOES.copy()
+    changed.loc[0, "descricao"] = "Revisar o checklist de inspeção."
+    changed = pd.concat([
+        changed[changed["id_recomendacao"] != "R3"],
+        pd.DataFrame({"id_recomendacao": ["R5"], "descricao": ["Inspeção do motor."]})])
+
+    assert update_text_index(changed, index_dir=index_dir) == {
+        "added": 1, "updated": 1, "removed": 1, "total": 4}
+    index = TextIndex.load(index_dir)
+    assert index.search("inspeção") == ["R1", "R5"]
+    assert index.search("manutenção") == ["R2"]
+    assert index.search("helicóptero") == []
+
+    assert update_text_index(changed, index_dir=index_dir) == {
+        "added": 0, "updated": 0, "removed": 0, "total": 4}
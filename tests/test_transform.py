@@ -0,0 +1,17 @@
+# -*- coding: utf-8 -*-
+"""
+Tests for the error handling of the dimension table tasks.
+"""
+
+import pytest
+
+from src.tasks.transform import load_dim_tables, renaming_dim_tables
+
+def test_missing_dimension_table_fails_the_load():
+    # The input directory of the tests has no dimension tables
+    with pytest.raises(FileNotFoundError):
+        load_dim_tables.fn()
+
+def test_renaming_fails_instead_of_returning_none():
+    with pytest.raises(AttributeError):
+        renaming_dim_tables.fn([None, None, None, None])